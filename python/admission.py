@@ -0,0 +1,172 @@
+# ============================================
+# Admission Control Module
+# Query cancellation tokens and concurrency limits for heavy queries
+# ============================================
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from config import MAX_CONCURRENT_HEAVY_QUERIES, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+class QueryTimeoutError(Exception):
+    """Raised when a query exceeds its time limit (server- or client-side)."""
+
+
+class QueryCancelledError(Exception):
+    """Raised when a query is cancelled through its CancellationToken."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation handle for a running or queued query.
+    
+    Callbacks registered by the database layer (e.g. KILL QUERY) run when
+    `cancel()` is called, so a query can be stopped from another thread.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+    
+    @property
+    def is_cancelled(self):
+        """Check if cancellation was requested."""
+        return self._event.is_set()
+    
+    def cancel(self):
+        """Request cancellation and run registered callbacks."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+        
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"⚠️  Cancellation callback failed: {e}")
+    
+    def register(self, callback):
+        """Register a callback; runs immediately if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def unregister(self, callback):
+        """Remove a previously registered callback."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+    
+    def wait(self, timeout):
+        """Sleep up to `timeout` seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+    
+    def raise_if_cancelled(self):
+        """Raise QueryCancelledError if cancellation was requested."""
+        if self.is_cancelled:
+            raise QueryCancelledError("Query cancelled")
+
+
+class AdmissionController:
+    """
+    Caps the number of heavy queries running at once.
+    
+    Waiting queries are admitted in priority order (lower value first, FIFO
+    within a priority), so interactive queries jump ahead of queued batch
+    reports. Queries not marked heavy are admitted immediately.
+    """
+    
+    def __init__(self, max_concurrent=None):
+        self.max_concurrent = max_concurrent or MAX_CONCURRENT_HEAVY_QUERIES
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiters = []  # heap of (priority, sequence, query_name)
+        self._sequence = itertools.count()
+    
+    @contextmanager
+    def admit(self, query_name, heavy=True, priority=PRIORITY_INTERACTIVE,
+              cancel_token=None, timeout=None):
+        """
+        Block until the query may run.
+        
+        Args:
+            query_name (str): Name of the query (for logging)
+            heavy (bool): Whether the query counts against the heavy-query cap
+            priority (int): Lower runs first (see config.PRIORITY_*)
+            cancel_token (CancellationToken): Abort waiting when cancelled
+            timeout (float): Max seconds to wait for admission
+        
+        Raises:
+            QueryCancelledError: If cancelled while waiting
+            QueryTimeoutError: If not admitted within `timeout`
+        """
+        if not heavy:
+            yield
+            return
+        
+        entry = (priority, next(self._sequence), query_name)
+        deadline = time.monotonic() + timeout if timeout else None
+        
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while self._running >= self.max_concurrent or self._waiters[0] is not entry:
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    wait = 0.1
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise QueryTimeoutError(
+                                f"Query '{query_name}' not admitted within {timeout}s"
+                            )
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            
+            heapq.heappop(self._waiters)
+            self._running += 1
+            # The next waiter may also fit if slots remain
+            self._cond.notify_all()
+        
+        logger.info(f"🚦 Admitted heavy query: {query_name} (priority {priority})")
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+    
+    def stats(self):
+        """Get current admission statistics."""
+        with self._cond:
+            return {
+                'running': self._running,
+                'waiting': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+            }
+
+
+# Global admission controller instance
+_admission_controller = None
+
+def get_admission_controller():
+    """Get or create global admission controller."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
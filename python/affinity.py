@@ -0,0 +1,251 @@
+# ============================================
+# Product Affinity Module
+# Market-basket co-occurrence and lift with sparse matrices
+# ============================================
+
+import logging
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from config import (
+    AFFINITY_BASKET, AFFINITY_MIN_PAIR_COUNT, AFFINITY_TOP_N,
+    AFFINITY_BLOCK_SIZE, AFFINITY_CHUNK_SIZE, AFFINITY_COMPACT_ROWS
+)
+
+logger = logging.getLogger(__name__)
+
+STREAM_QUERY = 'sales_product_lines'
+CATALOG_QUERY = 'product_catalog'
+
+# Bits reserved for the day number in 'day' basket keys
+DAY_BITS = 16
+
+BASKET_TYPES = ('customer', 'day')
+
+class ProductAffinity:
+    """
+    Builds a sparse basket × product incidence matrix and derives
+    co-occurrence, support, confidence and lift for product pairs.
+    
+    Baskets are either all purchases of a customer ('customer') or a
+    customer's purchases on one day ('day'). Sales are folded in chunks as
+    unique (basket, product) pairs, deduplicated again whenever pending
+    pairs pass AFFINITY_COMPACT_ROWS, so memory depends on distinct pairs
+    rather than sales rows. `refresh()` keeps an `order_id` watermark and
+    only streams sales added since. Co-occurrence is computed as X.T @ X in
+    column blocks, keeping only pairs above the minimum count.
+    """
+    
+    def __init__(self, basket=None, min_pair_count=None, block_size=None):
+        self.basket = basket or AFFINITY_BASKET
+        if self.basket not in BASKET_TYPES:
+            raise ValueError(f"basket must be one of {BASKET_TYPES}")
+        self.min_pair_count = min_pair_count or AFFINITY_MIN_PAIR_COUNT
+        self.block_size = block_size or AFFINITY_BLOCK_SIZE
+        self._clear()
+    
+    def _clear(self):
+        self._pairs = []
+        self._pending_rows = 0
+        self.watermark = 0
+        self.matrix = None
+        self.product_ids = None
+    
+    # ============================================
+    # Incidence Matrix Construction
+    # ============================================
+    
+    def _basket_keys(self, chunk):
+        customer_ids = chunk['customer_id'].to_numpy(dtype=np.int64)
+        if self.basket == 'customer':
+            return customer_ids
+        days = pd.to_datetime(chunk['order_date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+        return (customer_ids << DAY_BITS) | days
+    
+    def update(self, chunk):
+        """
+        Fold one chunk of sales lines into the pending incidence pairs.
+        
+        Args:
+            chunk (DataFrame): Columns customer_id, product_id, order_date
+                (and order_id, which advances the watermark)
+        """
+        if chunk.empty:
+            return self
+        pairs = pd.DataFrame({
+            'basket': self._basket_keys(chunk),
+            'product_id': chunk['product_id'].to_numpy(dtype=np.int64),
+        }).drop_duplicates()
+        self._pairs.append(pairs)
+        self._pending_rows += len(pairs)
+        self.matrix = None
+        
+        if 'order_id' in chunk.columns:
+            self.watermark = max(self.watermark, int(chunk['order_id'].max()))
+        
+        if self._pending_rows >= AFFINITY_COMPACT_ROWS:
+            self.compact()
+        return self
+    
+    def compact(self):
+        """
+        Merge pending per-chunk pairs into one deduplicated frame.
+        
+        Called automatically when pending pairs pass AFFINITY_COMPACT_ROWS
+        and by `build()`.
+        """
+        if len(self._pairs) > 1:
+            self._pairs = [pd.concat(self._pairs, ignore_index=True).drop_duplicates(ignore_index=True)]
+        self._pending_rows = 0
+    
+    def build(self):
+        """
+        Build the binary basket × product CSR matrix from all folded chunks.
+        
+        Returns:
+            csr_matrix: Incidence matrix (baskets × products)
+        """
+        if self.matrix is not None:
+            return self.matrix
+        
+        self.compact()
+        if self._pairs:
+            pairs = self._pairs[0]
+        else:
+            pairs = pd.DataFrame({'basket': [], 'product_id': []}, dtype=np.int64)
+        
+        rows, baskets = pd.factorize(pairs['basket'])
+        cols, self.product_ids = pd.factorize(pairs['product_id'], sort=True)
+        self.product_ids = np.asarray(self.product_ids)
+        
+        # int32 entries keep co-occurrence counts exact
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.int32), (rows, cols)),
+            shape=(len(baskets), len(self.product_ids))
+        )
+        logger.info(
+            f"✓ Incidence matrix: {self.matrix.shape[0]:,} baskets × "
+            f"{self.matrix.shape[1]:,} products ({self.matrix.nnz:,} entries)"
+        )
+        return self.matrix
+    
+    # ============================================
+    # Co-occurrence & Lift
+    # ============================================
+    
+    def pair_statistics(self):
+        """
+        Compute co-occurrence statistics for all product pairs with at least
+        `min_pair_count` shared baskets.
+        
+        Returns:
+            DataFrame: product_a, product_b, baskets_together, support,
+                confidence_a_to_b, confidence_b_to_a, lift
+        """
+        matrix = self.build()
+        n_baskets, n_products = matrix.shape
+        if n_baskets == 0:
+            return pd.DataFrame()
+        
+        csc = matrix.tocsc()
+        item_counts = np.asarray(matrix.sum(axis=0)).ravel()
+        transposed = csc.T.tocsr()
+        
+        rows_a, rows_b, together = [], [], []
+        for start in range(0, n_products, self.block_size):
+            stop = min(start + self.block_size, n_products)
+            block = (transposed @ csc[:, start:stop]).tocoo()
+            a, b = block.row, block.col + start
+            keep = (a < b) & (block.data >= self.min_pair_count)
+            rows_a.append(a[keep])
+            rows_b.append(b[keep])
+            together.append(block.data[keep])
+        
+        a = np.concatenate(rows_a)
+        b = np.concatenate(rows_b)
+        count = np.concatenate(together).astype(np.int64)
+        
+        count_a = item_counts[a]
+        count_b = item_counts[b]
+        return pd.DataFrame({
+            'product_a': self.product_ids[a],
+            'product_b': self.product_ids[b],
+            'baskets_together': count,
+            'support': count / n_baskets,
+            'confidence_a_to_b': count / count_a,
+            'confidence_b_to_a': count / count_b,
+            'lift': count * n_baskets / (count_a * count_b),
+        })
+    
+    def top_pairs(self, top_n=None, by='lift', catalog=None):
+        """
+        Get the top-N "bought together" pairs.
+        
+        Args:
+            top_n (int): Number of pairs (default: config.AFFINITY_TOP_N)
+            by (str): Ranking column ('lift', 'baskets_together', 'support', ...)
+            catalog (DataFrame): product_id → product_name / category for labels
+        
+        Returns:
+            DataFrame: Top pairs, best first
+        """
+        top_n = top_n or AFFINITY_TOP_N
+        pairs = self.pair_statistics()
+        if pairs.empty:
+            return pairs
+        
+        if len(pairs) > top_n:
+            best = np.argpartition(-pairs[by].to_numpy(), top_n - 1)[:top_n]
+            pairs = pairs.iloc[best]
+        pairs = pairs.sort_values([by, 'baskets_together'], ascending=False).reset_index(drop=True)
+        
+        if catalog is not None and not catalog.empty:
+            names = catalog.set_index('product_id')['product_name']
+            pairs.insert(2, 'product_name_a', pairs['product_a'].map(names))
+            pairs.insert(3, 'product_name_b', pairs['product_b'].map(names))
+        return pairs
+    
+    def refresh(self, executor, chunk_size=None):
+        """
+        Stream sales lines newer than the watermark into the incidence matrix.
+        
+        Args:
+            executor (QueryExecutor): Executor used to stream `sales_product_lines`
+            chunk_size (int): Rows per streamed chunk
+        """
+        start_watermark = self.watermark
+        rows = 0
+        for chunk in executor.execute_chunked(
+            STREAM_QUERY, {'after_order_id': start_watermark},
+            chunk_size=chunk_size or AFFINITY_CHUNK_SIZE
+        ):
+            self.update(chunk)
+            rows += len(chunk)
+        logger.info(f"✓ Affinity pairs refreshed with {rows:,} new sales lines (order_id > {start_watermark})")
+        return self.build()
+    
+    def reset(self):
+        """
+        Forget all pairs and the watermark.
+        
+        Needed whenever `sales` is rebuilt: order_ids restart, so the old
+        watermark would skip every new sale.
+        """
+        self._clear()
+        logger.info("🧹 Affinity state reset")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    rng = np.random.default_rng(3)
+    rows = 500000
+    products = rng.zipf(1.5, rows) % 500 + 1
+    chunk = pd.DataFrame({
+        'customer_id': rng.integers(1, 50000, rows),
+        'product_id': products,
+        'order_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, rows), unit='D'),
+    })
+    affinity = ProductAffinity(basket='customer')
+    affinity.update(chunk)
+    print(affinity.top_pairs(10))
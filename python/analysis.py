@@ -5,14 +5,32 @@
 
 import logging
 from query_executor import QueryExecutor
+from insight_engine import InsightEngine
+from timeseries import TimeSeriesAnalyzer, monthly_growth_from_result
+from rfm import RFMEngine
+from affinity import ProductAffinity, CATALOG_QUERY
 
 logger = logging.getLogger(__name__)
 
+# Dedicated insight writer per report analysis (others use generate_insights)
+REPORT_INSIGHTS = {
+    'monthly_sales': 'generate_monthly_insights',
+    'top_products': 'generate_product_insights',
+    'top_customers': 'generate_customer_insights',
+    'sales_by_city': 'generate_city_insights',
+    'product_category_analysis': 'generate_category_insights',
+    'product_affinity': 'generate_affinity_insights',
+}
+
 class AnalysisEngine:
     """Semantic layer for business analytics."""
     
     def __init__(self):
         self.executor = QueryExecutor()
+        self.insight_engine = InsightEngine()
+        self.time_series = None
+        self.rfm = RFMEngine()
+        self.affinity = ProductAffinity()
     
     # ============================================
     # Sales Analysis Functions
@@ -66,6 +84,91 @@ class AnalysisEngine:
         df = self.executor.execute('product_revenue_ranking', params={'limit': limit})
         return df
     
+    # ============================================
+    # Time-Series Analysis Functions
+    # ============================================
+    
+    def get_time_series_analysis(self):
+        """
+        Build time-series state from daily_sales_trend.
+        
+        The analyzer is kept on the engine so later days can be added with
+        `append_daily_sales` without re-querying or recomputing history.
+        
+        Returns:
+            TimeSeriesAnalyzer: Fitted analyzer
+        """
+        logger.info("📊 Analyzing: Daily Sales Time Series")
+        df = self.get_daily_sales_trend()
+        self.time_series = TimeSeriesAnalyzer.from_dataframe(df, 'order_date', 'sales_amount')
+        return self.time_series
+    
+    def append_daily_sales(self, order_date, sales_amount):
+        """Add one day to the time-series state (builds it first if needed)."""
+        if self.time_series is None:
+            self.get_time_series_analysis()
+        return self.time_series.append(order_date, sales_amount)
+    
+    def get_monthly_growth(self):
+        """Get month-over-month and year-over-year growth of monthly sales."""
+        logger.info("📊 Analyzing: Monthly Sales Growth (MoM / YoY)")
+        df = self.get_monthly_sales()
+        return monthly_growth_from_result(df, 'month', 'total_sales')
+    
+    # ============================================
+    # Customer Segmentation Functions
+    # ============================================
+    
+    def get_rfm_segments(self):
+        """
+        Refresh RFM scores and segments.
+        
+        Only sales added since the last persisted watermark are streamed from
+        the database; segment assignments are saved to output/rfm_segments.csv.
+        """
+        logger.info("📊 Analyzing: RFM Customer Segments")
+        return self.rfm.refresh(self.executor)
+    
+    def get_rfm_segment_summary(self):
+        """Get customers, revenue and averages per RFM segment."""
+        return self.rfm.segment_summary(self.get_rfm_segments())
+    
+    def get_cohort_retention(self, as_share=True):
+        """Get monthly cohort retention matrix (refreshes state first)."""
+        logger.info("📊 Analyzing: Cohort Retention")
+        self.rfm.refresh(self.executor)
+        return self.rfm.cohort_retention(as_share=as_share)
+    
+    # ============================================
+    # Product Affinity Functions
+    # ============================================
+    
+    def get_product_affinity(self, top_n=None, by='lift', basket=None):
+        """
+        Get the top "bought together" product pairs with support, confidence and lift.
+        
+        Args:
+            top_n (int): Number of pairs (default: config.AFFINITY_TOP_N)
+            by (str): Ranking column ('lift' or 'baskets_together')
+            basket (str): 'customer' or 'day' (default: config.AFFINITY_BASKET)
+        """
+        logger.info("📊 Analyzing: Product Affinity (Market Basket)")
+        if basket and basket != self.affinity.basket:
+            self.affinity = ProductAffinity(basket=basket)
+        self.affinity.refresh(self.executor)
+        catalog = self.executor.execute(CATALOG_QUERY)
+        return self.affinity.top_pairs(top_n, by=by, catalog=catalog)
+    
+    def get_bounded_result(self, query_name, params=None):
+        """
+        Run a named query within the memory budget.
+        
+        Returns:
+            DataFrame or SpilledResult: Result, on disk if it outgrew the budget
+        """
+        logger.info(f"📊 Analyzing (memory-bounded): {query_name}")
+        return self.executor.execute_bounded(query_name, params=params)
+    
     # ============================================
     # Insight Generation Functions
     # ============================================
@@ -158,6 +261,57 @@ class AnalysisEngine:
             insights.append(f"- Total category revenue: ₹{total_revenue:,.2f}")
         
         return "\n".join(insights)
+    
+    def generate_affinity_insights(self, df):
+        """Generate insights from product affinity pairs."""
+        if df.empty:
+            return "No data available for product affinity."
+        
+        insights = []
+        insights.append("🧺 **Products Bought Together**")
+        insights.append(f"- Pairs shown: {len(df)}")
+        
+        top_pair = df.iloc[0]
+        name_a = top_pair.get('product_name_a', top_pair['product_a'])
+        name_b = top_pair.get('product_name_b', top_pair['product_b'])
+        insights.append(
+            f"- Strongest pair: {name_a} + {name_b} "
+            f"(lift {top_pair['lift']:.2f}, {int(top_pair['baskets_together'])} baskets)"
+        )
+        
+        return "\n".join(insights)
+    
+    def generate_report_insights(self, analysis_name, df):
+        """Generate markdown insights for one analysis of the standard report."""
+        method = REPORT_INSIGHTS.get(analysis_name)
+        if method is None:
+            return self.generate_insights(analysis_name, df)
+        return getattr(self, method)(df)
+    
+    def summarize_result(self, query_name, df):
+        """
+        Compute vectorized insight statistics for any query result, using the
+        dimensions/measures/time_column declared for the query in queries.json.
+        
+        Returns:
+            DataFrame: One row per segment and measure
+        """
+        query_info = self.executor.query_loader.get_query(query_name)
+        return self.insight_engine.summarize(
+            df,
+            measures=query_info.get('measures'),
+            dimensions=query_info.get('dimensions'),
+            time_column=query_info.get('time_column')
+        )
+    
+    def generate_insights(self, query_name, df):
+        """Generate markdown insights for any query result."""
+        if df.empty:
+            return f"No data available for {query_name}."
+        
+        summary = self.summarize_result(query_name, df)
+        title = self.executor.query_loader.get_query_description(query_name)
+        return self.insight_engine.render_markdown(summary, title)
 
 
 if __name__ == '__main__':
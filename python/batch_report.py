@@ -0,0 +1,451 @@
+# ============================================
+# Batch Report Module
+# Many scenario reports (city / category / date filters) from one grouped pass
+# ============================================
+
+import re
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from config import (
+    SCENARIOS_FILE, SCENARIO_REPORTS_DIR, BATCH_REPORT_TOP_N, BATCH_REPORT_CHARTS,
+    BATCH_REPORT_MAX_WORKERS, ensure_directories
+)
+from memory_budget import SpilledResult
+
+logger = logging.getLogger(__name__)
+
+# One grouped pass: sums per (scenario, day, customer, product), the finest
+# grain any report needs. Every report is rolled up from it in memory.
+GRAIN_QUERY = 'scenario_sales_grain'
+
+# Lookups that label the grain's ids (product → name / category, customer → name / city)
+PRODUCT_QUERY = 'product_catalog'
+CUSTOMER_QUERY = 'customer_directory'
+
+# Sums the grain query returns next to its key columns
+MEASURE_COLUMNS = ['units', 'amount', 'order_count', 'price_sum']
+
+# Partial aggregates per analysis kept before merging them (bounds memory on spilled input)
+PARTIALS_MERGE_EVERY = 8
+
+# Analysis → (group keys, aggregations, sort column, ascending, top-N)
+# Mirrors the SQL of the same-named queries in queries.json.
+REPORT_SPECS = {
+    'monthly_sales': (['month'], {'total_sales': ('amount', 'sum')}, 'month', True, False),
+    'top_products': (['product_name'], {'total_units': ('units', 'sum')}, 'total_units', False, True),
+    'top_customers': (['customer_name'], {'total_spent': ('amount', 'sum')}, 'total_spent', False, True),
+    'sales_by_city': (
+        ['city'], {'total_sales': ('amount', 'sum'), 'order_count': ('order_count', 'sum')},
+        'total_sales', False, False),
+    'product_category_analysis': (
+        ['category'],
+        {'total_revenue': ('amount', 'sum'), 'total_units': ('units', 'sum'),
+         'price_sum': ('price_sum', 'sum'), 'order_count': ('order_count', 'sum')},
+        'total_revenue', False, False),
+    'daily_sales_trend': (
+        ['order_date'], {'sales_amount': ('amount', 'sum'), 'order_count': ('order_count', 'sum')},
+        'order_date', True, False),
+    'customer_purchase_frequency': (
+        ['customer_id', 'customer_name'],
+        {'purchase_count': ('order_count', 'sum'), 'total_spent': ('amount', 'sum')},
+        'purchase_count', False, False),
+    'product_revenue_ranking': (
+        ['product_name'], {'revenue': ('amount', 'sum'), 'units_sold': ('units', 'sum')},
+        'revenue', False, True),
+}
+
+REPORT_ANALYSES = list(REPORT_SPECS)
+
+@dataclass(frozen=True)
+class Scenario:
+    """One report variant: filters on city, category and order date (empty = no filter)."""
+    name: str
+    cities: tuple = ()
+    categories: tuple = ()
+    start_date: date = None
+    end_date: date = None
+    description: str = ''
+    
+    @classmethod
+    def from_dict(cls, spec):
+        """
+        Build a scenario from a scenarios.json entry.
+        
+        Raises:
+            ValueError: Missing name, unknown keys or invalid dates
+        """
+        unknown = set(spec) - {'name', 'cities', 'categories', 'start_date', 'end_date', 'description'}
+        if unknown:
+            raise ValueError(f"Scenario has unknown fields: {sorted(unknown)}")
+        if not spec.get('name'):
+            raise ValueError("Scenario missing required field: name")
+        
+        dates = {}
+        for key in ('start_date', 'end_date'):
+            value = spec.get(key)
+            try:
+                dates[key] = date.fromisoformat(value) if isinstance(value, str) else value
+            except ValueError as e:
+                raise ValueError(f"Scenario '{spec['name']}' {key} is not an ISO date: {value!r}") from e
+        if dates['start_date'] and dates['end_date'] and dates['start_date'] > dates['end_date']:
+            raise ValueError(f"Scenario '{spec['name']}' start_date is after end_date")
+        
+        return cls(
+            name=str(spec['name']),
+            cities=tuple(spec.get('cities', ())),
+            categories=tuple(spec.get('categories', ())),
+            description=spec.get('description', ''),
+            **dates
+        )
+    
+    @property
+    def slug(self):
+        """File-system safe name for the scenario's output directory."""
+        return re.sub(r'[^\w-]+', '_', self.name).strip('_').lower() or 'scenario'
+    
+    def describe(self):
+        """Human-readable filter summary."""
+        parts = [
+            f"Cities: {', '.join(self.cities) if self.cities else 'all'}",
+            f"Categories: {', '.join(self.categories) if self.categories else 'all'}",
+            f"Dates: {self.start_date or 'start'} → {self.end_date or 'latest'}",
+        ]
+        return ' | '.join(parts)
+    
+    def filter_rows(self, index):
+        """
+        Rows for the scenario filter table of the grain query.
+        
+        One row per (city, category) pair, None meaning "any", so a sale
+        matches at most one row of each scenario.
+        """
+        return [
+            {
+                'scenario': index,
+                'city': city,
+                'category': category,
+                'start_date': (self.start_date or date(1000, 1, 1)).isoformat(),
+                'end_date': (self.end_date or date(9999, 12, 31)).isoformat(),
+            }
+            for city in (self.cities or (None,))
+            for category in (self.categories or (None,))
+        ]
+
+
+def load_scenarios(path=None):
+    """
+    Load scenarios from a JSON list.
+    
+    Args:
+        path (Path): Scenarios file (default: config.SCENARIOS_FILE)
+    
+    Returns:
+        list: Scenario objects
+    
+    Raises:
+        ValueError: Invalid entries or duplicate scenario names
+    """
+    path = Path(path or SCENARIOS_FILE)
+    with open(path, 'r') as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise ValueError(f"{path.name} must contain a list of scenarios")
+    
+    scenarios = [Scenario.from_dict(spec) for spec in specs]
+    slugs = [s.slug for s in scenarios]
+    duplicates = sorted({slug for slug in slugs if slugs.count(slug) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate scenario names: {duplicates}")
+    logger.info(f"✓ Loaded {len(scenarios)} scenarios from {path.name}")
+    return scenarios
+
+
+def city_scenarios(cities, categories=(), start_date=None, end_date=None):
+    """One scenario per city, sharing the other filters (e.g. for regional reports)."""
+    return [
+        Scenario(name=str(city), cities=(city,), categories=tuple(categories),
+                 start_date=start_date, end_date=end_date)
+        for city in cities
+    ]
+
+
+def scenario_filters(scenarios):
+    """
+    Encode scenarios as the JSON filter list the grain query joins against.
+    
+    Returns:
+        str: JSON list of filter rows (see Scenario.filter_rows)
+    """
+    return json.dumps([row for index, s in enumerate(scenarios) for row in s.filter_rows(index)])
+
+
+def scenario_window(scenarios):
+    """
+    Date range covering every scenario, so the grain query can range-scan
+    sales by order_date instead of reading the whole table.
+    
+    Returns:
+        tuple: (start_date, end_date)
+    """
+    starts = [s.start_date for s in scenarios]
+    ends = [s.end_date for s in scenarios]
+    start = date(1000, 1, 1) if None in starts else min(starts)
+    end = date(9999, 12, 31) if None in ends else max(ends)
+    return start, end
+
+
+def _lookup(df, key):
+    """Index a lookup result by its numeric id column."""
+    df = df.copy()
+    df[key] = pd.to_numeric(df[key])
+    return df.set_index(key)
+
+
+def _iter_grain(result, products, customers):
+    """Chunks of the grain result (in memory or spilled), typed and labelled."""
+    products = _lookup(products, 'product_id')
+    customers = _lookup(customers, 'customer_id')
+    chunks = result.iter_chunks() if isinstance(result, SpilledResult) else [result]
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk = chunk.copy()
+        for column in MEASURE_COLUMNS + ['customer_id', 'product_id']:
+            chunk[column] = pd.to_numeric(chunk[column])
+        chunk['order_date'] = pd.to_datetime(chunk['order_date'])
+        # 'YYYY-MM' strings sort chronologically
+        chunk['month'] = chunk['order_date'].to_numpy(dtype='datetime64[M]').astype(str)
+        for column in ('product_name', 'category'):
+            chunk[column] = chunk['product_id'].map(products[column])
+        for column in ('customer_name', 'city'):
+            chunk[column] = chunk['customer_id'].map(customers[column])
+        yield chunk
+
+
+def _merge_partials(partials, group_keys):
+    # Every aggregation is a sum, so partial sums merge by summing again
+    return pd.concat(partials).groupby(level=group_keys, observed=True, sort=False).sum()
+
+
+def compute_reports(grain, scenarios, products, customers, top_n=None):
+    """
+    Compute every report analysis for every scenario from the grain result.
+    
+    The grain query returns one row per (scenario, day, customer, product);
+    each chunk is labelled from the product and customer lookups and rolled
+    up once per analysis (month, day, product, customer, city, category).
+    Partial sums are merged, sorted within each scenario and split per
+    scenario. A result spilled to disk is read back one chunk at a time, in
+    a single pass for all analyses.
+    
+    Args:
+        grain (DataFrame or SpilledResult): `scenario_sales_grain` result (see fetch_grain)
+        scenarios (list): Scenario objects, in the order they were encoded
+        products (DataFrame): product_id, product_name, category
+        customers (DataFrame): customer_id, customer_name, city
+        top_n (int): Rows kept by top-N analyses (default: config.BATCH_REPORT_TOP_N)
+    
+    Returns:
+        dict: Scenario name → {analysis name: DataFrame}
+    """
+    top_n = top_n or BATCH_REPORT_TOP_N
+    partials = {analysis: [] for analysis in REPORT_SPECS}
+    for chunk in _iter_grain(grain, products, customers):
+        for analysis, (keys, aggregations, _, _, _) in REPORT_SPECS.items():
+            group_keys = ['scenario'] + keys
+            partials[analysis].append(
+                chunk.groupby(group_keys, observed=True, sort=False).agg(**aggregations)
+            )
+            if len(partials[analysis]) >= PARTIALS_MERGE_EVERY:
+                partials[analysis] = [_merge_partials(partials[analysis], group_keys)]
+    
+    reports = {scenario.name: {} for scenario in scenarios}
+    for analysis, (keys, aggregations, sort_by, ascending, limited) in REPORT_SPECS.items():
+        group_keys = ['scenario'] + keys
+        if partials[analysis]:
+            merged = _merge_partials(partials[analysis], group_keys)
+        else:
+            merged = pd.DataFrame(columns=group_keys + list(aggregations)).set_index(group_keys)
+        result = (
+            merged.reset_index()
+            .sort_values(['scenario', sort_by], ascending=[True, ascending], kind='mergesort')
+        )
+        if limited:
+            result = result.groupby('scenario', sort=False).head(top_n)
+        if analysis == 'product_category_analysis':
+            # AVG(p.price) over sales rows, rebuilt from per-group sums
+            result['avg_price'] = result['price_sum'] / result['order_count']
+            result = result.drop(columns=['price_sum', 'order_count'])
+        
+        empty = result.iloc[0:0].drop(columns='scenario')
+        split = {code: frame for code, frame in result.groupby('scenario', sort=False)}
+        for index, scenario in enumerate(scenarios):
+            frame = split.get(index)
+            reports[scenario.name][analysis] = (
+                empty.copy() if frame is None
+                else frame.drop(columns='scenario').reset_index(drop=True)
+            )
+    return reports
+
+
+# Per-process analysis engine for insight text (created on first use in each worker)
+_worker_engine = None
+
+def _get_worker_engine():
+    global _worker_engine
+    if _worker_engine is None:
+        from analysis import AnalysisEngine
+        _worker_engine = AnalysisEngine()
+    return _worker_engine
+
+
+def render_scenario(scenario, reports, output_dir, charts=True):
+    """
+    Write one scenario's CSVs, charts and insights.md.
+    
+    Runs in a worker process; pyplot is not thread-safe, so scenarios are
+    rendered in separate processes rather than threads.
+    
+    Returns:
+        dict: Summary row for the batch index
+    """
+    directory = Path(output_dir) / scenario.slug
+    directory.mkdir(parents=True, exist_ok=True)
+    engine = _get_worker_engine()
+    visualizer = None
+    if charts:
+        from visualization import Visualizer
+        visualizer = Visualizer(directory / 'charts')
+    
+    content = f"# 📊 Sales Report: {scenario.name}\n\n"
+    if scenario.description:
+        content += f"{scenario.description}\n\n"
+    content += f"**Filters**: {scenario.describe()}\n\n"
+    content += f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    
+    for analysis in REPORT_ANALYSES:
+        df = reports[analysis]
+        df.to_csv(directory / f"{analysis}.csv", index=False)
+        if df.empty:
+            continue
+        if visualizer is not None:
+            try:
+                visualizer.plot_report(analysis, df)
+            except Exception as e:
+                logger.warning(f"⚠️  {scenario.name}: could not chart {analysis}: {e}")
+        content += f"\n## {analysis}\n{engine.generate_report_insights(analysis, df)}\n"
+    
+    (directory / 'insights.md').write_text(content)
+    
+    cities = reports['sales_by_city']
+    return {
+        'scenario': scenario.name,
+        'directory': scenario.slug,
+        'filters': scenario.describe(),
+        'total_sales': float(cities['total_sales'].sum()) if not cities.empty else 0.0,
+        'order_count': int(cities['order_count'].sum()) if not cities.empty else 0,
+        'customers': len(reports['customer_purchase_frequency']),
+    }
+
+
+class BatchReportBuilder:
+    """
+    Builds the standard report for many scenarios at once.
+    
+    The scenario filters are sent to the database as one JSON parameter and
+    a single grouped query scans sales once, returning sums per (scenario,
+    day, customer, product) within the scenarios' date window. The month,
+    day, product, customer, city and category reports are all rolled up
+    from that result in memory, and the per-scenario outputs are rendered in
+    parallel worker processes.
+    """
+    
+    def __init__(self, executor=None, output_dir=None, top_n=None, charts=None, max_workers=None):
+        if executor is None:
+            from query_executor import QueryExecutor
+            executor = QueryExecutor()
+        self.executor = executor
+        self.output_dir = Path(output_dir or SCENARIO_REPORTS_DIR)
+        self.top_n = top_n or BATCH_REPORT_TOP_N
+        self.charts = BATCH_REPORT_CHARTS if charts is None else charts
+        self.max_workers = max_workers or BATCH_REPORT_MAX_WORKERS
+    
+    def fetch_grain(self, scenarios):
+        """
+        Run the grain query once for all scenarios, within the memory budget.
+        
+        Returns:
+            DataFrame or SpilledResult: scenario, order_date, customer_id, product_id and sums
+        """
+        start_date, end_date = scenario_window(scenarios)
+        params = {'scenarios': scenario_filters(scenarios), 'start_date': start_date, 'end_date': end_date}
+        grain = self.executor.execute_bounded(GRAIN_QUERY, params=params)
+        logger.info(f"✓ {GRAIN_QUERY}: {len(grain):,} rows")
+        return grain
+    
+    def fetch_lookups(self):
+        """
+        Product and customer labels for the grain's ids.
+        
+        Returns:
+            tuple: (products, customers) DataFrames
+        """
+        return self.executor.execute(PRODUCT_QUERY), self.executor.execute(CUSTOMER_QUERY)
+    
+    def render(self, scenarios, reports):
+        """
+        Render every scenario in parallel and write the batch index.
+        
+        Returns:
+            DataFrame: One summary row per scenario (also saved as index.csv)
+        """
+        ensure_directories()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        jobs = [(s, reports[s.name], self.output_dir, self.charts) for s in scenarios]
+        
+        if self.max_workers <= 1 or len(jobs) <= 1:
+            summaries = [render_scenario(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                summaries = list(pool.map(render_scenario, *zip(*jobs)))
+        
+        index = pd.DataFrame(summaries)
+        index.to_csv(self.output_dir / 'index.csv', index=False)
+        return index
+    
+    def build(self, scenarios=None):
+        """
+        Build reports for all scenarios.
+        
+        Args:
+            scenarios (list): Scenario objects (default: load config.SCENARIOS_FILE)
+        
+        Returns:
+            DataFrame: Batch index, one row per scenario
+        """
+        scenarios = load_scenarios() if scenarios is None else scenarios
+        if not scenarios:
+            logger.warning("⚠️  No scenarios to report on")
+            return pd.DataFrame()
+        
+        grain = self.fetch_grain(scenarios)
+        try:
+            if grain.empty:
+                logger.warning("⚠️  Cannot build batch reports: no sales data")
+                return pd.DataFrame()
+            products, customers = self.fetch_lookups()
+            reports = compute_reports(grain, scenarios, products, customers, self.top_n)
+        finally:
+            if isinstance(grain, SpilledResult):
+                grain.cleanup()
+        
+        logger.info(f"✓ Computed {len(REPORT_ANALYSES)} analyses for {len(scenarios)} scenarios")
+        
+        index = self.render(scenarios, reports)
+        logger.info(f"✓ Batch reports saved: {self.output_dir}")
+        return index
@@ -0,0 +1,203 @@
+# ============================================
+# Benchmark Module
+# Performance guards for startup and query paths
+# ============================================
+
+import sys
+import time
+import logging
+import argparse
+import subprocess
+import statistics
+from pathlib import Path
+from config import STARTUP_BUDGET_SECONDS, HEAVY_MODULES
+
+logger = logging.getLogger(__name__)
+
+PYTHON_DIR = Path(__file__).parent
+MAIN_SCRIPT = PYTHON_DIR / 'main.py'
+
+# ============================================
+# Startup Benchmarks
+# ============================================
+
+def measure_cold_start(cli_args=('--list-queries',), runs=5):
+    """
+    Measure wall-clock time of fresh `main.py` invocations.
+    
+    Args:
+        cli_args (tuple): Arguments passed to main.py
+        runs (int): Number of fresh interpreter runs
+    
+    Returns:
+        dict: 'median', 'min', 'max' seconds over all runs
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(MAIN_SCRIPT), *cli_args],
+            cwd=PYTHON_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
+        timings.append(time.perf_counter() - start)
+    
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'max': max(timings),
+    }
+
+
+def find_heavy_imports(modules=('main', 'query_loader')):
+    """
+    Import light-path modules in a fresh interpreter and report which
+    heavy libraries were pulled in.
+    
+    Returns:
+        list: Heavy module names that were imported
+    """
+    code = (
+        "import sys\n"
+        f"for name in {list(modules)!r}:\n"
+        "    __import__(name)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PYTHON_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    output = result.stdout.strip()
+    return output.split(',') if output else []
+
+
+def run_startup_benchmark(runs=5):
+    """
+    Guard cold-start latency of the light CLI path.
+    
+    Returns:
+        bool: True if within STARTUP_BUDGET_SECONDS and no heavy imports leaked
+    """
+    ok = True
+    
+    heavy = find_heavy_imports()
+    if heavy:
+        logger.error(f"✗ Light path imports heavy modules: {heavy}")
+        ok = False
+    else:
+        logger.info("✓ Light path imports no heavy modules")
+    
+    timing = measure_cold_start(runs=runs)
+    logger.info(
+        f"⏱️  Cold start (--list-queries): median {timing['median']*1000:.0f} ms "
+        f"(min {timing['min']*1000:.0f} ms, max {timing['max']*1000:.0f} ms)"
+    )
+    if timing['median'] > STARTUP_BUDGET_SECONDS:
+        logger.error(f"✗ Cold start exceeds budget of {STARTUP_BUDGET_SECONDS*1000:.0f} ms")
+        ok = False
+    
+    return ok
+
+
+# ============================================
+# Query Benchmarks (require a populated database)
+# ============================================
+
+def run_prepared_benchmark(iterations=200, query_name='top_products'):
+    """
+    Compare repeated parameterized calls with and without prepared statements.
+    
+    Returns:
+        dict: Mean latency in milliseconds per mode
+    """
+    from query_executor import QueryExecutor
+    
+    executor = QueryExecutor()
+    logging.getLogger('db').setLevel(logging.WARNING)
+    logging.getLogger('query_executor').setLevel(logging.WARNING)
+    
+    results = {}
+    for mode, prepared in [('text', False), ('prepared', True)]:
+        executor.execute(query_name, params={'limit': 1}, prepared=prepared)  # Warm up
+        start = time.perf_counter()
+        for i in range(iterations):
+            executor.execute(query_name, params={'limit': 1 + i % 20}, prepared=prepared)
+        results[mode] = (time.perf_counter() - start) / iterations * 1000
+        logger.info(f"⏱️  {query_name} ({mode}): {results[mode]:.2f} ms/call over {iterations} calls")
+    
+    stats = executor.db_manager.statement_stats
+    logger.info(f"🧩 Statements prepared: {stats['prepares']}, reused: {stats['reuses']}")
+    return results
+
+
+# ============================================
+# Analysis Benchmarks (synthetic data, no database)
+# ============================================
+
+def run_rfm_benchmark(rows=10_000_000, customers=1_000_000, chunk_size=500_000):
+    """
+    Stream synthetic sales through the RFM engine in chunks and time
+    aggregation, scoring and cohort construction.
+    
+    Returns:
+        dict: Seconds per phase
+    """
+    import numpy as np
+    import pandas as pd
+    from rfm import RFMEngine
+    
+    rng = np.random.default_rng(0)
+    engine = RFMEngine()
+    base_date = np.datetime64('2022-01-01')
+    
+    timings = {}
+    start = time.perf_counter()
+    for offset in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - offset)
+        chunk = pd.DataFrame({
+            'order_id': np.arange(offset + 1, offset + n + 1),
+            'customer_id': rng.integers(1, customers + 1, n),
+            'order_date': base_date + rng.integers(0, 730, n).astype('timedelta64[D]'),
+            'total_amount': rng.gamma(2.0, 1500.0, n),
+        })
+        engine.update(chunk)
+    engine.compact()
+    timings['aggregate'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    scores = engine.score()
+    timings['score'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    engine.cohort_retention()
+    timings['cohorts'] = time.perf_counter() - start
+    
+    logger.info(
+        f"⏱️  RFM over {rows:,} sales / {len(scores):,} customers: "
+        f"aggregate {timings['aggregate']:.1f}s ({rows / timings['aggregate']:,.0f} rows/s), "
+        f"score {timings['score']:.2f}s, cohorts {timings['cohorts']:.2f}s"
+    )
+    return timings
+
+
+BENCHMARKS = {
+    'startup': run_startup_benchmark,
+    'prepared': run_prepared_benchmark,
+    'rfm': run_rfm_benchmark,
+}
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    parser = argparse.ArgumentParser(description='Sales Data Analysis System - Benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help='Benchmark to run')
+    args = parser.parse_args()
+    
+    passed = BENCHMARKS[args.benchmark]()
+    sys.exit(0 if passed is not False else 1)
@@ -15,6 +15,21 @@ DB_PASSWORD = 'root'  # CHANGE THIS TO YOUR MYSQL PASSWORD
 DB_NAME = 'sales_analytics'
 DB_PORT = 3306
 
+# ============================================
+# Multi-Endpoint Configuration
+# ============================================
+# Role tags: 'primary' (writes + fallback reads), 'replica' (read-only named
+# queries), 'shard' (holds a disjoint partition of `sales` for fan-out queries).
+# Missing user/password/database fall back to the DB_* settings above.
+DB_ENDPOINTS = [
+    {'name': 'primary', 'host': DB_HOST, 'port': DB_PORT, 'role': 'primary'},
+    # {'name': 'replica1', 'host': 'localhost', 'port': 3307, 'role': 'replica'},
+    # {'name': 'shard1', 'host': 'localhost', 'port': 3310, 'role': 'shard'},
+    # {'name': 'shard2', 'host': 'localhost', 'port': 3311, 'role': 'shard'},
+]
+REPLICA_MAX_LAG_SECONDS = 5  # Replicas lagging more than this are skipped
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = 10  # How often replication lag is re-read
+
 # ============================================
 # Project Paths
 # ============================================
@@ -25,9 +40,10 @@ OUTPUT_DIR = PROJECT_ROOT / 'output'
 INSIGHTS_DIR = PROJECT_ROOT / 'insights'
 CHARTS_DIR = INSIGHTS_DIR / 'charts'
 
-# Create directories if they don't exist
-for directory in [DATA_DIR, QUERIES_DIR, OUTPUT_DIR, INSIGHTS_DIR, CHARTS_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+def ensure_directories():
+    """Create output directories if they don't exist (called on first write, not at import)."""
+    for directory in [DATA_DIR, QUERIES_DIR, OUTPUT_DIR, INSIGHTS_DIR, CHARTS_DIR]:
+        directory.mkdir(parents=True, exist_ok=True)
 
 # ============================================
 # File Paths
@@ -35,6 +51,8 @@ for directory in [DATA_DIR, QUERIES_DIR, OUTPUT_DIR, INSIGHTS_DIR, CHARTS_DIR]:
 QUERIES_FILE = QUERIES_DIR / 'queries.json'
 SAMPLE_DATA_FILE = DATA_DIR / 'raw_sales_data.csv'
 INSIGHTS_FILE = INSIGHTS_DIR / 'insights.md'
+DASHBOARD_FILE = INSIGHTS_DIR / 'dashboard.html'
+DASHBOARD_BUNDLE_FILE = OUTPUT_DIR / 'dashboard_bundle.json'
 
 # ============================================
 # Application Settings
@@ -43,6 +61,9 @@ DEBUG = True
 LOG_LEVEL = 'INFO'
 CHART_FORMAT = 'png'  # 'png' or 'svg'
 CHART_DPI = 300
+CHART_MAX_POINTS = 2000  # Series longer than this are downsampled before plotting
+CHART_DOWNSAMPLE_METHOD = 'lttb'  # 'lttb' (largest-triangle-three-buckets) or 'minmax'
+CHART_RASTERIZE_POINTS = 5000  # Original series longer than this are drawn as rasterized layers
 
 # ============================================
 # Analysis Settings
@@ -51,6 +72,165 @@ DEFAULT_LIMIT = 10  # For top-N queries
 DATE_FORMAT = '%Y-%m-%d'
 DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
+# ============================================
+# Insight Engine Settings
+# ============================================
+ANOMALY_Z_THRESHOLD = 3.0  # |z-score| above which a value is flagged
+PARETO_SHARE = 0.8  # Share of total used for concentration (80/20)
+INSIGHT_MAX_SEGMENTS = 10  # Segments rendered per analysis in insights.md
+
+# ============================================
+# Time-Series Settings
+# ============================================
+TS_ROLLING_WINDOWS = [7, 30]  # Trailing rolling-mean windows (days)
+TS_EWM_SPANS = [7, 30]  # Exponentially weighted mean spans (days)
+TS_SEASON_LENGTH = 7  # Weekly seasonality (must be odd)
+TS_FORECAST_DAYS = 14  # Default forecast horizon
+TS_FORECAST_FIT_DAYS = 90  # Trailing days used to fit the forecast trend
+
+# ============================================
+# RFM Segmentation Settings
+# ============================================
+RFM_QUANTILES = 5  # Score scale for recency / frequency / monetary
+RFM_CHUNK_SIZE = 500000  # Sales rows streamed per chunk
+RFM_COMPACT_ROWS = 2000000  # Pending partial rows before merging into state
+RFM_STATE_FILE = DATA_DIR / 'rfm_state.pkl'
+RFM_SEGMENTS_FILE = OUTPUT_DIR / 'rfm_segments.csv'
+
+# ============================================
+# Product Affinity Settings
+# ============================================
+AFFINITY_BASKET = 'customer'  # 'customer' (all purchases) or 'day' (customer × order date)
+AFFINITY_MIN_PAIR_COUNT = 5  # Minimum shared baskets for a pair to be reported
+AFFINITY_TOP_N = 20  # Default number of "bought together" pairs
+AFFINITY_BLOCK_SIZE = 2000  # Product columns per co-occurrence block
+AFFINITY_CHUNK_SIZE = 500000  # Sales rows streamed per chunk
+AFFINITY_COMPACT_ROWS = 2000000  # Pending (basket, product) pairs before deduplicating
+
+# ============================================
+# Change Detection Settings
+# ============================================
+SNAPSHOT_DIR = DATA_DIR / 'snapshots'  # Last result of each named query
+CHANGE_PROBE_MODE = 'watermark'  # 'watermark' (MAX(pk) + UPDATE_TIME) or 'checksum' (CHECKSUM TABLE)
+CHANGE_PROBE_TABLES = ['sales', 'customers', 'products']
+DIFF_RTOL = 1e-9  # Relative tolerance when comparing numeric values between runs
+
+# ============================================
+# Synthetic Data Settings
+# ============================================
+DATAGEN_SEED = 42  # Same seed + settings → identical data
+DATAGEN_CUSTOMERS = 100000
+DATAGEN_PRODUCTS = 5000
+DATAGEN_SALES = 10000000
+DATAGEN_START_DATE = '2022-01-01'
+DATAGEN_END_DATE = '2024-12-31'
+DATAGEN_ZIPF_EXPONENT = 1.1  # Product popularity skew (rank^-s)
+DATAGEN_WEEKLY_AMPLITUDE = 0.2  # Weekend uplift relative to weekdays
+DATAGEN_YEARLY_AMPLITUDE = 0.3  # Peak-season uplift (peaks in November)
+DATAGEN_ANNUAL_GROWTH = 0.15  # Year-over-year growth in daily volume
+DATAGEN_CHUNK_SIZE = 1000000  # Sales rows generated / written per chunk
+DATAGEN_DIR = DATA_DIR / 'synthetic'
+DATAGEN_USE_LOAD_DATA = True  # Load into MySQL with LOAD DATA LOCAL INFILE (falls back to INSERT)
+
+# ============================================
+# Batch Report Settings (main.py --batch-report)
+# ============================================
+SCENARIOS_FILE = QUERIES_DIR / 'scenarios.json'  # Scenario filters (city, category, date range)
+SCENARIO_REPORTS_DIR = OUTPUT_DIR / 'scenarios'  # One sub-directory per scenario
+BATCH_REPORT_TOP_N = 10  # Rows kept by top-N analyses per scenario
+BATCH_REPORT_CHARTS = True  # Render charts per scenario (the slowest part of a report)
+BATCH_REPORT_MAX_WORKERS = 4  # Scenario render processes
+
+# ============================================
+# Result Dtype Settings
+# ============================================
+OPTIMIZE_RESULT_DTYPES = False  # Return categoricals / downcast numerics from QueryExecutor
+CATEGORICAL_COLUMNS = ['city', 'country', 'category', 'product_name', 'customer_name']
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5  # Other string columns: max unique values / rows
+CATEGORY_CACHE_MAX_VALUES = 10000  # Larger columns get per-result categories, not a shared dictionary
+
+# ============================================
+# Memory Budget Settings
+# ============================================
+MEMORY_BUDGET_BYTES = 512 * 1024 * 1024  # Results larger than this spill to disk; 0 = unbounded
+SPILL_DIR = DATA_DIR / 'spill'  # Columnar chunks of spilled results (deleted after use)
+SPILL_FORMAT = 'parquet'  # 'parquet' (requires pyarrow) or 'pickle'
+MEMORY_SAMPLE_INTERVAL_SECONDS = 0.05  # Resident memory sampling while an analysis runs
+MEMORY_REPORT_FILE = OUTPUT_DIR / 'memory_report.csv'
+
+# ============================================
+# Prepared Statement Settings
+# ============================================
+USE_PREPARED_STATEMENTS = False  # Execute named queries as cached server-side prepared statements
+
+# ============================================
+# Startup Settings
+# ============================================
+STARTUP_BUDGET_SECONDS = 0.5  # Max cold-start time for light CLI paths (benchmark guard)
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'mysql.connector']
+
+# ============================================
+# Export Settings
+# ============================================
+EXPORT_FORMAT = 'csv'  # 'csv', 'csv.gz' or 'parquet'
+EXPORT_CHUNK_SIZE = 50000  # Rows fetched from the cursor per chunk
+EXPORT_MAX_WORKERS = 4  # Parallel exports (one connection each)
+EXPORT_SCHEMA_PEEK_CHUNKS = 4  # Parquet: chunks held back to type columns that start all NULL
+LOG_PREVIEW_ROWS = 20  # Rows of each result written to the log
+
+# ============================================
+# Timeout & Admission Control Settings
+# ============================================
+DEFAULT_QUERY_TIMEOUT_MS = 0  # Applies when a query has no "timeout_ms"; 0 = no limit
+KILL_QUERY_GRACE_SECONDS = 1.0  # Client-side KILL QUERY after timeout + grace
+MAX_CONCURRENT_HEAVY_QUERIES = 2  # Queries marked "heavy" in queries.json
+ADMISSION_TIMEOUT_SECONDS = None  # Max wait for a heavy-query slot; None = wait forever
+PRIORITY_INTERACTIVE = 0  # Lower value is admitted first
+PRIORITY_BATCH = 10
+
+# ============================================
+# Retry & Circuit Breaker Settings
+# ============================================
+RETRY_MAX_ATTEMPTS = 4  # Attempts per read-only query on transient errors (1 = no retry)
+RETRY_BASE_DELAY_SECONDS = 0.2  # Backoff base; delay = uniform(0, min(max, base * 2^retry))
+RETRY_MAX_DELAY_SECONDS = 5.0
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive transient failures before failing fast
+CIRCUIT_RESET_SECONDS = 30  # Time the circuit stays open before a trial call
+
+# ============================================
+# Query Service Settings (main.py --serve)
+# ============================================
+SERVE_HOST = '127.0.0.1'
+SERVE_PORT = 8765
+SERVE_POOL_SIZE = 4  # Warm database connections shared by client threads
+SERVE_CACHE_TTL_SECONDS = 60  # Result cache lifetime; 0 disables caching
+SERVE_CACHE_MAX_ENTRIES = 1000  # Least recently used results are evicted past this
+SERVE_RELOAD_INTERVAL_SECONDS = 1.0  # queries.json change polling interval
+
+# ============================================
+# Load Test Settings (python/loadtest.py)
+# ============================================
+LOADTEST_MIX = {  # Query name → relative weight of the simulated dashboard traffic
+    'top_products': 4,
+    'sales_by_city': 3,
+    'monthly_sales': 2,
+    'product_category_analysis': 1,
+}
+LOADTEST_QPS = 20  # Target arrival rate (one or more stages via --qps)
+LOADTEST_DURATION_SECONDS = 30  # Per stage
+LOADTEST_WARMUP_SECONDS = 5  # Leading requests excluded from the statistics
+LOADTEST_CONCURRENCY = 32  # Client threads
+LOADTEST_ARRIVAL = 'poisson'  # 'poisson' or 'uniform' inter-arrival times
+LOADTEST_MAX_BACKLOG = 1000  # Requests waiting for a client thread before new ones are shed
+LOADTEST_SAMPLE_INTERVAL_SECONDS = 1.0  # Timeline resolution
+LOADTEST_SLO_P99_MS = 500  # A stage is saturated above this p99 ...
+LOADTEST_MAX_ERROR_RATE = 0.01  # ... or this error rate
+LOADTEST_DIR = OUTPUT_DIR / 'loadtest'
+STANDIN_SERVER_THREADS = 8  # Queries the simulated server runs at once
+STANDIN_BASE_LATENCY_MS = 5.0  # Median service time per table read
+STANDIN_LATENCY_SIGMA = 0.5  # Log-normal spread of service times
+STANDIN_MAX_CONNECTIONS = 151  # MySQL's default max_connections
+
 # ============================================
 # Logging Configuration
 # ============================================
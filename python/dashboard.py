@@ -0,0 +1,387 @@
+# ============================================
+# Dashboard Module
+# Self-contained HTML dashboard over a pre-aggregated sales cube
+# ============================================
+
+import base64
+import json
+import html
+import logging
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import DASHBOARD_FILE, DASHBOARD_BUNDLE_FILE, ensure_directories
+
+logger = logging.getLogger(__name__)
+
+CUBE_QUERY = 'sales_cube'
+
+# Currency stays float64: float32 keeps only ~7 significant digits
+MEASURES = {
+    'sales_amount': '<f8',
+    'units': '<i4',
+    'orders': '<i4',
+}
+
+def _encode_array(values, dtype):
+    """Encode a numeric array as base64 little-endian bytes."""
+    data = np.ascontiguousarray(values, dtype=dtype)
+    return {'dtype': np.dtype(dtype).name, 'data': base64.b64encode(data.tobytes()).decode('ascii')}
+
+
+def _code_dtype(n):
+    return '<u1' if n <= 0xFF else '<u2' if n <= 0xFFFF else '<u4'
+
+
+def build_bundle(cube):
+    """
+    Encode a daily × city × category cube as a compact columnar bundle.
+    
+    Dates become day offsets, cities and categories become dictionary codes
+    and every column is stored as a base64 typed array, so the browser
+    decodes it straight into typed arrays without parsing per-row JSON.
+    
+    Args:
+        cube (DataFrame): Columns order_date, city, category, sales_amount, units, orders
+    
+    Returns:
+        dict: JSON-serializable bundle
+    """
+    dates = pd.to_datetime(cube['order_date']).to_numpy(dtype='datetime64[D]')
+    start = dates.min()
+    days = (dates - start).astype(np.int64)
+    
+    columns = {'day': _encode_array(days, _code_dtype(int(days.max()) + 1))}
+    dims = {}
+    for dim in ('city', 'category'):
+        codes, labels = pd.factorize(cube[dim].astype(object).fillna('Unknown').astype(str), sort=True)
+        dims[dim] = labels.tolist()
+        columns[dim] = _encode_array(codes, _code_dtype(len(labels)))
+    for measure, dtype in MEASURES.items():
+        values = pd.to_numeric(cube[measure], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        columns[measure] = _encode_array(values, dtype)
+    
+    return {
+        'version': 1,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'start_date': str(start),
+        'days': int(days.max()) + 1,
+        'rows': len(cube),
+        'dims': dims,
+        'measures': list(MEASURES),
+        'columns': columns,
+    }
+
+
+class DashboardBuilder:
+    """
+    Builds the interactive dashboard from a single `sales_cube` query.
+    
+    All filtering (date range, cities, categories) and charting happens in
+    the browser over the embedded bundle, so slicing the data never touches
+    the database.
+    """
+    
+    def __init__(self, executor=None):
+        self.executor = executor
+    
+    def fetch_cube(self):
+        """Run the cube query once."""
+        if self.executor is None:
+            from query_executor import QueryExecutor
+            self.executor = QueryExecutor()
+        logger.info("📊 Building dashboard cube (daily × city × category)")
+        return self.executor.execute(CUBE_QUERY)
+    
+    def render(self, bundle, title='Sales Dashboard'):
+        """Render the self-contained HTML page for a bundle."""
+        payload = json.dumps(bundle, separators=(',', ':')).replace('</', '<\\/')
+        return HTML_TEMPLATE.replace('__TITLE__', html.escape(title)).replace('__BUNDLE__', payload)
+    
+    def build(self, cube=None, path=None, bundle_path=None, title='Sales Dashboard'):
+        """
+        Build and save the dashboard.
+        
+        Args:
+            cube (DataFrame): Pre-fetched cube (default: run `sales_cube`)
+            path (Path): HTML output (default: config.DASHBOARD_FILE)
+            bundle_path (Path): Also write the bundle as JSON (default: config.DASHBOARD_BUNDLE_FILE)
+        
+        Returns:
+            Path: Dashboard file, or None if there is no data
+        """
+        cube = self.fetch_cube() if cube is None else cube
+        if cube.empty:
+            logger.warning("⚠️  Cannot build dashboard: no sales data")
+            return None
+        
+        bundle = build_bundle(cube)
+        ensure_directories()
+        
+        bundle_path = Path(bundle_path or DASHBOARD_BUNDLE_FILE)
+        bundle_path.write_text(json.dumps(bundle, separators=(',', ':')), encoding='utf-8')
+        
+        path = Path(path or DASHBOARD_FILE)
+        path.write_text(self.render(bundle, title), encoding='utf-8')
+        logger.info(
+            f"✓ Dashboard saved: {path} ({bundle['rows']:,} cube rows, "
+            f"{path.stat().st_size / 1024:,.0f} KB)"
+        )
+        return path
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: -apple-system, Segoe UI, Roboto, sans-serif; margin: 0; background: #f5f7fa; color: #222; }
+  header { background: #2185ba; color: #fff; padding: 12px 24px; }
+  header h1 { margin: 0; font-size: 20px; }
+  header small { opacity: 0.8; }
+  .filters { display: flex; gap: 16px; flex-wrap: wrap; padding: 12px 24px; background: #fff; border-bottom: 1px solid #dde3ea; }
+  .filters label { display: flex; flex-direction: column; font-size: 12px; gap: 4px; }
+  .filters select[multiple] { min-width: 180px; height: 96px; }
+  .kpis { display: flex; gap: 16px; padding: 12px 24px; }
+  .kpi { background: #fff; border-radius: 6px; padding: 12px 16px; flex: 1; box-shadow: 0 1px 2px rgba(0,0,0,0.08); }
+  .kpi .value { font-size: 22px; font-weight: bold; }
+  .kpi .name { font-size: 12px; color: #667; }
+  .grid { display: grid; grid-template-columns: 1fr 1fr; gap: 16px; padding: 0 24px 24px; }
+  .panel { background: #fff; border-radius: 6px; padding: 12px; box-shadow: 0 1px 2px rgba(0,0,0,0.08); }
+  .panel.wide { grid-column: 1 / span 2; }
+  .panel h2 { font-size: 14px; margin: 0 0 8px; }
+  canvas { width: 100%; display: block; }
+</style>
+</head>
+<body>
+<header>
+  <h1>__TITLE__</h1>
+  <small id="meta"></small>
+</header>
+<div class="filters">
+  <label>From <input type="date" id="from"></label>
+  <label>To <input type="date" id="to"></label>
+  <label>Measure
+    <select id="measure">
+      <option value="sales_amount">Sales (₹)</option>
+      <option value="units">Units</option>
+      <option value="orders">Orders</option>
+    </select>
+  </label>
+  <label>Cities (none = all) <select id="city" multiple></select></label>
+  <label>Categories (none = all) <select id="category" multiple></select></label>
+  <label>&nbsp;<button id="reset">Reset filters</button></label>
+</div>
+<div class="kpis">
+  <div class="kpi"><div class="value" id="kpi-sales"></div><div class="name">Sales (₹)</div></div>
+  <div class="kpi"><div class="value" id="kpi-units"></div><div class="name">Units</div></div>
+  <div class="kpi"><div class="value" id="kpi-orders"></div><div class="name">Orders</div></div>
+  <div class="kpi"><div class="value" id="kpi-aov"></div><div class="name">Avg order value (₹)</div></div>
+</div>
+<div class="grid">
+  <div class="panel wide"><h2>Daily trend</h2><canvas id="trend" height="260"></canvas></div>
+  <div class="panel"><h2>By city (click to filter)</h2><canvas id="by-city" height="360"></canvas></div>
+  <div class="panel"><h2>By category (click to filter)</h2><canvas id="by-category" height="360"></canvas></div>
+</div>
+<script type="application/json" id="bundle">__BUNDLE__</script>
+<script>
+(function () {
+  var bundle = JSON.parse(document.getElementById('bundle').textContent);
+  var TYPES = { uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array, int32: Int32Array, float32: Float32Array, float64: Float64Array };
+  var DAY_MS = 86400000;
+  
+  function decode(column) {
+    var raw = atob(column.data);
+    var bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return new TYPES[column.dtype](bytes.buffer);
+  }
+  
+  var cols = {};
+  Object.keys(bundle.columns).forEach(function (name) { cols[name] = decode(bundle.columns[name]); });
+  var start = Date.parse(bundle.start_date);
+  var dims = bundle.dims;
+  
+  function isoDay(offset) { return new Date(start + offset * DAY_MS).toISOString().slice(0, 10); }
+  function dayOffset(iso) { return Math.round((Date.parse(iso) - start) / DAY_MS); }
+  function fmt(v) { return v.toLocaleString(undefined, { maximumFractionDigits: 0 }); }
+  
+  var el = function (id) { return document.getElementById(id); };
+  el('meta').textContent = bundle.rows.toLocaleString() + ' cube rows · ' + isoDay(0) + ' to ' +
+    isoDay(bundle.days - 1) + ' · generated ' + bundle.generated_at;
+  
+  ['city', 'category'].forEach(function (dim) {
+    var select = el(dim);
+    dims[dim].forEach(function (label, i) {
+      var option = document.createElement('option');
+      option.value = i;
+      option.textContent = label;
+      select.appendChild(option);
+    });
+    select.addEventListener('change', update);
+  });
+  el('from').value = isoDay(0);
+  el('to').value = isoDay(bundle.days - 1);
+  ['from', 'to', 'measure'].forEach(function (id) { el(id).addEventListener('change', update); });
+  el('reset').addEventListener('click', function () {
+    ['city', 'category'].forEach(function (dim) {
+      Array.prototype.forEach.call(el(dim).options, function (o) { o.selected = false; });
+    });
+    el('from').value = isoDay(0);
+    el('to').value = isoDay(bundle.days - 1);
+    update();
+  });
+  
+  function selection(dim) {
+    var selected = el(dim).selectedOptions;
+    var mask = new Uint8Array(dims[dim].length);
+    if (!selected.length) { mask.fill(1); return mask; }
+    Array.prototype.forEach.call(selected, function (o) { mask[+o.value] = 1; });
+    return mask;
+  }
+  
+  // One pass over the cube computes every chart and KPI for the current filters
+  function aggregate() {
+    var measure = cols[el('measure').value];
+    var from = Math.max(0, dayOffset(el('from').value) || 0);
+    var to = Math.min(bundle.days - 1, isNaN(dayOffset(el('to').value)) ? bundle.days - 1 : dayOffset(el('to').value));
+    var cityMask = selection('city'), categoryMask = selection('category');
+    var result = {
+      from: from, to: to,
+      daily: new Float64Array(bundle.days),
+      city: new Float64Array(dims.city.length),
+      category: new Float64Array(dims.category.length),
+      sales: 0, units: 0, orders: 0
+    };
+    var day = cols.day, city = cols.city, category = cols.category;
+    for (var i = 0; i < bundle.rows; i++) {
+      var d = day[i];
+      if (d < from || d > to) continue;
+      var inCity = cityMask[city[i]], inCategory = categoryMask[category[i]];
+      var v = measure[i];
+      // City bars respect the category filter and vice versa
+      if (inCategory) result.city[city[i]] += v;
+      if (inCity) result.category[category[i]] += v;
+      if (!inCity || !inCategory) continue;
+      result.daily[d] += v;
+      result.sales += cols.sales_amount[i];
+      result.units += cols.units[i];
+      result.orders += cols.orders[i];
+    }
+    return result;
+  }
+  
+  function setupCanvas(canvas) {
+    var ratio = window.devicePixelRatio || 1;
+    var width = canvas.clientWidth, height = canvas.getAttribute('height');
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+    canvas.style.height = height + 'px';
+    var ctx = canvas.getContext('2d');
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, width, height);
+    ctx.font = '11px sans-serif';
+    return { ctx: ctx, width: width, height: +height };
+  }
+  
+  // Line chart drawn as per-pixel min/max columns, so cost is bounded by the canvas width
+  function drawTrend(values, from, to) {
+    var c = setupCanvas(el('trend')), ctx = c.ctx;
+    var left = 70, bottom = 20, w = c.width - left - 10, h = c.height - bottom - 10;
+    var n = to - from + 1;
+    if (n <= 0) return;
+    var max = 0;
+    for (var d = from; d <= to; d++) max = Math.max(max, values[d]);
+    max = max || 1;
+    ctx.strokeStyle = '#dde3ea';
+    ctx.fillStyle = '#667';
+    for (var g = 0; g <= 4; g++) {
+      var gy = 10 + h - h * g / 4;
+      ctx.beginPath(); ctx.moveTo(left, gy); ctx.lineTo(left + w, gy); ctx.stroke();
+      ctx.fillText(fmt(max * g / 4), 4, gy + 4);
+    }
+    ctx.fillText(isoDay(from), left, c.height - 4);
+    ctx.fillText(isoDay(to), left + w - 64, c.height - 4);
+    var columns = Math.min(n, Math.floor(w));
+    ctx.strokeStyle = '#2185ba';
+    ctx.fillStyle = 'rgba(33,133,186,0.3)';
+    ctx.beginPath();
+    ctx.moveTo(left, 10 + h);
+    for (var x = 0; x < columns; x++) {
+      var lo = from + Math.floor(x * n / columns), hi = from + Math.floor((x + 1) * n / columns);
+      var cmin = Infinity, cmax = -Infinity;
+      for (var k = lo; k < Math.max(hi, lo + 1); k++) { cmin = Math.min(cmin, values[k]); cmax = Math.max(cmax, values[k]); }
+      var px = left + (columns > 1 ? x * w / (columns - 1) : 0);
+      ctx.lineTo(px, 10 + h - h * cmax / max);
+      if (cmin !== cmax) ctx.lineTo(px, 10 + h - h * cmin / max);
+    }
+    ctx.lineTo(left + w, 10 + h);
+    ctx.closePath();
+    ctx.fill();
+    ctx.stroke();
+  }
+  
+  var barHits = {};
+  
+  function drawBars(dim, values) {
+    var canvas = el('by-' + dim), c = setupCanvas(canvas), ctx = c.ctx;
+    var order = Array.prototype.map.call(values, function (v, i) { return i; })
+      .filter(function (i) { return values[i] > 0; })
+      .sort(function (a, b) { return values[b] - values[a]; })
+      .slice(0, 15);
+    var max = order.length ? values[order[0]] : 1;
+    var left = 120, rowHeight = (c.height - 10) / Math.max(order.length, 1);
+    var mask = selection(dim), filtered = el(dim).selectedOptions.length > 0;
+    barHits[dim] = [];
+    order.forEach(function (i, row) {
+      var y = 5 + row * rowHeight, width = (c.width - left - 90) * values[i] / max;
+      ctx.fillStyle = filtered && !mask[i] ? '#c9d3dd' : '#40a68f';
+      ctx.fillRect(left, y + 2, width, rowHeight - 4);
+      ctx.fillStyle = '#222';
+      ctx.fillText(dims[dim][i].slice(0, 18), 4, y + rowHeight / 2 + 4);
+      ctx.fillText(fmt(values[i]), left + width + 4, y + rowHeight / 2 + 4);
+      barHits[dim].push({ index: i, top: y, bottom: y + rowHeight });
+    });
+  }
+  
+  ['city', 'category'].forEach(function (dim) {
+    el('by-' + dim).addEventListener('click', function (event) {
+      var y = event.offsetY;
+      (barHits[dim] || []).forEach(function (hit) {
+        if (y < hit.top || y >= hit.bottom) return;
+        var option = el(dim).options[hit.index];
+        option.selected = !option.selected;
+        update();
+      });
+    });
+  });
+  
+  function update() {
+    var r = aggregate();
+    el('kpi-sales').textContent = fmt(r.sales);
+    el('kpi-units').textContent = fmt(r.units);
+    el('kpi-orders').textContent = fmt(r.orders);
+    el('kpi-aov').textContent = r.orders ? fmt(r.sales / r.orders) : '–';
+    drawTrend(r.daily, r.from, r.to);
+    drawBars('city', r.city);
+    drawBars('category', r.category);
+  }
+  
+  window.addEventListener('resize', update);
+  update();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    try:
+        DashboardBuilder().build()
+    except Exception as e:
+        print(f"Note: Database must be populated first. Error: {e}")
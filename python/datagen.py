@@ -0,0 +1,384 @@
+# ============================================
+# Synthetic Data Module
+# Seeded, vectorized customers / products / sales generator
+# ============================================
+
+import logging
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import (
+    DATAGEN_SEED, DATAGEN_CUSTOMERS, DATAGEN_PRODUCTS, DATAGEN_SALES,
+    DATAGEN_START_DATE, DATAGEN_END_DATE, DATAGEN_ZIPF_EXPONENT,
+    DATAGEN_WEEKLY_AMPLITUDE, DATAGEN_YEARLY_AMPLITUDE, DATAGEN_ANNUAL_GROWTH,
+    DATAGEN_CHUNK_SIZE, DATAGEN_DIR, DATAGEN_USE_LOAD_DATA, ensure_directories
+)
+
+logger = logging.getLogger(__name__)
+
+# City → relative share of customers
+CITIES = {
+    'Mumbai': 0.18, 'Delhi': 0.17, 'Bangalore': 0.14, 'Hyderabad': 0.10,
+    'Chennai': 0.09, 'Kolkata': 0.08, 'Pune': 0.07, 'Ahmedabad': 0.06,
+    'Jaipur': 0.04, 'Lucknow': 0.04, 'Kochi': 0.03,
+}
+
+# Category → (share of catalog, median price)
+CATEGORIES = {
+    'Electronics': (0.20, 30000),
+    'Components': (0.20, 6000),
+    'Peripherals': (0.15, 4000),
+    'Accessories': (0.30, 1200),
+    'Software': (0.15, 2500),
+}
+
+# Sales CSV column order (matches iter_sales and the sales table)
+SALES_COLUMNS = ['order_id', 'customer_id', 'product_id', 'order_date', 'quantity', 'total_amount']
+
+# '.00' .. '.99' for formatting whole cents
+_CENTS = np.array([f".{cents:02d}".encode('ascii') for cents in range(100)])
+
+def _inverse_cdf_sample(rng, weights, size):
+    """Sample indices proportional to `weights` via a cumulative sum and binary search."""
+    cdf = np.cumsum(weights, dtype='float64')
+    cdf /= cdf[-1]
+    return np.searchsorted(cdf, rng.random(size), side='right')
+
+
+def _format_csv_rows(fields):
+    """
+    Format rows of CSV as bytes with numpy, without a Python loop per row.
+    
+    Each field is a non-negative integer array (written in decimal), a
+    fixed-width bytes array, or a bytes constant. Fields are concatenated as
+    given, so separators are passed as b',' and rows end with b'\\n'.
+    
+    Every field gets a width per row; cumulative widths give each field's
+    byte offsets in one output buffer and its digits are scattered there in
+    whole columns. Fields are written right to left, so the leading zeros of
+    a right-aligned number spill into the field before it, which is written
+    afterwards and overwrites them.
+    """
+    n = len(next(field for field in fields if not isinstance(field, bytes)))
+    parts = []
+    for field in fields:
+        if isinstance(field, bytes):
+            parts.append((field, len(field), 0))
+        elif field.dtype.kind == 'S':
+            parts.append((field, field.dtype.itemsize, 0))
+        else:
+            top = int(field.max()) if n else 0
+            # 32-bit division is markedly faster when the values fit
+            values = field.astype(np.uint32 if top < 2 ** 32 else np.uint64)
+            digits = len(str(top))
+            width = np.ones(n, dtype=np.int64)
+            for power in range(1, digits):
+                width += values >= 10 ** power
+            parts.append((values, width, digits))
+    
+    row_length = np.broadcast_to(sum(width for _, width, _ in parts), (n,))
+    end = np.cumsum(row_length)
+    buffer = np.empty(int(end[-1]) if n else 0, dtype=np.uint8)
+    for index in range(len(parts) - 1, -1, -1):
+        field, width, digits = parts[index]
+        start = end - width
+        if isinstance(field, bytes):
+            for offset, byte in enumerate(field):
+                buffer[start + offset] = byte
+        elif digits:
+            powers = (10 ** np.arange(digits - 1, -1, -1, dtype=np.uint64)).astype(field.dtype)
+            matrix = (field[:, None] // powers % 10).astype(np.uint8) + ord('0')
+            positions = end[:, None] - digits + np.arange(digits)
+            if index == 0:
+                # Nothing is written before the first field, so drop its padding
+                keep = np.arange(digits) >= digits - width[:, None]
+                buffer[positions[keep]] = matrix[keep]
+            else:
+                buffer[positions] = matrix
+        else:
+            buffer[start[:, None] + np.arange(width)] = field.view(np.uint8).reshape(n, width)
+        end = start
+    return buffer.tobytes()
+
+
+def sales_csv_bytes(chunk, header=False):
+    """
+    Format a sales chunk (see `iter_sales`) as CSV bytes.
+    
+    About 3-4x faster than DataFrame.to_csv, which dominates CSV generation.
+    Dates are written as YYYY-MM-DD and amounts with two decimals.
+    """
+    days = chunk['order_date'].to_numpy(dtype='datetime64[D]')
+    unique_days, day_idx = np.unique(days, return_inverse=True)
+    cents = np.rint(chunk['total_amount'].to_numpy(dtype='float64') * 100).astype(np.int64)
+    data = _format_csv_rows([
+        chunk['order_id'].to_numpy(), b',',
+        chunk['customer_id'].to_numpy(), b',',
+        chunk['product_id'].to_numpy(), b',',
+        unique_days.astype('S10')[day_idx], b',',
+        chunk['quantity'].to_numpy(), b',',
+        cents // 100, _CENTS[cents % 100], b'\n',
+    ])
+    if header:
+        data = (','.join(SALES_COLUMNS) + '\n').encode('ascii') + data
+    return data
+
+
+class SyntheticDataGenerator:
+    """
+    Generates reproducible customers, products and sales at scale.
+    
+    - Product popularity follows a Zipf law over a random product ranking.
+    - Customer activity is gamma-distributed (a few heavy buyers, many light).
+    - Daily volume has annual growth, a weekend uplift and a yearly season
+      peaking in November.
+    
+    Every column is drawn with numpy in whole chunks; sales are emitted in
+    date order with increasing order_id, like an append-only production table.
+    The same seed and settings always produce the same data.
+    """
+    
+    def __init__(self, customers=None, products=None, sales=None, start_date=None,
+                 end_date=None, seed=None, zipf_exponent=None):
+        self.n_customers = customers or DATAGEN_CUSTOMERS
+        self.n_products = products or DATAGEN_PRODUCTS
+        self.n_sales = DATAGEN_SALES if sales is None else sales
+        self.start_date = pd.Timestamp(start_date or DATAGEN_START_DATE)
+        self.end_date = pd.Timestamp(end_date or DATAGEN_END_DATE)
+        self.seed = DATAGEN_SEED if seed is None else seed
+        self.zipf_exponent = zipf_exponent or DATAGEN_ZIPF_EXPONENT
+        self._products = None
+    
+    def _rng(self, stream):
+        """Independent random stream per table, so tables do not affect each other."""
+        return np.random.default_rng([self.seed, stream])
+    
+    # ============================================
+    # Dimension Tables
+    # ============================================
+    
+    def generate_customers(self):
+        """Generate the customers table."""
+        rng = self._rng(1)
+        names = np.array(list(CITIES))
+        city = names[_inverse_cdf_sample(rng, np.array(list(CITIES.values())), self.n_customers)]
+        ids = np.arange(1, self.n_customers + 1)
+        return pd.DataFrame({
+            'customer_id': ids,
+            'customer_name': pd.Series(ids).map('Customer_{}'.format),
+            'city': city,
+            'country': 'India',
+        })
+    
+    def generate_products(self):
+        """Generate the products table (prices are log-normal around each category median)."""
+        if self._products is not None:
+            return self._products
+        
+        rng = self._rng(2)
+        categories = np.array(list(CATEGORIES))
+        shares = np.array([share for share, _ in CATEGORIES.values()])
+        medians = np.array([median for _, median in CATEGORIES.values()], dtype='float64')
+        
+        category_idx = _inverse_cdf_sample(rng, shares, self.n_products)
+        price = np.round(medians[category_idx] * rng.lognormal(0.0, 0.5, self.n_products), -1)
+        ids = np.arange(1, self.n_products + 1)
+        self._products = pd.DataFrame({
+            'product_id': ids,
+            'product_name': pd.Series(categories[category_idx]) + ' Item ' + pd.Series(ids).astype(str),
+            'category': categories[category_idx],
+            'price': np.maximum(price, 100.0),
+        })
+        return self._products
+    
+    # ============================================
+    # Sales
+    # ============================================
+    
+    def daily_weights(self):
+        """Relative sales volume per day (growth × weekly × yearly seasonality)."""
+        days = pd.date_range(self.start_date, self.end_date, freq='D')
+        years = np.arange(len(days)) / 365.25
+        growth = (1 + DATAGEN_ANNUAL_GROWTH) ** years
+        weekly = 1 + DATAGEN_WEEKLY_AMPLITUDE * (days.dayofweek.to_numpy() >= 5)
+        yearly = 1 + DATAGEN_YEARLY_AMPLITUDE * np.cos(2 * np.pi * (days.dayofyear.to_numpy() - 320) / 365.25)
+        return days, growth * weekly * yearly
+    
+    def iter_sales(self, chunk_size=None):
+        """
+        Generate sales in date-ordered chunks.
+        
+        Yields:
+            DataFrame: Columns order_id, customer_id, product_id, order_date,
+                quantity, total_amount
+        """
+        chunk_size = chunk_size or DATAGEN_CHUNK_SIZE
+        rng = self._rng(3)
+        prices = self.generate_products()['price'].to_numpy()
+        
+        days, weights = self.daily_weights()
+        per_day = rng.multinomial(self.n_sales, weights / weights.sum())
+        day_end = np.cumsum(per_day)
+        day_values = days.to_numpy(dtype='datetime64[D]')
+        
+        # Zipf popularity over a random ranking of products
+        popularity = np.empty(self.n_products)
+        popularity[rng.permutation(self.n_products)] = 1.0 / np.arange(1, self.n_products + 1) ** self.zipf_exponent
+        product_cdf = np.cumsum(popularity)
+        product_cdf /= product_cdf[-1]
+        
+        activity = rng.gamma(0.8, 1.0, self.n_customers)
+        customer_cdf = np.cumsum(activity)
+        customer_cdf /= customer_cdf[-1]
+        
+        # Separate streams per column keep product/customer draws independent of chunk size
+        product_rng, customer_rng, quantity_rng = self._rng(4), self._rng(5), self._rng(6)
+        for start in range(0, self.n_sales, chunk_size):
+            size = min(chunk_size, self.n_sales - start)
+            positions = np.arange(start, start + size)
+            day_idx = np.searchsorted(day_end, positions, side='right')
+            
+            product_idx = np.searchsorted(product_cdf, product_rng.random(size), side='right')
+            customer_idx = np.searchsorted(customer_cdf, customer_rng.random(size), side='right')
+            quantity = 1 + quantity_rng.poisson(0.4, size)
+            
+            yield pd.DataFrame({
+                'order_id': positions + 1,
+                'customer_id': customer_idx + 1,
+                'product_id': product_idx + 1,
+                'order_date': day_values[day_idx],
+                'quantity': quantity,
+                'total_amount': np.round(prices[product_idx] * quantity, 2),
+            })
+    
+    # ============================================
+    # Writers
+    # ============================================
+    
+    def write_files(self, output_dir=None, fmt='csv', chunk_size=None):
+        """
+        Write customers, products and sales to files.
+        
+        Args:
+            output_dir (Path): Target directory (default: config.DATAGEN_DIR)
+            fmt (str): 'csv' or 'parquet'
+        
+        Returns:
+            dict: Table name → file path
+        """
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported format: {fmt}")
+        ensure_directories()
+        output_dir = Path(output_dir or DATAGEN_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        paths = {}
+        for table, df in (('customers', self.generate_customers()), ('products', self.generate_products())):
+            paths[table] = output_dir / f"{table}.{fmt}"
+            if fmt == 'parquet':
+                df.to_parquet(paths[table], index=False)
+            else:
+                df.to_csv(paths[table], index=False)
+        
+        paths['sales'] = output_dir / f"sales.{fmt}"
+        started = time.perf_counter()
+        rows = 0
+        if fmt == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ValueError("Parquet output requires pyarrow (pip install pyarrow)") from e
+            writer = None
+            try:
+                for chunk in self.iter_sales(chunk_size):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = writer or pq.ParquetWriter(paths['sales'], table.schema, compression='snappy')
+                    writer.write_table(table)
+                    rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(paths['sales'], 'wb') as handle:
+                for chunk in self.iter_sales(chunk_size):
+                    handle.write(sales_csv_bytes(chunk, header=(rows == 0)))
+                    rows += len(chunk)
+        
+        self._log_rate('sales', rows, started, paths['sales'].name)
+        return paths
+    
+    def load_database(self, db_manager=None, chunk_size=None, use_load_data=None):
+        """
+        Load the generated tables into MySQL.
+        
+        Each sales chunk is written to a temporary CSV and bulk-loaded with
+        LOAD DATA LOCAL INFILE; if the server refuses local infile, batched
+        multi-row INSERTs are used instead.
+        
+        Returns:
+            dict: Table name → rows loaded
+        
+        Raises:
+            ValueError: If customers, products or sales already hold rows
+                (generated ids would collide with them)
+        """
+        if db_manager is None:
+            from db import get_db_manager
+            db_manager = get_db_manager()
+        use_load_data = DATAGEN_USE_LOAD_DATA if use_load_data is None else use_load_data
+        
+        non_empty = [
+            table for table in ('customers', 'products', 'sales')
+            if db_manager.execute_query(f"SELECT 1 FROM {table} LIMIT 1")
+        ]
+        if non_empty:
+            raise ValueError(
+                f"Synthetic data needs empty tables; truncate {', '.join(non_empty)} first"
+            )
+        
+        counts = {}
+        tables = [('customers', [self.generate_customers()]), ('products', [self.generate_products()]),
+                  ('sales', self.iter_sales(chunk_size))]
+        with tempfile.TemporaryDirectory() as tmp:
+            for table, chunks in tables:
+                started = time.perf_counter()
+                rows = 0
+                for chunk in chunks:
+                    columns = list(chunk.columns)
+                    if use_load_data:
+                        path = Path(tmp) / f"{table}.csv"
+                        if table == 'sales':
+                            path.write_bytes(sales_csv_bytes(chunk))
+                        else:
+                            chunk.to_csv(path, index=False, header=False, lineterminator='\n')
+                        try:
+                            rows += db_manager.load_data_infile(table, path, columns)
+                            continue
+                        except Exception as e:
+                            logger.warning(f"⚠️  LOAD DATA unavailable ({e}); falling back to batched INSERT")
+                            use_load_data = False
+                    rows += db_manager.execute_insert_rows(
+                        table, columns, chunk.astype(object).itertuples(index=False, name=None)
+                    )
+                counts[table] = rows
+                self._log_rate(table, rows, started, 'database')
+        return counts
+    
+    @staticmethod
+    def _log_rate(table, rows, started, target):
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"✓ Generated {rows:,} {table} rows → {target} in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    generator = SyntheticDataGenerator(sales=1000000)
+    started = time.perf_counter()
+    rows = sum(len(chunk) for chunk in generator.iter_sales())
+    elapsed = time.perf_counter() - started
+    print(f"✓ Generated {rows:,} sales in memory in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
@@ -3,23 +3,58 @@
 # Handles MySQL connections and operations
 # ============================================
 
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 import mysql.connector
 from mysql.connector import Error
-from config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT, KILL_QUERY_GRACE_SECONDS
+from admission import QueryTimeoutError, QueryCancelledError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# MySQL error codes for interrupted statements
+ER_QUERY_INTERRUPTED = 1317
+ER_QUERY_TIMEOUT = 3024
+
+LEADING_SELECT_PATTERN = re.compile(r'^\s*SELECT\b', re.IGNORECASE)
+
+@lru_cache(maxsize=512)
+def apply_max_execution_time(sql, timeout_ms):
+    """
+    Add a MAX_EXECUTION_TIME optimizer hint to a SELECT statement.
+    
+    Cached per (SQL, timeout): named queries hit the same few combinations.
+    
+    Args:
+        sql (str): SQL statement
+        timeout_ms (int): Server-side limit in milliseconds
+    
+    Returns:
+        str: SQL with the hint (unchanged if not a SELECT or no timeout)
+    """
+    if not timeout_ms:
+        return sql
+    return LEADING_SELECT_PATTERN.sub(
+        f"SELECT /*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */", sql, count=1
+    )
+
 class DatabaseManager:
     """Manages MySQL database connections."""
     
-    def __init__(self):
+    def __init__(self, host=None, user=None, password=None, database=None, port=None,
+                 name=None):
         self.connection = None
-        self.host = DB_HOST
-        self.user = DB_USER
-        self.password = DB_PASSWORD
-        self.database = DB_NAME
-        self.port = DB_PORT
+        self.host = host or DB_HOST
+        self.user = user or DB_USER
+        self.password = password if password is not None else DB_PASSWORD
+        self.database = database or DB_NAME
+        self.port = port or DB_PORT
+        self.name = name or 'primary'
+        self._statements = {}  # statement key -> (sql, prepared cursor)
+        self.statement_stats = {'prepares': 0, 'reuses': 0}
     
     def connect(self):
         """Establish connection to MySQL database."""
@@ -32,7 +67,9 @@ class DatabaseManager:
                 port=self.port,
                 autocommit=True
             )
-            logger.info(f"✓ Connected to MySQL database: {self.database}")
+            # Prepared statements belong to the old session; re-prepare lazily
+            self._statements = {}
+            logger.info(f"✓ Connected to MySQL database: {self.database} ({self.name})")
             return self.connection
         except Error as e:
             logger.error(f"✗ Database connection failed: {e}")
@@ -41,20 +78,35 @@ class DatabaseManager:
     def disconnect(self):
         """Close database connection."""
         if self.connection and self.connection.is_connected():
+            self.close_statements()
             self.connection.close()
             logger.info("✓ Disconnected from database")
     
+    def reset_connection(self):
+        """Drop a (possibly broken) connection without raising; the next call reconnects."""
+        connection, self.connection = self.connection, None
+        self._statements = {}
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        logger.info(f"🔌 Connection reset ({self.name})")
+    
     def is_connected(self):
         """Check if connection is active."""
         return self.connection and self.connection.is_connected()
     
-    def execute_query(self, sql, params=None):
+    def execute_query(self, sql, params=None, timeout_ms=None, cancel_token=None):
         """
         Execute a SELECT query and return results.
         
         Args:
             sql (str): SQL query string
             params (dict): Parameters for parameterized query
+            timeout_ms (int): Client-side limit; the query is killed after
+                timeout + KILL_QUERY_GRACE_SECONDS
+            cancel_token (CancellationToken): Kills the query when cancelled
         
         Returns:
             list: List of result rows (tuples)
@@ -63,21 +115,225 @@ class DatabaseManager:
             self.connect()
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
-            if params:
-                cursor.execute(sql, params)
+            with self._interruptible(timeout_ms, cancel_token):
+                cursor = self.connection.cursor(dictionary=True)
+                
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                
+                results = cursor.fetchall()
+                cursor.close()
+            logger.info(f"✓ Query executed successfully. Rows: {len(results)}")
+            return results
+        
+        except (Error, QueryTimeoutError, QueryCancelledError) as e:
+            logger.error(f"✗ Query execution failed: {e}")
+            raise
+    
+    def iter_query(self, sql, params=None, chunk_size=10000, timeout_ms=None, cancel_token=None):
+        """
+        Stream a SELECT query in chunks from an unbuffered cursor.
+        
+        Only one chunk of rows is held in memory at a time. The connection is
+        busy until the generator is exhausted or closed. A stream stopped early
+        (closed generator, error, cancellation) is not drained: the statement
+        is killed and the connection dropped, and the next call reconnects.
+        
+        `timeout_ms` bounds the time to the first chunk: once rows are flowing
+        the watchdog is disarmed, so a slow consumer is never billed for it.
+        
+        Args:
+            sql (str): SQL query string
+            params (dict): Parameters for parameterized query
+            chunk_size (int): Rows per chunk
+            timeout_ms (int): Client-side limit (see execute_query)
+            cancel_token (CancellationToken): Kills the query when cancelled
+        
+        Yields:
+            list: Chunk of result rows (dicts)
+        """
+        if not self.is_connected():
+            self.connect()
+        
+        total = 0
+        try:
+            with self._interruptible(timeout_ms, cancel_token) as disarm:
+                cursor = self.connection.cursor(dictionary=True, buffered=False)
+                try:
+                    if params:
+                        cursor.execute(sql, params)
+                    else:
+                        cursor.execute(sql)
+                    
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        disarm()
+                        if not rows:
+                            break
+                        total += len(rows)
+                        yield rows
+                finally:
+                    self._close_stream(cursor)
+            logger.info(f"✓ Streamed query executed successfully. Rows: {total}")
+        
+        except (Error, QueryTimeoutError, QueryCancelledError) as e:
+            logger.error(f"✗ Streamed query failed after {total} rows: {e}")
+            raise
+    
+    def _close_stream(self, cursor):
+        """
+        Release an unbuffered cursor without reading the rest of its result.
+        
+        Draining unread rows would cost as much as finishing the stream. Never
+        raises, so it cannot replace an exception that is already propagating.
+        """
+        try:
+            if not self.connection.unread_result:
+                cursor.close()
+                return
+            self.kill_query(self.connection.connection_id)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not close stream cleanly: {e}")
+        self.reset_connection()
+    
+    def execute_prepared(self, statement_key, sql, params=None, timeout_ms=None,
+                         cancel_token=None):
+        """
+        Execute a SELECT through a server-side prepared statement.
+        
+        Statements are cached per connection by `statement_key`. A statement is
+        re-prepared when the SQL for the key changes or after a reconnect.
+        
+        Args:
+            statement_key (str): Cache key (usually the query name)
+            sql (str): SQL using `?` positional placeholders
+            params (tuple): Positional parameter values
+            timeout_ms (int): Client-side limit (see execute_query)
+            cancel_token (CancellationToken): Kills the query when cancelled
+        
+        Returns:
+            list: List of result rows (dicts)
+        """
+        if not self.is_connected():
+            self.connect()
+        
+        try:
+            cached = self._statements.get(statement_key)
+            if cached is not None and cached[0] == sql:
+                cursor = cached[1]
+                self.statement_stats['reuses'] += 1
             else:
-                cursor.execute(sql)
+                if cached is not None:
+                    cached[1].close()
+                cursor = self.connection.cursor(prepared=True)
+                self._statements[statement_key] = (sql, cursor)
+                self.statement_stats['prepares'] += 1
+                logger.info(f"🧩 Prepared statement: {statement_key}")
             
-            results = cursor.fetchall()
-            cursor.close()
-            logger.info(f"✓ Query executed successfully. Rows: {len(results)}")
+            with self._interruptible(timeout_ms, cancel_token):
+                cursor.execute(sql, tuple(params or ()))
+                columns = cursor.column_names
+                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            logger.info(f"✓ Prepared query executed successfully. Rows: {len(results)}")
             return results
         
+        except (Error, QueryTimeoutError, QueryCancelledError) as e:
+            # Drop the statement so the next call prepares it again
+            cached = self._statements.pop(statement_key, None)
+            if cached is not None:
+                try:
+                    cached[1].close()
+                except Error:
+                    pass
+            logger.error(f"✗ Prepared query execution failed: {e}")
+            raise
+    
+    @contextmanager
+    def _interruptible(self, timeout_ms=None, cancel_token=None):
+        """
+        Run a statement that can be killed by a watchdog timer or a cancel token.
+        
+        Interrupted statements surface as QueryTimeoutError / QueryCancelledError
+        instead of a raw MySQL error. The context yields a `disarm` callable that
+        stops the watchdog early (the cancel token stays registered).
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        
+        if not timeout_ms and cancel_token is None:
+            yield lambda: None
+            return
+        
+        connection_id = self.connection.connection_id
+        reason = {}
+        
+        def kill(why):
+            reason.setdefault('why', why)
+            self.kill_query(connection_id)
+        
+        watchdog = None
+        if timeout_ms:
+            watchdog = threading.Timer(timeout_ms / 1000 + KILL_QUERY_GRACE_SECONDS, kill, args=('timeout',))
+            watchdog.daemon = True
+            watchdog.start()
+        
+        on_cancel = lambda: kill('cancelled')
+        if cancel_token is not None:
+            cancel_token.register(on_cancel)
+        
+        def disarm():
+            if watchdog is not None:
+                watchdog.cancel()
+        
+        try:
+            yield disarm
         except Error as e:
-            logger.error(f"✗ Query execution failed: {e}")
+            if e.errno == ER_QUERY_TIMEOUT or reason.get('why') == 'timeout':
+                raise QueryTimeoutError(f"Query exceeded {timeout_ms} ms") from e
+            if e.errno == ER_QUERY_INTERRUPTED and reason.get('why') == 'cancelled':
+                raise QueryCancelledError("Query cancelled") from e
             raise
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            if cancel_token is not None:
+                cancel_token.unregister(on_cancel)
+    
+    def kill_query(self, connection_id):
+        """
+        Abort the statement running on another connection (KILL QUERY).
+        
+        A short-lived side connection is used because the target connection
+        is blocked waiting for its result.
+        """
+        try:
+            side_connection = mysql.connector.connect(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                database=self.database,
+                port=self.port
+            )
+            try:
+                cursor = side_connection.cursor()
+                cursor.execute(f"KILL QUERY {int(connection_id)}")
+                cursor.close()
+            finally:
+                side_connection.close()
+            logger.warning(f"⛔ Killed query on connection {connection_id}")
+        except Error as e:
+            logger.error(f"✗ KILL QUERY failed for connection {connection_id}: {e}")
+    
+    def close_statements(self):
+        """Deallocate all cached prepared statements on this connection."""
+        for _, cursor in self._statements.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+        self._statements = {}
     
     def execute_insert_bulk(self, table, records):
         """
@@ -116,6 +372,80 @@ class DatabaseManager:
             logger.error(f"✗ Bulk insert failed: {e}")
             raise
     
+    def execute_insert_rows(self, table, columns, rows, batch_size=10000):
+        """
+        Insert row tuples in batches.
+        
+        Args:
+            table (str): Table name
+            columns (list): Column names matching the tuple order
+            rows (iterable): Row tuples
+            batch_size (int): Rows per executemany call (sent as one multi-row INSERT)
+        
+        Returns:
+            int: Rows inserted
+        """
+        if not self.is_connected():
+            self.connect()
+        
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        inserted = 0
+        cursor = self.connection.cursor()
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    cursor.executemany(sql, batch)
+                    inserted += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                inserted += len(batch)
+            self.connection.commit()
+        except Error as e:
+            logger.error(f"✗ Batch insert into {table} failed: {e}")
+            raise
+        finally:
+            cursor.close()
+        return inserted
+    
+    def load_data_infile(self, table, path, columns):
+        """
+        Bulk-load a headerless CSV file with LOAD DATA LOCAL INFILE.
+        
+        Uses a side connection with allow_local_infile; the server must have
+        local_infile enabled.
+        
+        Returns:
+            int: Rows loaded
+        """
+        side_connection = mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            port=self.port,
+            allow_local_infile=True
+        )
+        try:
+            cursor = side_connection.cursor()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (str(path),)
+            )
+            side_connection.commit()
+            loaded = cursor.rowcount
+            cursor.close()
+            return loaded
+        except Error as e:
+            logger.error(f"✗ LOAD DATA into {table} failed: {e}")
+            raise
+        finally:
+            side_connection.close()
+    
     def get_connection(self):
         """Get the active connection object."""
         if not self.is_connected():
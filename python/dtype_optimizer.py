@@ -0,0 +1,191 @@
+# ============================================
+# Dtype Optimizer Module
+# Categorical encoding and numeric downcasting of results
+# ============================================
+
+import logging
+import threading
+from decimal import Decimal
+import pandas as pd
+from config import CATEGORICAL_COLUMNS, CATEGORICAL_MAX_UNIQUE_RATIO, CATEGORY_CACHE_MAX_VALUES
+
+logger = logging.getLogger(__name__)
+
+class CategoryCache:
+    """
+    Shared category dictionaries for string columns.
+    
+    Every query that returns e.g. a `city` column is encoded against the
+    same category list, so results from different queries can be merged,
+    concatenated and grouped without falling back to object strings.
+    New values are appended, which keeps existing codes stable.
+    
+    The cache is shared by every executor and server thread, so updates
+    happen under a lock. A column whose dictionary would grow past
+    `max_values` (e.g. customer names) leaves the cache: its results are
+    encoded against their own values, so one call never pays for every
+    value ever seen.
+    """
+    
+    def __init__(self, max_values=None):
+        self.max_values = CATEGORY_CACHE_MAX_VALUES if max_values is None else max_values
+        self.categories = {}
+        self.uncached = set()  # Columns that outgrew max_values
+        self._lock = threading.Lock()
+    
+    def encode(self, column, series):
+        """
+        Encode a string Series as a Categorical using the shared dictionary.
+        
+        Args:
+            column (str): Column name (dictionary key)
+            series (Series): Object Series to encode
+        
+        Returns:
+            Series: Categorical Series
+        """
+        uniques = pd.Index(series.dropna().unique())
+        with self._lock:
+            known = None if column in self.uncached else self.categories.get(column)
+            if known is None:
+                known = uniques
+            else:
+                new_values = uniques.difference(known, sort=False)
+                if len(new_values):
+                    known = known.append(new_values)
+            
+            if column not in self.uncached:
+                if self.max_values and len(known) > self.max_values:
+                    logger.info(
+                        f"🗂️  '{column}' has over {self.max_values:,} values; "
+                        f"no longer sharing its categories"
+                    )
+                    self.uncached.add(column)
+                    self.categories.pop(column, None)
+                    known = uniques
+                else:
+                    self.categories[column] = known
+        
+        # Index objects are immutable, so `known` is safe to use outside the lock
+        return pd.Series(
+            pd.Categorical(series, categories=known),
+            index=series.index,
+            name=series.name
+        )
+    
+    def get_categories(self, column):
+        """Get the shared category list for a column (or None)."""
+        with self._lock:
+            return self.categories.get(column)
+    
+    def clear(self):
+        """Drop all cached dictionaries."""
+        with self._lock:
+            self.categories = {}
+            self.uncached = set()
+
+
+def _is_string_column(series):
+    """Check whether an object Series holds only strings."""
+    sample = series.dropna()
+    if sample.empty:
+        return False
+    return sample.map(type).eq(str).all()
+
+
+def _is_decimal_column(series):
+    """Check whether an object Series holds Decimal values (MySQL DECIMAL/SUM)."""
+    sample = series.dropna()
+    if sample.empty:
+        return False
+    return sample.map(type).eq(Decimal).all()
+
+
+def optimize_dataframe(df, category_cache=None, categorical_columns=None,
+                       max_unique_ratio=None):
+    """
+    Convert a query result to compact dtypes.
+    
+    - String columns listed in `categorical_columns`, or whose unique/row
+      ratio is at most `max_unique_ratio`, become Categoricals.
+    - Decimal columns (money) become float64.
+    - Integer columns (counts, ids) are downcast to the smallest integer type.
+    
+    Args:
+        df (DataFrame): Query result
+        category_cache (CategoryCache): Shared dictionary (default: global cache)
+        categorical_columns (list): Columns always encoded as categorical
+        max_unique_ratio (float): Cardinality threshold for other string columns
+    
+    Returns:
+        DataFrame: Optimized copy of the result
+    """
+    if df.empty:
+        return df
+    
+    cache = category_cache or get_category_cache()
+    forced = set(CATEGORICAL_COLUMNS if categorical_columns is None else categorical_columns)
+    ratio = CATEGORICAL_MAX_UNIQUE_RATIO if max_unique_ratio is None else max_unique_ratio
+    
+    optimized = df.copy()
+    for column in optimized.columns:
+        series = optimized[column]
+        
+        if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            if _is_string_column(series):
+                if column in forced or series.nunique() <= ratio * len(series):
+                    optimized[column] = cache.encode(column, series)
+            elif _is_decimal_column(series):
+                optimized[column] = series.astype('float64')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            optimized[column] = pd.to_numeric(series, downcast='integer')
+    
+    return optimized
+
+
+def memory_usage_report(df_before, df_after):
+    """
+    Compare deep memory usage of two DataFrames.
+    
+    Returns:
+        dict: 'before_bytes', 'after_bytes', 'saved_bytes', 'saved_pct'
+    """
+    before = int(df_before.memory_usage(deep=True).sum())
+    after = int(df_after.memory_usage(deep=True).sum())
+    saved = before - after
+    return {
+        'before_bytes': before,
+        'after_bytes': after,
+        'saved_bytes': saved,
+        'saved_pct': (saved / before * 100) if before else 0.0,
+    }
+
+
+# Global category cache instance
+_category_cache = None
+_category_cache_lock = threading.Lock()
+
+def get_category_cache():
+    """Get or create global category cache."""
+    global _category_cache
+    with _category_cache_lock:
+        if _category_cache is None:
+            _category_cache = CategoryCache()
+        return _category_cache
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    rows = 100000
+    cities = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai']
+    df = pd.DataFrame({
+        'city': [cities[i % len(cities)] for i in range(rows)],
+        'total_spent': [Decimal('1234.50')] * rows,
+        'order_count': list(range(rows)),
+    })
+    
+    df_opt = optimize_dataframe(df)
+    report = memory_usage_report(df, df_opt)
+    print(df_opt.dtypes)
+    print(f"✓ Memory: {report['before_bytes']:,} → {report['after_bytes']:,} bytes "
+          f"(saved {report['saved_pct']:.1f}%)")
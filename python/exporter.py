@@ -0,0 +1,268 @@
+# ============================================
+# Export Module
+# Chunked, parallel CSV/Parquet export of query results
+# ============================================
+
+import os
+import gzip
+import logging
+from decimal import Decimal
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import (
+    OUTPUT_DIR, EXPORT_FORMAT, EXPORT_CHUNK_SIZE, EXPORT_MAX_WORKERS,
+    EXPORT_SCHEMA_PEEK_CHUNKS, LOG_PREVIEW_ROWS, ensure_directories
+)
+from db import DatabaseManager
+from query_loader import get_query_loader
+from query_executor import QueryExecutor
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'csv': 'csv',
+    'csv.gz': 'csv.gz',
+    'parquet': 'parquet',
+}
+
+def format_preview(df, max_rows=None):
+    """
+    Render the head of a DataFrame for logging.
+    
+    Args:
+        df (DataFrame): Result to preview
+        max_rows (int): Rows to render (default: config.LOG_PREVIEW_ROWS)
+    
+    Returns:
+        str: Bounded text preview
+    """
+    max_rows = LOG_PREVIEW_ROWS if max_rows is None else max_rows
+    preview = df.head(max_rows).to_string()
+    if len(df) > max_rows:
+        preview += f"\n... ({len(df) - max_rows:,} more rows)"
+    return preview
+
+
+def _normalize_chunk(df):
+    """Convert Decimal columns to float so every chunk has a stable schema."""
+    for column in df.columns:
+        if df[column].dtype == object:
+            sample = df[column].dropna()
+            if not sample.empty and isinstance(sample.iloc[0], Decimal):
+                df[column] = df[column].astype('float64')
+    return df
+
+
+def _temp_path(path):
+    """Sibling file a sink writes to until the export succeeds."""
+    return path.with_suffix(path.suffix + '.tmp')
+
+
+class _CsvSink:
+    """
+    Appends chunks to a (optionally gzip-compressed) CSV file.
+    
+    Rows go to a temporary file that replaces `path` only on close(), so a
+    failed or cancelled export never leaves a truncated file behind.
+    """
+    
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.temp_path = _temp_path(path)
+        self.handle = (gzip.open(self.temp_path, 'wt', newline='') if compress
+                       else open(self.temp_path, 'w', newline=''))
+        self.header_written = False
+    
+    def write(self, df):
+        df.to_csv(self.handle, index=False, header=not self.header_written)
+        self.header_written = True
+    
+    def close(self):
+        """Finish the file and move it into place."""
+        self.handle.close()
+        os.replace(self.temp_path, self.path)
+    
+    def discard(self):
+        """Drop the partial file (the previous export at `path`, if any, is kept)."""
+        try:
+            self.handle.close()
+        finally:
+            self.temp_path.unlink(missing_ok=True)
+
+
+class _ParquetSink:
+    """
+    Appends chunks as row groups of a single Parquet file.
+    
+    The file schema takes each column's type from its first non-null values,
+    so a column that is all NULL in the first chunk does not get Arrow's
+    `null` type (which later chunks could not be written against). Chunks are
+    held back until every column is typed, up to EXPORT_SCHEMA_PEEK_CHUNKS;
+    columns still untyped then are written as strings.
+    
+    Like _CsvSink, it writes to a temporary file that replaces `path` on close().
+    """
+    
+    def __init__(self, path, peek_chunks=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.temp_path = _temp_path(path)
+        self.peek_chunks = peek_chunks or EXPORT_SCHEMA_PEEK_CHUNKS
+        self.writer = None
+        self.pending = []
+    
+    def _resolve_schema(self, force=False):
+        fields = []
+        for index, field in enumerate(self.pending[0].schema):
+            field_type = next(
+                (table.schema.field(index).type for table in self.pending
+                 if not self.pa.types.is_null(table.schema.field(index).type)),
+                None
+            )
+            if field_type is None:
+                if not force:
+                    return None
+                field_type = self.pa.string()
+            fields.append(self.pa.field(field.name, field_type))
+        return self.pa.schema(fields)
+    
+    def _flush_pending(self, force=False):
+        schema = self._resolve_schema(force=force or len(self.pending) >= self.peek_chunks)
+        if schema is None:
+            return
+        self.writer = self.pq.ParquetWriter(self.temp_path, schema, compression='snappy')
+        for table in self.pending:
+            self.writer.write_table(table.cast(schema))
+        self.pending = []
+    
+    def write(self, df):
+        if self.writer is not None:
+            table = self.pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False)
+            self.writer.write_table(table)
+            return
+        self.pending.append(self.pa.Table.from_pandas(df, preserve_index=False))
+        self._flush_pending()
+    
+    def close(self):
+        """Finish the file and move it into place (no file for an empty result)."""
+        if self.writer is None and self.pending:
+            self._flush_pending(force=True)
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.temp_path, self.path)
+    
+    def discard(self):
+        """Drop the partial file (the previous export at `path`, if any, is kept)."""
+        try:
+            if self.writer is not None:
+                self.writer.close()
+        finally:
+            self.temp_path.unlink(missing_ok=True)
+
+
+class ResultExporter:
+    """Streams named query results straight from the cursor to files."""
+    
+    def __init__(self, output_dir=None, chunk_size=None, max_workers=None):
+        self.output_dir = Path(output_dir or OUTPUT_DIR)
+        self.chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+        self.max_workers = max_workers or EXPORT_MAX_WORKERS
+        self.query_loader = get_query_loader()
+    
+    def get_output_path(self, query_name, fmt):
+        """Get the output file path for a query and format."""
+        return self.output_dir / f"{query_name}.{EXPORT_FORMATS[fmt]}"
+    
+    def _open_sink(self, path, fmt):
+        if fmt == 'parquet':
+            return _ParquetSink(path)
+        return _CsvSink(path, compress=(fmt == 'csv.gz'))
+    
+    def export(self, query_name, params=None, fmt=None, path=None, executor=None):
+        """
+        Export one query result in chunks.
+        
+        Args:
+            query_name (str): Name of the query in queries.json
+            params (dict): Query parameters
+            fmt (str): 'csv', 'csv.gz' or 'parquet' (default: config.EXPORT_FORMAT)
+            path (Path): Output file (default: OUTPUT_DIR/<query_name>.<ext>)
+            executor (QueryExecutor): Executor to use (default: one with its own connection)
+        
+        Returns:
+            dict: 'query', 'path', 'rows', 'chunks'
+        """
+        fmt = fmt or EXPORT_FORMAT
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        
+        ensure_directories()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = Path(path or self.get_output_path(query_name, fmt))
+        
+        owns_connection = executor is None
+        if owns_connection:
+            executor = QueryExecutor(DatabaseManager(), self.query_loader)
+        
+        rows, chunks = 0, 0
+        try:
+            sink = self._open_sink(path, fmt)
+            try:
+                for chunk in executor.execute_chunked(query_name, params, chunk_size=self.chunk_size):
+                    sink.write(_normalize_chunk(chunk))
+                    rows += len(chunk)
+                    chunks += 1
+                sink.close()
+            except BaseException:
+                sink.discard()
+                raise
+        finally:
+            if owns_connection:
+                executor.db_manager.disconnect()
+        
+        logger.info(f"✓ Exported {query_name}: {rows:,} rows in {chunks} chunks → {path.name}")
+        return {'query': query_name, 'path': path, 'rows': rows, 'chunks': chunks}
+    
+    def export_many(self, jobs, fmt=None):
+        """
+        Export several queries in parallel, one connection per worker.
+        
+        Args:
+            jobs (list): Query names or (query_name, params) tuples
+            fmt (str): Output format for all jobs
+        
+        Returns:
+            tuple: (export summaries, {query name: exception} for failed jobs)
+        """
+        normalized = [(job, None) if isinstance(job, str) else tuple(job) for job in jobs]
+        summaries, failures = [], {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.export, query_name, params, fmt): query_name
+                for query_name, params in normalized
+            }
+            for future in as_completed(futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as e:
+                    logger.error(f"✗ Export failed for {futures[future]}: {e}")
+                    failures[futures[future]] = e
+        
+        return summaries, failures
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    exporter = ResultExporter()
+    try:
+        exporter.export_many(['customer_segment_analysis', 'daily_sales_trend'], fmt='csv.gz')
+    except Exception as e:
+        print(f"Note: Database must be populated first. Error: {e}")
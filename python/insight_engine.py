@@ -0,0 +1,221 @@
+# ============================================
+# Insight Engine Module
+# Vectorized summary statistics over any query result
+# ============================================
+
+import logging
+import numpy as np
+import pandas as pd
+from config import ANOMALY_Z_THRESHOLD, PARETO_SHARE, INSIGHT_MAX_SEGMENTS
+
+logger = logging.getLogger(__name__)
+
+# Measures formatted as currency in rendered insights
+MONEY_HINTS = ('sales', 'revenue', 'spent', 'amount', 'price', 'value')
+
+ALL_SEGMENTS = '__all__'
+
+class InsightEngine:
+    """
+    Computes insight statistics for every (segment, measure) pair in one pass.
+    
+    Columns come from the query's declaration in queries.json:
+        "dimensions": segment columns followed by the label column
+                      (e.g. ["city", "customer_name"] → one segment per city,
+                      customers are the labelled items)
+        "measures":   numeric columns to summarize
+        "time_column": optional column used to order rows for growth
+    
+    All statistics are computed with groupby/transform operations, so the
+    cost is the same whether there is one segment or thousands.
+    """
+    
+    def summarize(self, df, measures=None, dimensions=None, time_column=None):
+        """
+        Summarize a result per segment and measure.
+        
+        Args:
+            df (DataFrame): Query result
+            measures (list): Numeric columns (default: all numeric columns)
+            dimensions (list): Segment columns + label column (default: non-numeric columns)
+            time_column (str): Column ordering rows for period-over-period growth
+        
+        Returns:
+            DataFrame: One row per segment and measure with columns
+                count, total, mean, peak_label, peak_value, peak_share,
+                trough_label, trough_value, growth_pct, pareto_items_pct,
+                anomalies
+        """
+        if df.empty:
+            return pd.DataFrame()
+        
+        if dimensions is None:
+            dimensions = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+        dimensions = [c for c in dimensions if c in df.columns]
+        if measures is None:
+            measures = [c for c in df.columns if c not in dimensions and pd.api.types.is_numeric_dtype(df[c])]
+        measures = [c for c in measures if c in df.columns]
+        
+        label = dimensions[-1] if dimensions else None
+        segment_keys = dimensions[:-1] if len(dimensions) > 1 else []
+        
+        base = df[dimensions].copy()
+        if not segment_keys:
+            base[ALL_SEGMENTS] = ALL_SEGMENTS
+            segment_keys = [ALL_SEGMENTS]
+        if label is None:
+            base['__row__'] = np.arange(len(df))
+            label = '__row__'
+        if time_column and time_column in df.columns:
+            if time_column not in base.columns:
+                base[time_column] = df[time_column]
+            order = base.sort_values(segment_keys + [time_column], kind='stable').index
+        else:
+            time_column = None
+            order = base.index
+        
+        summaries = []
+        for measure in measures:
+            frame = base.loc[order].copy()
+            frame['value'] = pd.to_numeric(df.loc[order, measure], errors='coerce').astype('float64')
+            frame = frame[frame['value'].notna()]
+            if frame.empty:
+                continue
+            summaries.append(self._summarize_measure(frame, segment_keys, label, time_column, measure))
+        
+        if not summaries:
+            return pd.DataFrame()
+        return pd.concat(summaries, ignore_index=True)
+    
+    def _summarize_measure(self, frame, keys, label, time_column, measure):
+        """Compute all statistics for one measure across all segments."""
+        grouped = frame.groupby(keys, sort=False, observed=True)['value']
+        
+        stats = grouped.agg(['count', 'sum', 'mean', 'std'])
+        stats.columns = ['count', 'total', 'mean', 'std']
+        
+        # Peak and trough items
+        idx_max = grouped.idxmax()
+        idx_min = grouped.idxmin()
+        stats['peak_label'] = frame.loc[idx_max.values, label].values
+        stats['peak_value'] = frame.loc[idx_max.values, 'value'].values
+        stats['trough_label'] = frame.loc[idx_min.values, label].values
+        stats['trough_value'] = frame.loc[idx_min.values, 'value'].values
+        stats['peak_share'] = stats['peak_value'] / stats['total'].where(stats['total'] != 0)
+        
+        # Period-over-period growth of the latest period
+        if time_column:
+            frame = frame.assign(previous=grouped.shift(1))
+            latest = frame.groupby(keys, sort=False, observed=True).tail(1).set_index(keys)
+            growth = (latest['value'] - latest['previous']) / latest['previous'].abs().where(latest['previous'] != 0)
+            stats['growth_pct'] = (growth * 100).reindex(stats.index)
+        else:
+            stats['growth_pct'] = np.nan
+        
+        # Pareto concentration: share of items needed to reach PARETO_SHARE of the total
+        ranked = frame.sort_values('value', ascending=False, kind='stable')
+        ranked_groups = ranked.groupby(keys, sort=False, observed=True)['value']
+        totals = ranked_groups.transform('sum')
+        share_before = (ranked_groups.cumsum() - ranked['value']) / totals.where(totals > 0)
+        needed = (share_before < PARETO_SHARE).groupby([ranked[k] for k in keys], sort=False, observed=True).sum()
+        stats['pareto_items_pct'] = (needed.reindex(stats.index) / stats['count'] * 100).where(stats['total'] > 0)
+        
+        # Anomalies: |z-score| above threshold within the segment
+        mean = grouped.transform('mean')
+        std = grouped.transform('std')
+        z_scores = (frame['value'] - mean) / std.where(std > 0)
+        anomalies = (z_scores.abs() > ANOMALY_Z_THRESHOLD).groupby(
+            [frame[k] for k in keys], sort=False, observed=True
+        ).sum()
+        stats['anomalies'] = anomalies.reindex(stats.index).fillna(0).astype(int)
+        
+        stats = stats.drop(columns='std').reset_index()
+        stats.insert(len(keys), 'measure', measure)
+        return stats
+    
+    # ============================================
+    # Rendering
+    # ============================================
+    
+    @staticmethod
+    def _format_value(measure, value):
+        if pd.isna(value):
+            return 'N/A'
+        if any(hint in measure for hint in MONEY_HINTS):
+            return f"₹{value:,.2f}"
+        return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+    
+    def render_markdown(self, summary, title, max_segments=None):
+        """
+        Render a summary as markdown bullet points.
+        
+        Only the `max_segments` largest segments (by total of the first
+        measure) are rendered; the rest are counted.
+        
+        Returns:
+            str: Markdown text
+        """
+        if summary.empty:
+            return f"No data available for {title}."
+        
+        max_segments = max_segments or INSIGHT_MAX_SEGMENTS
+        keys = list(summary.columns[:list(summary.columns).index('measure')])
+        segmented = keys != [ALL_SEGMENTS]
+        
+        first_measure = summary['measure'].iloc[0]
+        ranking = summary[summary['measure'] == first_measure].sort_values('total', ascending=False)
+        shown = ranking[keys].head(max_segments)
+        # Left side sets the order, so segments render by rank
+        rows = shown.merge(summary, on=keys, how='inner', sort=False)
+        
+        lines = [f"🔎 **{title}**"]
+        if segmented:
+            lines.append(f"- Segments: {len(ranking)} (showing top {len(shown)} by {first_measure})")
+        
+        for segment, segment_rows in rows.groupby(keys, sort=False, observed=True):
+            indent = ''
+            if segmented:
+                name = ' × '.join(str(v) for v in (segment if isinstance(segment, tuple) else (segment,)))
+                lines.append(f"- **{name}**")
+                indent = '  '
+            for _, row in segment_rows.iterrows():
+                m = row['measure']
+                parts = [
+                    f"total {self._format_value(m, row['total'])}",
+                    f"mean {self._format_value(m, row['mean'])}",
+                    f"peak {row['peak_label']} ({self._format_value(m, row['peak_value'])}, "
+                    f"{row['peak_share'] * 100:.1f}% of total)" if pd.notna(row['peak_share'])
+                    else f"peak {row['peak_label']}",
+                    f"trough {row['trough_label']} ({self._format_value(m, row['trough_value'])})",
+                ]
+                if pd.notna(row['growth_pct']):
+                    parts.append(f"latest growth {row['growth_pct']:+.1f}%")
+                if pd.notna(row['pareto_items_pct']):
+                    parts.append(f"{row['pareto_items_pct']:.0f}% of items make {PARETO_SHARE * 100:.0f}% of total")
+                if row['anomalies']:
+                    parts.append(f"{row['anomalies']} anomalies")
+                lines.append(f"{indent}- {m}: " + '; '.join(parts))
+        
+        return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    import time
+    rng = np.random.default_rng(42)
+    cities = [f'City_{i}' for i in range(100)]
+    categories = [f'Category_{i}' for i in range(50)]
+    days = pd.date_range('2023-01-01', periods=60)
+    df = pd.DataFrame(
+        [(c, k, d) for c in cities for k in categories for d in days],
+        columns=['city', 'category', 'order_date']
+    )
+    df['sales_amount'] = rng.gamma(2.0, 500.0, len(df))
+    
+    engine = InsightEngine()
+    start = time.perf_counter()
+    summary = engine.summarize(df, ['sales_amount'], ['city', 'category', 'order_date'], time_column='order_date')
+    elapsed = time.perf_counter() - start
+    print(f"✓ Summarized {summary.shape[0]:,} segments from {len(df):,} rows in {elapsed * 1000:.0f} ms")
+    print(engine.render_markdown(summary, 'Daily sales by city × category', max_segments=3))
@@ -0,0 +1,695 @@
+# ============================================
+# Load Test Module
+# Replays a weighted query mix at a target QPS and reports latency percentiles
+# ============================================
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config import (
+    LOADTEST_MIX, LOADTEST_QPS, LOADTEST_DURATION_SECONDS, LOADTEST_WARMUP_SECONDS,
+    LOADTEST_CONCURRENCY, LOADTEST_ARRIVAL, LOADTEST_MAX_BACKLOG,
+    LOADTEST_SAMPLE_INTERVAL_SECONDS, LOADTEST_SLO_P99_MS, LOADTEST_MAX_ERROR_RATE,
+    LOADTEST_DIR, SERVE_POOL_SIZE, SERVE_CACHE_TTL_SECONDS,
+    STANDIN_SERVER_THREADS, STANDIN_BASE_LATENCY_MS, STANDIN_LATENCY_SIGMA,
+    STANDIN_MAX_CONNECTIONS, ensure_directories
+)
+from query_loader import get_query_loader, extract_tables
+from admission import QueryTimeoutError
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+# ============================================
+# MySQL Stand-In
+# ============================================
+
+class StandInError(Exception):
+    """Error raised by the stand-in server, carrying a MySQL errno."""
+    
+    def __init__(self, errno, message):
+        super().__init__(f"{errno}: {message}")
+        self.errno = errno
+
+
+class StandInServer:
+    """
+    Simulated MySQL server for load tests without a database.
+    
+    Runs at most `threads` queries at once (others wait, as in a saturated
+    server), draws log-normal service times that grow with the number of
+    tables a query reads, and refuses connections past `max_connections`
+    with errno 1040 like MySQL.
+    """
+    
+    def __init__(self, threads=None, base_latency_ms=None, sigma=None, max_connections=None, seed=0):
+        self.threads = threads or STANDIN_SERVER_THREADS
+        self.base_latency_ms = STANDIN_BASE_LATENCY_MS if base_latency_ms is None else base_latency_ms
+        self.sigma = STANDIN_LATENCY_SIGMA if sigma is None else sigma
+        self.max_connections = max_connections or STANDIN_MAX_CONNECTIONS
+        self._slots = threading.BoundedSemaphore(self.threads)
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.connections = 0
+        self.peak_connections = 0
+        self.running = 0
+    
+    def open_connection(self):
+        with self._lock:
+            if self.connections >= self.max_connections:
+                raise StandInError(1040, "Too many connections")
+            self.connections += 1
+            self.peak_connections = max(self.peak_connections, self.connections)
+    
+    def close_connection(self):
+        with self._lock:
+            self.connections = max(self.connections - 1, 0)
+    
+    def run(self, sql, timeout_ms=None):
+        """Hold a server thread for one simulated query."""
+        with self._lock:
+            service = self._random.lognormvariate(0, self.sigma)
+        service *= self.base_latency_ms * max(len(extract_tables(sql)), 1) / 1000
+        with self._slots:
+            with self._lock:
+                self.running += 1
+            try:
+                if timeout_ms and service * 1000 > timeout_ms:
+                    time.sleep(timeout_ms / 1000)
+                    raise QueryTimeoutError(f"Query exceeded {timeout_ms} ms (stand-in)")
+                time.sleep(service)
+            finally:
+                with self._lock:
+                    self.running -= 1
+        return []
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': self.connections,
+                'peak_connections': self.peak_connections,
+                'running': self.running,
+                'threads': self.threads,
+            }
+
+
+class StandInDatabaseManager:
+    """DatabaseManager replacement that sends every query to a StandInServer (no rows returned)."""
+    
+    def __init__(self, server):
+        self.server = server
+        self.connected = False
+        self.statement_stats = {'prepares': 0, 'reuses': 0}
+    
+    def connect(self):
+        if not self.connected:
+            self.server.open_connection()
+            self.connected = True
+        return True
+    
+    def disconnect(self):
+        if self.connected:
+            self.server.close_connection()
+            self.connected = False
+    
+    def reset_connection(self):
+        self.disconnect()
+    
+    def is_connected(self):
+        return self.connected
+    
+    def execute_query(self, sql, params=None, timeout_ms=None, cancel_token=None):
+        self.connect()
+        return self.server.run(sql, timeout_ms)
+    
+    def execute_prepared(self, statement_key, sql, params=None, timeout_ms=None, cancel_token=None):
+        self.connect()
+        self.statement_stats['reuses'] += 1
+        return self.server.run(sql, timeout_ms)
+    
+    def iter_query(self, sql, params=None, chunk_size=10000, timeout_ms=None, cancel_token=None):
+        self.connect()
+        self.server.run(sql, timeout_ms)
+        return iter(())
+
+
+# ============================================
+# Targets (configurations under test)
+# ============================================
+
+class SingleExecutorTarget:
+    """One QueryExecutor / DatabaseManager shared by all clients (serialized by a lock)."""
+    
+    def __init__(self, db_factory=None):
+        from db import DatabaseManager
+        from query_executor import QueryExecutor
+        self.executor = QueryExecutor((db_factory or DatabaseManager)(), get_query_loader())
+        self._lock = threading.Lock()
+    
+    def call(self, query_name, params):
+        with self._lock:
+            return self.executor.execute(query_name, params=params)
+    
+    def stats(self):
+        return {}
+    
+    def close(self):
+        self.executor.db_manager.disconnect()
+
+
+class ServiceTarget:
+    """The query service's connection pool, optionally with its result cache."""
+    
+    def __init__(self, pool_size=None, cache_ttl=0, db_factory=None):
+        from server import QueryService
+        self.service = QueryService(pool_size=pool_size or SERVE_POOL_SIZE, cache_ttl=cache_ttl,
+                                    db_factory=db_factory)
+    
+    def call(self, query_name, params):
+        return self.service.run_query(query_name, params)
+    
+    def stats(self):
+        return {'pool_size': self.service.pool_size, 'cache': self.service.cache.stats()}
+    
+    def close(self):
+        self.service.close()
+
+
+class ReplicaTarget:
+    """Reads routed across config.DB_ENDPOINTS by the ReplicaRouter."""
+    
+    def __init__(self):
+        from routing import ReplicaRouter
+        self.router = ReplicaRouter()
+    
+    def call(self, query_name, params):
+        return self.router.execute(query_name, params)
+    
+    def stats(self):
+        return {
+            endpoint.name: {'role': endpoint.role, 'avg_latency_ms': endpoint.avg_latency * 1000}
+            for endpoint in self.router.endpoints
+        }
+    
+    def close(self):
+        self.router.close()
+
+
+class ConnectionSampler:
+    """
+    Current number of database connections, for the load test timeline.
+    
+    With the stand-in this is the simulated server's open connection count.
+    Against MySQL it reads Threads_connected on the primary over a dedicated
+    connection (sampling on a pooled one would race the clients), so the
+    count includes that connection and any other client of the server.
+    """
+    
+    def __init__(self, stand_in=None, db_factory=None):
+        self.stand_in = stand_in
+        self.db_factory = db_factory
+        self._db = None
+    
+    def __call__(self):
+        if self.stand_in is not None:
+            return self.stand_in.stats()['connections']
+        if self._db is None:
+            from db import DatabaseManager
+            self._db = (self.db_factory or DatabaseManager)()
+            self._db.connect()
+        rows = self._db.execute_query("SHOW GLOBAL STATUS LIKE 'Threads_connected'")
+        return int(rows[0]['Value']) if rows else None
+    
+    def close(self):
+        if self._db is not None:
+            self._db.disconnect()
+            self._db = None
+
+
+TARGETS = ('single', 'pool', 'cached', 'replicas')
+
+def build_target(name, pool_size=None, stand_in=None):
+    """
+    Create a configuration to load-test.
+    
+    Args:
+        name (str): 'single', 'pool', 'cached' or 'replicas'
+        pool_size (int): Connections for 'pool' / 'cached'
+        stand_in (StandInServer): Simulated server instead of MySQL
+    
+    Returns:
+        object: Target with call(), stats() and close()
+    """
+    db_factory = (lambda: StandInDatabaseManager(stand_in)) if stand_in is not None else None
+    if name == 'single':
+        return SingleExecutorTarget(db_factory)
+    if name == 'pool':
+        return ServiceTarget(pool_size, cache_ttl=0, db_factory=db_factory)
+    if name == 'cached':
+        return ServiceTarget(pool_size, cache_ttl=SERVE_CACHE_TTL_SECONDS, db_factory=db_factory)
+    if name == 'replicas':
+        if stand_in is not None:
+            raise ValueError("The replicas target needs real endpoints (config.DB_ENDPOINTS)")
+        return ReplicaTarget()
+    raise ValueError(f"Unknown load test target: {name}")
+
+
+# ============================================
+# Load Generation
+# ============================================
+
+def _percentiles(latencies):
+    if not len(latencies):
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    values = np.percentile(latencies, PERCENTILES)
+    return {f"p{p}_ms": round(float(v), 2) for p, v in zip(PERCENTILES, values)}
+
+
+class LoadTest:
+    """
+    Open-loop load generator.
+    
+    Requests are scheduled at the target rate regardless of how fast earlier
+    ones finish, and latency is measured from the scheduled time, so queueing
+    in front of a saturated configuration shows up in the percentiles
+    instead of silently lowering the offered load.
+    """
+    
+    def __init__(self, target, mix=None, qps=None, duration=None, concurrency=None,
+                 warmup=None, arrival=None, seed=0, connections=None):
+        self.target = target
+        self.connections = connections  # Callable returning the DB connection count, or None
+        self.mix = self._normalize_mix(mix or LOADTEST_MIX)
+        self.qps = qps or LOADTEST_QPS
+        self.duration = duration or LOADTEST_DURATION_SECONDS
+        self.concurrency = concurrency or LOADTEST_CONCURRENCY
+        self.warmup = LOADTEST_WARMUP_SECONDS if warmup is None else warmup
+        self.arrival = arrival or LOADTEST_ARRIVAL
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._backlog = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0  # Since the last timeline sample
+        self.records = []  # (scheduled offset, query, latency, service time, error type or None, completion offset)
+        self.timeline = []
+    
+    @staticmethod
+    def _normalize_mix(mix):
+        """Accept {name: weight} or {name: {"weight": w, "params": [ {...}, ... ]}}."""
+        loader = get_query_loader()
+        normalized = {}
+        for name, spec in mix.items():
+            loader.get_compiled(name)  # UnknownQueryError for unknown queries
+            if isinstance(spec, dict):
+                normalized[name] = (float(spec.get('weight', 1)), list(spec.get('params') or [None]))
+            else:
+                normalized[name] = (float(spec), [None])
+        return normalized
+    
+    def _next_request(self):
+        names = list(self.mix)
+        name = self._random.choices(names, weights=[self.mix[n][0] for n in names])[0]
+        return name, self._random.choice(self.mix[name][1])
+    
+    def _schedule(self):
+        """Offsets (seconds from start) of every request in the stage."""
+        count = int(self.qps * self.duration)
+        if self.arrival == 'uniform':
+            return [i / self.qps for i in range(count)]
+        offsets, t = [], 0.0
+        while True:
+            t += self._random.expovariate(self.qps)
+            if t >= self.duration:
+                return offsets
+            offsets.append(t)
+    
+    def _issue(self, start, offset, name, params):
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        began = time.perf_counter()
+        error = None
+        try:
+            self.target.call(name, params)
+        except Exception as e:
+            error = type(e).__name__
+        finished = time.perf_counter()
+        with self._lock:
+            self._in_flight -= 1
+            self._backlog -= 1
+            self.records.append((offset, name, finished - (start + offset), finished - began, error,
+                                 finished - start))
+    
+    def _sample(self, start, stop):
+        while not stop.wait(LOADTEST_SAMPLE_INTERVAL_SECONDS):
+            # Peak over the interval: a point sample misses requests shorter than it
+            with self._lock:
+                backlog = self._backlog
+                peak, self._peak_in_flight = self._peak_in_flight, self._in_flight
+            self.timeline.append({
+                't': round(time.perf_counter() - start, 2),
+                'in_flight': peak,
+                'backlog': backlog,
+                'connections': self._sample_connections(),
+            })
+    
+    def _sample_connections(self):
+        if self.connections is None:
+            return None
+        try:
+            return self.connections()
+        except Exception as e:
+            # One warning, not one per interval
+            logger.warning(f"⚠️  Connection sampling disabled: {e}")
+            self.connections = None
+            return None
+    
+    def run(self):
+        """
+        Run one stage.
+        
+        Returns:
+            dict: JSON-serializable report (see summarize)
+        """
+        logger.info(
+            f"🏋️  Load test: {self.qps} QPS for {self.duration}s, "
+            f"{self.concurrency} clients, mix {', '.join(self.mix)}"
+        )
+        schedule = self._schedule()
+        shed = 0
+        stop = threading.Event()
+        start = time.perf_counter()
+        sampler = threading.Thread(target=self._sample, args=(start, stop), name='loadtest-sampler', daemon=True)
+        sampler.start()
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='loadtest') as pool:
+            for offset in schedule:
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                name, params = self._next_request()
+                with self._lock:
+                    if self._backlog >= LOADTEST_MAX_BACKLOG:
+                        # Client gives up instead of queueing without bound
+                        self.records.append((offset, name, 0.0, 0.0, 'Shed', offset))
+                        shed += 1
+                        continue
+                    self._backlog += 1
+                pool.submit(self._issue, start, offset, name, params)
+        
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+        if shed:
+            logger.warning(f"⚠️  Shed {shed:,} requests (backlog above {LOADTEST_MAX_BACKLOG})")
+        return self.summarize(elapsed)
+    
+    def summarize(self, elapsed):
+        """Aggregate recorded requests (after warm-up) into a report."""
+        measured = [r for r in self.records if r[0] >= self.warmup]
+        ok = np.array([r[2] * 1000 for r in measured if r[4] is None])
+        # Served rate: completions after warm-up over the time it took to finish them,
+        # not over the stage duration (which would just echo the offered rate)
+        served = [r[5] for r in self.records if r[4] is None and r[5] >= self.warmup]
+        served_window = max(max(served, default=self.warmup) - self.warmup, 1e-9)
+        errors = {}
+        for r in measured:
+            if r[4] is not None:
+                errors[r[4]] = errors.get(r[4], 0) + 1
+        
+        queries = {}
+        for name in self.mix:
+            rows = [r for r in measured if r[1] == name]
+            latencies = np.array([r[2] * 1000 for r in rows if r[4] is None])
+            queries[name] = {
+                'requests': len(rows),
+                'errors': sum(1 for r in rows if r[4] is not None),
+                **_percentiles(latencies),
+            }
+        
+        # Per-second latency and errors, joined to the sampled in-flight peaks and connections
+        buckets = {}
+        for offset, _, latency, _, error, _ in self.records:
+            bucket = buckets.setdefault(int(offset), [[], 0])
+            if error is None:
+                bucket[0].append(latency * 1000)
+            else:
+                bucket[1] += 1
+        timeline = []
+        for second in range(int(self.duration) + 1):
+            latencies, error_count = buckets.get(second, ([], 0))
+            sample = next((s for s in self.timeline if s['t'] >= second), {})
+            timeline.append({
+                't': second,
+                'requests': len(latencies) + error_count,
+                'errors': error_count,
+                'p95_ms': _percentiles(np.array(latencies))['p95_ms'],
+                'in_flight': sample.get('in_flight'),
+                'backlog': sample.get('backlog'),
+                'connections': sample.get('connections'),
+            })
+        connections = [s['connections'] for s in self.timeline if s.get('connections') is not None]
+        
+        summary = {
+            'requests': len(measured),
+            'completed': len(ok),
+            'errors': len(measured) - len(ok),
+            'error_rate': round((len(measured) - len(ok)) / len(measured), 4) if measured else 0.0,
+            'target_qps': self.qps,
+            'throughput_qps': round(len(served) / served_window, 2) if served else 0.0,
+            **_percentiles(ok),
+            'max_ms': round(float(ok.max()), 2) if len(ok) else None,
+            'mean_service_ms': round(float(np.mean([r[3] * 1000 for r in measured if r[4] is None])), 2) if len(ok) else None,
+            'peak_in_flight': max((s['in_flight'] for s in self.timeline), default=0),
+            'peak_connections': max(connections, default=None),
+            'elapsed_seconds': round(elapsed, 2),
+        }
+        summary['saturated'] = bool(
+            summary['p99_ms'] is None
+            or summary['p99_ms'] > LOADTEST_SLO_P99_MS
+            or summary['error_rate'] > LOADTEST_MAX_ERROR_RATE
+        )
+        return {
+            'summary': summary,
+            'queries': queries,
+            'errors': errors,
+            'timeline': timeline,
+        }
+
+
+def run_load_test(target='pool', qps=None, duration=None, concurrency=None, pool_size=None,
+                  mix=None, stand_in=False, label=None, warmup=None, arrival=None):
+    """
+    Run one or more QPS stages against a configuration.
+    
+    Args:
+        target (str): 'single', 'pool', 'cached' or 'replicas'
+        qps (list): Stage rates (default: [config.LOADTEST_QPS])
+        duration (int): Seconds per stage
+        concurrency (int): Client threads
+        pool_size (int): Connections for 'pool' / 'cached'
+        mix (dict): Query mix (default: config.LOADTEST_MIX)
+        stand_in (bool): Use the simulated server instead of MySQL
+        label (str): Name shown in comparisons (default: target)
+    
+    Returns:
+        dict: Report with one entry per stage
+    """
+    stages = list(qps or [LOADTEST_QPS])
+    server = StandInServer() if stand_in else None
+    instance = build_target(target, pool_size=pool_size, stand_in=server)
+    sampler = ConnectionSampler(stand_in=server)
+    
+    # Per-query info logs would dominate the run
+    for name in ('db', 'query_executor', 'server', 'routing', 'admission'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    
+    from resilience import get_retry_stats
+    report = {
+        'label': label or target,
+        'target': target,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'pool_size': pool_size or SERVE_POOL_SIZE,
+            'concurrency': concurrency or LOADTEST_CONCURRENCY,
+            'duration_seconds': duration or LOADTEST_DURATION_SECONDS,
+            'arrival': arrival or LOADTEST_ARRIVAL,
+            'stand_in': server.stats() if server else None,
+            'mix': {name: spec for name, spec in (mix or LOADTEST_MIX).items()},
+        },
+        'stages': [],
+    }
+    try:
+        for stage_qps in stages:
+            result = LoadTest(instance, mix=mix, qps=stage_qps, duration=duration,
+                              concurrency=concurrency, warmup=warmup, arrival=arrival,
+                              connections=sampler).run()
+            result['qps'] = stage_qps
+            result['target_stats'] = instance.stats()
+            if server is not None:
+                result['stand_in'] = server.stats()
+            report['stages'].append(result)
+            
+            s = result['summary']
+            logger.info(
+                f"{'🔴' if s['saturated'] else '🟢'} {stage_qps} QPS → {s['throughput_qps']} QPS served, "
+                f"p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms, p99 {s['p99_ms']} ms, "
+                f"errors {s['error_rate']:.1%}, peak in flight {s['peak_in_flight']}"
+            )
+    finally:
+        sampler.close()
+        instance.close()
+    
+    report['retry'] = get_retry_stats()
+    sustained = [stage['qps'] for stage in report['stages'] if not stage['summary']['saturated']]
+    report['max_sustained_qps'] = max(sustained) if sustained else None
+    return report
+
+
+# ============================================
+# Reports
+# ============================================
+
+def save_report(report, path=None):
+    """Write a report as JSON (default: output/loadtest/<label>-<timestamp>.json)."""
+    ensure_directories()
+    if path is None:
+        LOADTEST_DIR.mkdir(parents=True, exist_ok=True)
+        path = LOADTEST_DIR / f"{report['label']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    Path(path).write_text(json.dumps(report, indent=2))
+    logger.info(f"✓ Load test report saved: {path}")
+    return Path(path)
+
+
+def _svg_polyline(values, width=480, height=80, color='#2185ba'):
+    """Tiny inline SVG line chart (None values are skipped)."""
+    points = [(i, v) for i, v in enumerate(values) if v is not None]
+    if len(points) < 2:
+        return '<svg width="%d" height="%d"></svg>' % (width, height)
+    top = max(v for _, v in points) or 1
+    last = max(len(values) - 1, 1)
+    coords = ' '.join(f"{i / last * width:.1f},{height - v / top * (height - 4) - 2:.1f}" for i, v in points)
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{coords}"/>'
+        f'<text x="2" y="10" font-size="10">max {top:,.0f}</text></svg>'
+    )
+
+
+def render_html(reports, title='Load Test Comparison'):
+    """
+    Render one or more reports as a self-contained HTML page.
+    
+    Returns:
+        str: HTML document
+    """
+    columns = ['target_qps', 'throughput_qps', 'p50_ms', 'p95_ms', 'p99_ms',
+               'error_rate', 'peak_in_flight', 'peak_connections', 'saturated']
+    rows = []
+    for report in reports:
+        for stage in report['stages']:
+            # .get: reports saved before connections were sampled lack the column
+            cells = ''.join(f"<td>{escape(str(stage['summary'].get(c)))}</td>" for c in columns)
+            css = ' class="bad"' if stage['summary']['saturated'] else ''
+            rows.append(f"<tr{css}><td>{escape(report['label'])}</td>{cells}</tr>")
+    
+    sections = []
+    for report in reports:
+        for stage in report['stages']:
+            timeline = stage['timeline']
+            per_query = ''.join(
+                f"<tr><td>{escape(name)}</td><td>{q['requests']}</td><td>{q['errors']}</td>"
+                f"<td>{q['p50_ms']}</td><td>{q['p95_ms']}</td><td>{q['p99_ms']}</td></tr>"
+                for name, q in stage['queries'].items()
+            )
+            sections.append(
+                f"<h2>{escape(report['label'])} @ {stage['qps']} QPS</h2>"
+                f"<div class='charts'><div><h3>p95 latency (ms)</h3>"
+                f"{_svg_polyline([p['p95_ms'] for p in timeline])}</div>"
+                f"<div><h3>Requests / s</h3>{_svg_polyline([p['requests'] for p in timeline], color='#40a68f')}</div>"
+                f"<div><h3>Peak in-flight requests</h3>"
+                f"{_svg_polyline([p['in_flight'] for p in timeline], color='#f6a042')}</div>"
+                f"<div><h3>DB connections</h3>"
+                f"{_svg_polyline([p.get('connections') for p in timeline], color='#8e5ea2')}</div></div>"
+                f"<table><tr><th>Query</th><th>Requests</th><th>Errors</th><th>p50</th><th>p95</th><th>p99</th></tr>"
+                f"{per_query}</table>"
+            )
+    
+    header = ''.join(f"<th>{escape(c)}</th>" for c in ['label'] + columns)
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title><style>"
+        "body{font-family:sans-serif;margin:24px;color:#222}"
+        "table{border-collapse:collapse;margin:8px 0 16px}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+        "td:first-child,th:first-child{text-align:left}"
+        "tr.bad td{background:#fde2e2}"
+        ".charts{display:flex;gap:16px;flex-wrap:wrap}h3{font-size:12px;margin:4px 0}"
+        "</style></head><body>"
+        f"<h1>{escape(title)}</h1>"
+        f"<p>SLO: p99 ≤ {LOADTEST_SLO_P99_MS} ms, error rate ≤ {LOADTEST_MAX_ERROR_RATE:.0%}</p>"
+        f"<table><tr>{header}</tr>{''.join(rows)}</table>"
+        f"{''.join(sections)}</body></html>"
+    )
+
+
+def save_html(reports, path=None):
+    ensure_directories()
+    LOADTEST_DIR.mkdir(parents=True, exist_ok=True)
+    path = Path(path or LOADTEST_DIR / 'report.html')
+    path.write_text(render_html(reports), encoding='utf-8')
+    logger.info(f"✓ Load test HTML report saved: {path}")
+    return path
+
+
+def _parse_mix(items):
+    """Parse name=weight CLI arguments."""
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition('=')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    parser = argparse.ArgumentParser(description='Sales Data Analysis System - Load Test')
+    parser.add_argument('--target', choices=TARGETS, default='pool', help='Configuration under test')
+    parser.add_argument('--qps', type=float, nargs='+', help='Target rate per stage (e.g. 10 20 40 80)')
+    parser.add_argument('--duration', type=int, help='Seconds per stage')
+    parser.add_argument('--concurrency', type=int, help='Client threads')
+    parser.add_argument('--pool-size', type=int, help='Connections for pool/cached targets')
+    parser.add_argument('--mix', nargs='+', metavar='QUERY=WEIGHT', help='Query mix (default: config.LOADTEST_MIX)')
+    parser.add_argument('--arrival', choices=['poisson', 'uniform'], help='Inter-arrival distribution')
+    parser.add_argument('--stand-in', action='store_true', help='Simulated MySQL server instead of a database')
+    parser.add_argument('--label', help='Name of this run in comparisons')
+    parser.add_argument('--output', help='JSON report path')
+    parser.add_argument('--html', nargs='?', const=True, help='Also write an HTML report')
+    parser.add_argument('--compare', nargs='+', metavar='REPORT', help='Render saved JSON reports as one HTML page')
+    args = parser.parse_args()
+    
+    if args.compare:
+        reports = [json.loads(Path(path).read_text()) for path in args.compare]
+        save_html(reports, args.html if isinstance(args.html, str) else None)
+        sys.exit(0)
+    
+    report = run_load_test(
+        target=args.target, qps=args.qps, duration=args.duration, concurrency=args.concurrency,
+        pool_size=args.pool_size, mix=_parse_mix(args.mix) if args.mix else None,
+        stand_in=args.stand_in, label=args.label, arrival=args.arrival
+    )
+    save_report(report, args.output)
+    if args.html:
+        save_html([report], args.html if isinstance(args.html, str) else None)
+    sys.exit(0 if report['max_sustained_qps'] is not None else 1)
@@ -4,20 +4,17 @@
 # ============================================
 
 import sys
-import os
 import logging
 from pathlib import Path
-import pandas as pd
 import argparse
 
 # Add python directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
-from db import DatabaseManager
-from query_executor import QueryExecutor
-from analysis import AnalysisEngine
-from visualization import Visualizer
+
+# Heavy modules (pandas, mysql.connector, matplotlib, seaborn) are imported
+# lazily so that light CLI paths such as --list-queries start fast.
 
 # Configure logging
 logging.basicConfig(
@@ -26,18 +23,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Diff keys for analyses that are not a single named query
+DERIVED_ANALYSES = {
+    'product_affinity': {'dimensions': ['product_a', 'product_b'],
+                         'measures': ['baskets_together', 'lift']},
+}
+
 class SalesAnalyticsApp:
     """Main application class."""
     
     def __init__(self):
-        self.db = DatabaseManager()
-        self.executor = QueryExecutor()
-        self.analyzer = AnalysisEngine()
-        self.visualizer = Visualizer()
+        self._db = None
+        self._executor = None
+        self._analyzer = None
+        self._visualizer = None
+    
+    # ============================================
+    # Lazily Created Components
+    # ============================================
+    
+    @property
+    def db(self):
+        """Database manager (imports mysql.connector on first use)."""
+        if self._db is None:
+            from db import DatabaseManager
+            self._db = DatabaseManager()
+        return self._db
+    
+    @property
+    def executor(self):
+        """Query executor (imports pandas on first use)."""
+        if self._executor is None:
+            from query_executor import QueryExecutor
+            self._executor = QueryExecutor()
+        return self._executor
+    
+    @property
+    def analyzer(self):
+        """Analysis engine."""
+        if self._analyzer is None:
+            from analysis import AnalysisEngine
+            self._analyzer = AnalysisEngine()
+        return self._analyzer
+    
+    @property
+    def visualizer(self):
+        """Chart generator (charting libraries load on the first chart)."""
+        if self._visualizer is None:
+            from visualization import Visualizer
+            self._visualizer = Visualizer()
+        return self._visualizer
+    
+    def list_queries(self):
+        """Print available queries without importing pandas or the DB driver."""
+        from query_loader import get_query_loader
+        loader = get_query_loader()
+        for query_name in loader.get_query_names():
+            print(f"  • {query_name}: {loader.get_query_description(query_name)}")
+        return loader.get_query_names()
     
     def load_sample_data(self):
         """Load sample data from CSV into database."""
         logger.info("📥 Loading sample data...")
+        import pandas as pd
         
         try:
             # Connect to database
@@ -47,6 +95,7 @@ class SalesAnalyticsApp:
             sample_file = config.SAMPLE_DATA_FILE
             if not sample_file.exists():
                 logger.error(f"✗ Sample data file not found: {sample_file}")
+                logger.info("  Use --generate-data db to load a synthetic dataset instead")
                 return False
             
             # Load customers
@@ -106,15 +155,37 @@ class SalesAnalyticsApp:
         finally:
             self.db.disconnect()
     
-    def run_all_analyses(self):
-        """Run all analyses and generate outputs."""
+    def run_all_analyses(self, only_if_changed=False):
+        """
+        Run all analyses and generate outputs.
+        
+        Args:
+            only_if_changed (bool): Probe the source tables first and skip the
+                whole run when nothing changed since the last probed run
+        """
         logger.info("\n" + "="*60)
         logger.info("🚀 Starting Sales Data Analysis")
         logger.info("="*60 + "\n")
+        import pandas as pd
+        from result_diff import ResultStore, ChangeProbe
+        from resilience import is_transient_error, DatabaseUnavailableError
+        from memory_budget import MemoryTracker
+        config.ensure_directories()
         
         try:
             self.db.connect()
             
+            store = ResultStore()
+            fingerprint = None
+            if only_if_changed:
+                changed, fingerprint = ChangeProbe(self.db).has_changed(store)
+                if not changed:
+                    logger.info("⏭️  Nothing changed since the last run; skipping analyses")
+                    return False
+            
+            # Batch report: queue behind interactive queries for heavy-query slots
+            self.analyzer.executor.default_priority = config.PRIORITY_BATCH
+            
             analyses = [
                 ('monthly_sales', self.analyzer.get_monthly_sales, None),
                 ('top_products', self.analyzer.get_top_products, {'limit': 10}),
@@ -124,44 +195,50 @@ class SalesAnalyticsApp:
                 ('daily_sales_trend', self.analyzer.get_daily_sales_trend, None),
                 ('customer_purchase_frequency', self.analyzer.get_customer_frequency, None),
                 ('product_revenue_ranking', self.analyzer.get_product_revenue_ranking, {'limit': 10}),
+                ('product_affinity', self.analyzer.get_product_affinity, None),
             ]
             
             insights_content = "# 📊 Sales Data Analysis Report\n\n"
             insights_content += f"**Generated**: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             
-            for analysis_name, analysis_func, params in analyses:
-                try:
-                    logger.info(f"\n▶️  Running: {analysis_name}")
-                    
-                    if params:
-                        df_result = analysis_func(**params)
-                    else:
-                        df_result = analysis_func()
-                    
-                    if df_result is not None and not df_result.empty:
-                        # Save to CSV
-                        csv_file = config.OUTPUT_DIR / f"{analysis_name}.csv"
-                        df_result.to_csv(csv_file, index=False)
-                        logger.info(f"  ✓ CSV saved: {csv_file.name}")
-                        
-                        # Display data
-                        logger.info(f"\n{df_result.to_string()}\n")
-                        
-                        # Generate visualization
-                        self._generate_visualization(analysis_name, df_result)
-                        
-                        # Generate insights
-                        insight_text = self._get_insight_text(analysis_name, df_result)
-                        insights_content += f"\n## {analysis_name}\n{insight_text}\n"
-                    
-                except Exception as e:
-                    logger.error(f"  ✗ Error in {analysis_name}: {e}")
+            sections = {}
+            tracker = MemoryTracker()
+            failed = self._run_analyses(analyses, store, sections, tracker)
+            
+            # One more pass for analyses lost to an outage, once the database is back
+            retryable = [
+                a for a in analyses
+                if a[0] in failed and (is_transient_error(failed[a[0]])
+                                       or isinstance(failed[a[0]], DatabaseUnavailableError))
+            ]
+            if retryable:
+                breaker = self.analyzer.executor.retry.breaker
+                logger.info(f"\n🔁 Retrying {len(retryable)} analyses after transient failures")
+                if breaker.wait_until_closed(timeout=config.CIRCUIT_RESET_SECONDS):
+                    for analysis_name, _, _ in retryable:
+                        del failed[analysis_name]
+                    failed.update(self._run_analyses(retryable, store, sections, tracker))
+            
+            for analysis_name, _, _ in analyses:
+                if analysis_name in sections:
+                    insights_content += sections[analysis_name]
+            
+            # Peak resident memory per analysis
+            memory_table = tracker.render_markdown()
+            insights_content += f"\n## Memory\n{memory_table}\n"
+            tracker.save(config.MEMORY_REPORT_FILE)
+            logger.info(f"\n💾 Peak memory per analysis:\n{memory_table}")
             
             # Save insights to markdown
             insights_file = config.INSIGHTS_FILE
             with open(insights_file, 'w') as f:
                 f.write(insights_content)
             logger.info(f"\n✓ Insights saved: {insights_file.name}")
+            if failed:
+                # Leave the fingerprint alone so the next --if-changed run tries again
+                logger.warning(f"⚠️  Failed analyses: {', '.join(failed)}")
+            elif fingerprint is not None:
+                store.save_fingerprint(fingerprint)
             
             logger.info("\n" + "="*60)
             logger.info("✓ Analysis Complete!")
@@ -169,7 +246,8 @@ class SalesAnalyticsApp:
             logger.info(f"\n📊 Output Location: {config.OUTPUT_DIR}")
             logger.info(f"📈 Charts Location: {config.CHARTS_DIR}")
             logger.info(f"📄 Insights Location: {insights_file}\n")
-            
+            return True
+        
         except Exception as e:
             logger.error(f"✗ Analysis failed: {e}")
             raise
@@ -177,38 +255,149 @@ class SalesAnalyticsApp:
         finally:
             self.db.disconnect()
     
+    def _run_analyses(self, analyses, store, sections, tracker):
+        """
+        Run analyses, saving CSVs, charts and result diffs.
+        
+        Queries marked "heavy" run within the memory budget; a result that
+        spills to disk is exported chunk by chunk and skips charts and diffs.
+        
+        Args:
+            analyses (list): (name, function, params) tuples
+            store (ResultStore): Previous results to diff against
+            sections (dict): Receives the insights markdown per analysis
+            tracker (MemoryTracker): Records peak memory per analysis
+        
+        Returns:
+            dict: Analysis name → exception for analyses that failed
+        """
+        from exporter import format_preview
+        from memory_budget import SpilledResult
+        loader = self.analyzer.executor.query_loader
+        failed = {}
+        for analysis_name, analysis_func, params in analyses:
+            try:
+                logger.info(f"\n▶️  Running: {analysis_name}")
+                
+                with tracker.track(analysis_name):
+                    if analysis_name in loader.compiled and loader.get_compiled(analysis_name).heavy:
+                        df_result = self.analyzer.get_bounded_result(analysis_name, params)
+                    elif params:
+                        df_result = analysis_func(**params)
+                    else:
+                        df_result = analysis_func()
+                    
+                    csv_file = config.OUTPUT_DIR / f"{analysis_name}.csv"
+                    if isinstance(df_result, SpilledResult):
+                        # Out-of-core: export chunk by chunk, preview the first rows only
+                        try:
+                            df_result.to_csv(csv_file)
+                            logger.info(f"  ✓ CSV saved: {csv_file.name} ({len(df_result):,} rows, streamed)")
+                            logger.info(f"\n{format_preview(df_result.head(config.LOG_PREVIEW_ROWS))}\n")
+                            sections[analysis_name] = (
+                                f"\n## {analysis_name}\n- Rows: {len(df_result):,} "
+                                f"(above the memory budget; full result in {csv_file.name})\n"
+                            )
+                        finally:
+                            df_result.cleanup()
+                        continue
+                    
+                    if df_result is not None and not df_result.empty:
+                        # Save to CSV
+                        df_result.to_csv(csv_file, index=False)
+                        logger.info(f"  ✓ CSV saved: {csv_file.name}")
+                        
+                        # Display a bounded preview
+                        logger.info(f"\n{format_preview(df_result)}\n")
+                        
+                        # Generate visualization
+                        self._generate_visualization(analysis_name, df_result)
+                        
+                        # Generate insights
+                        insight_text = self._get_insight_text(analysis_name, df_result)
+                        section = f"\n## {analysis_name}\n{insight_text}\n"
+                        
+                        # Diff against the previous run
+                        query_info = DERIVED_ANALYSES.get(analysis_name) or loader.get_query(analysis_name)
+                        diff = store.track(
+                            analysis_name, df_result,
+                            keys=query_info.get('dimensions'), measures=query_info.get('measures'),
+                            params=params
+                        )
+                        if diff is not None:
+                            status = diff.summary() if diff.has_changes else 'unchanged'
+                            section += f"\n_Changes since last run: {status}_\n"
+                        sections[analysis_name] = section
+            
+            except Exception as e:
+                logger.error(f"  ✗ Error in {analysis_name}: {e}")
+                failed[analysis_name] = e
+        return failed
+    
+    def run_time_series(self, forecast_days=None):
+        """Print time-series analytics and a forecast for daily sales."""
+        analyzer = self.analyzer.get_time_series_analysis()
+        if analyzer.n == 0:
+            logger.warning("⚠️  No daily sales data available")
+            return None
+        
+        print("\n📈 Daily Sales (latest days):")
+        print(analyzer.to_frame().tail(14).to_string(index=False))
+        print("\n📅 Monthly Growth:")
+        print(analyzer.monthly_growth().tail(12).to_string(index=False))
+        print(f"\n🔮 Forecast ({forecast_days or config.TS_FORECAST_DAYS} days):")
+        print(analyzer.forecast(forecast_days).to_string(index=False))
+        return analyzer
+    
+    def generate_data(self, target='csv', sales_rows=None, seed=None):
+        """Generate a synthetic dataset into files ('csv' / 'parquet') or the database ('db')."""
+        from datagen import SyntheticDataGenerator
+        generator = SyntheticDataGenerator(sales=sales_rows, seed=seed)
+        if target == 'db':
+            counts = generator.load_database(self.db)
+            # New sales restart order_ids, so the incremental RFM and affinity state no longer applies
+            from rfm import RFMEngine
+            RFMEngine().reset()
+            if self._analyzer is not None:
+                self._analyzer.affinity.reset()
+            return counts
+        return generator.write_files(fmt=target)
+    
+    def build_dashboard(self):
+        """Build the interactive HTML dashboard from a single cube query."""
+        from dashboard import DashboardBuilder
+        return DashboardBuilder(self.executor).build()
+    
+    def build_batch_reports(self, scenarios_file=None, per_city=False):
+        """
+        Build the standard report for many scenarios from shared grouped queries.
+        
+        Args:
+            scenarios_file (Path): Scenario list (default: config.SCENARIOS_FILE)
+            per_city (bool): Ignore the file and report on every city instead
+        
+        Returns:
+            DataFrame: Batch index, one row per scenario
+        """
+        from batch_report import BatchReportBuilder, load_scenarios, city_scenarios
+        self.executor.default_priority = config.PRIORITY_BATCH
+        builder = BatchReportBuilder(self.executor)
+        if not per_city:
+            return builder.build(load_scenarios(scenarios_file))
+        
+        cities = sorted(self.executor.execute('sales_by_city')['city'].dropna().unique())
+        return builder.build(city_scenarios(cities))
+    
     def _generate_visualization(self, analysis_name, df):
         """Generate appropriate visualization for analysis."""
         try:
-            if analysis_name == 'monthly_sales':
-                self.visualizer.plot_monthly_sales(df)
-            elif analysis_name == 'top_products':
-                self.visualizer.plot_top_products(df)
-            elif analysis_name == 'top_customers':
-                self.visualizer.plot_top_customers(df)
-            elif analysis_name == 'sales_by_city':
-                self.visualizer.plot_sales_by_city(df)
-            elif analysis_name == 'product_category_analysis':
-                self.visualizer.plot_category_analysis(df)
-            elif analysis_name == 'daily_sales_trend':
-                self.visualizer.plot_daily_trend(df)
+            self.visualizer.plot_report(analysis_name, df)
         except Exception as e:
             logger.warning(f"⚠️  Could not generate visualization: {e}")
     
     def _get_insight_text(self, analysis_name, df):
         """Generate insight text for analysis."""
-        if analysis_name == 'monthly_sales':
-            return self.analyzer.generate_monthly_insights(df)
-        elif analysis_name == 'top_products':
-            return self.analyzer.generate_product_insights(df)
-        elif analysis_name == 'top_customers':
-            return self.analyzer.generate_customer_insights(df)
-        elif analysis_name == 'sales_by_city':
-            return self.analyzer.generate_city_insights(df)
-        elif analysis_name == 'product_category_analysis':
-            return self.analyzer.generate_category_insights(df)
-        else:
-            return "Analysis completed successfully."
+        return self.analyzer.generate_report_insights(analysis_name, df)
 
 
 def main():
@@ -226,20 +415,123 @@ def main():
         type=str,
         help='Run a specific query by name'
     )
+    parser.add_argument(
+        '--list-queries',
+        action='store_true',
+        help='List available queries and exit'
+    )
+    parser.add_argument(
+        '--timeseries',
+        action='store_true',
+        help='Run time-series analytics (rolling windows, growth, forecast) on daily sales'
+    )
+    parser.add_argument(
+        '--forecast-days',
+        type=int,
+        default=config.TS_FORECAST_DAYS,
+        help='Forecast horizon for --timeseries'
+    )
+    parser.add_argument(
+        '--generate-data',
+        choices=['csv', 'parquet', 'db'],
+        help='Generate a seeded synthetic dataset into data/synthetic/ files or the database'
+    )
+    parser.add_argument(
+        '--sales-rows',
+        type=int,
+        default=config.DATAGEN_SALES,
+        help='Number of sales rows for --generate-data'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=config.DATAGEN_SEED,
+        help='Random seed for --generate-data'
+    )
+    parser.add_argument(
+        '--if-changed',
+        action='store_true',
+        help='Skip the full analysis run when no source table changed since the last run'
+    )
+    parser.add_argument(
+        '--batch-report',
+        nargs='?',
+        const=config.SCENARIOS_FILE,
+        metavar='SCENARIOS_FILE',
+        help='Build the report for every scenario in a JSON file (default: queries/scenarios.json)'
+    )
+    parser.add_argument(
+        '--per-city',
+        action='store_true',
+        help='With --batch-report: one scenario per city instead of the scenarios file'
+    )
+    parser.add_argument(
+        '--dashboard',
+        action='store_true',
+        help='Build the interactive HTML dashboard (insights/dashboard.html)'
+    )
+    parser.add_argument(
+        '--export',
+        nargs='+',
+        metavar='QUERY',
+        help='Stream one or more query results to files in output/ (in parallel)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['csv', 'csv.gz', 'parquet'],
+        default=config.EXPORT_FORMAT,
+        help='Output format for --export'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run the query service daemon (HTTP) with warm connections and caches'
+    )
+    parser.add_argument(
+        '--host',
+        type=str,
+        default=config.SERVE_HOST,
+        help='Bind address for --serve'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=config.SERVE_PORT,
+        help='Bind port for --serve'
+    )
     
     args = parser.parse_args()
     
     app = SalesAnalyticsApp()
     
     try:
-        if args.load_sample_data:
+        if args.list_queries:
+            app.list_queries()
+        elif args.timeseries:
+            app.run_time_series(args.forecast_days)
+        elif args.generate_data:
+            app.generate_data(args.generate_data, args.sales_rows, args.seed)
+        elif args.dashboard:
+            app.build_dashboard()
+        elif args.batch_report or args.per_city:
+            app.build_batch_reports(args.batch_report, per_city=args.per_city)
+        elif args.export:
+            from exporter import ResultExporter
+            _, failures = ResultExporter().export_many(args.export, fmt=args.format)
+            if failures:
+                logger.error(f"✗ {len(failures)} of {len(args.export)} exports failed: {', '.join(failures)}")
+                sys.exit(1)
+        elif args.serve:
+            from server import serve
+            serve(host=args.host, port=args.port)
+        elif args.load_sample_data:
             app.load_sample_data()
         elif args.query:
             logger.info(f"🔄 Executing query: {args.query}")
             df = app.executor.execute(args.query)
             print(df)
         else:
-            app.run_all_analyses()
+            app.run_all_analyses(only_if_changed=args.if_changed)
     
     except Exception as e:
         logger.error(f"✗ Application error: {e}")
@@ -0,0 +1,252 @@
+# ============================================
+# Memory Budget Module
+# Spill-to-disk results and peak resident memory tracking
+# ============================================
+
+import os
+import sys
+import uuid
+import shutil
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+import pandas as pd
+from config import (
+    MEMORY_BUDGET_BYTES, SPILL_DIR, SPILL_FORMAT, MEMORY_SAMPLE_INTERVAL_SECONDS,
+    ensure_directories
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def peak_rss():
+    """Peak resident memory of this process so far, in bytes (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss():
+    """Current resident memory of this process, in bytes (None if unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def frame_bytes(df):
+    """Deep memory usage of a DataFrame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _spill_format():
+    if SPILL_FORMAT == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+            return 'parquet'
+        except ImportError:
+            logger.warning("⚠️  pyarrow not installed; spilling as pickle instead of parquet")
+    return 'pickle'
+
+
+class SpilledResult:
+    """
+    A query result kept on disk as a sequence of columnar chunk files.
+    
+    Chunks are read back one at a time, so consumers (CSV export, chunked
+    aggregations) never hold more than one chunk in memory.
+    """
+    
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.format = _spill_format()
+        self.directory = Path(directory or SPILL_DIR) / f"{name}-{uuid.uuid4().hex[:8]}"
+        self.paths = []
+        self.rows = 0
+        self.bytes_spilled = 0
+        self.columns = None
+    
+    def __len__(self):
+        return self.rows
+    
+    @property
+    def empty(self):
+        return self.rows == 0
+    
+    def append(self, df):
+        """Write one chunk to disk."""
+        if df.empty:
+            return
+        if not self.paths:
+            ensure_directories()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.columns = list(df.columns)
+        
+        path = self.directory / f"chunk-{len(self.paths):05d}.{'parquet' if self.format == 'parquet' else 'pkl'}"
+        if self.format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_pickle(path)
+        self.paths.append(path)
+        self.rows += len(df)
+        self.bytes_spilled += path.stat().st_size
+    
+    def iter_chunks(self):
+        """Yield the stored chunks in order."""
+        for path in self.paths:
+            yield pd.read_parquet(path) if self.format == 'parquet' else pd.read_pickle(path)
+    
+    def head(self, n=5):
+        """First rows of the result."""
+        for chunk in self.iter_chunks():
+            return chunk.head(n)
+        return pd.DataFrame(columns=self.columns)
+    
+    def to_frame(self):
+        """Load the whole result into memory (only when it is known to fit)."""
+        chunks = list(self.iter_chunks())
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=self.columns)
+    
+    def to_csv(self, path):
+        """Write the result to a CSV file chunk by chunk."""
+        with open(path, 'w', newline='') as f:
+            for index, chunk in enumerate(self.iter_chunks()):
+                chunk.to_csv(f, index=False, header=index == 0)
+        return path
+    
+    def cleanup(self):
+        """Delete the chunk files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.paths = []
+
+
+class MemoryBudget:
+    """
+    Collects result chunks in memory until they outgrow the budget, then
+    moves them (and every later chunk) to a SpilledResult.
+    """
+    
+    def __init__(self, name, budget_bytes=None, category_cache=None):
+        self.name = name
+        self.budget_bytes = MEMORY_BUDGET_BYTES if budget_bytes is None else budget_bytes
+        self.category_cache = category_cache
+        self.held = []
+        self.held_bytes = 0
+        self.spilled = None
+    
+    def add(self, chunk):
+        if self.spilled is not None:
+            self.spilled.append(chunk)
+            return
+        self.held.append(chunk)
+        self.held_bytes += frame_bytes(chunk)
+        if self.budget_bytes and self.held_bytes > self.budget_bytes:
+            logger.warning(
+                f"💽 '{self.name}' exceeded the memory budget "
+                f"({self.held_bytes:,} > {self.budget_bytes:,} bytes); spilling to disk"
+            )
+            self.spilled = SpilledResult(self.name)
+            for held in self.held:
+                self.spilled.append(held)
+            self.held, self.held_bytes = [], 0
+    
+    def result(self):
+        """
+        Get the collected result.
+        
+        Returns:
+            DataFrame or SpilledResult: In memory if it fit the budget
+        """
+        if self.spilled is not None:
+            logger.info(
+                f"💽 '{self.name}': {len(self.spilled):,} rows spilled "
+                f"({self.spilled.bytes_spilled:,} bytes on disk)"
+            )
+            return self.spilled
+        if not self.held:
+            return pd.DataFrame()
+        if self.category_cache is not None:
+            # Shared dictionaries only grow, so earlier chunks can adopt the final list
+            for column in self.held[0].columns:
+                categories = self.category_cache.get_categories(column)
+                if categories is not None and isinstance(self.held[0][column].dtype, pd.CategoricalDtype):
+                    for chunk in self.held:
+                        chunk[column] = chunk[column].cat.set_categories(categories)
+        return pd.concat(self.held, ignore_index=True)
+
+
+class MemoryTracker:
+    """Records start, end and peak resident memory for named steps (e.g. each analysis)."""
+    
+    def __init__(self, interval=None):
+        self.interval = interval or MEMORY_SAMPLE_INTERVAL_SECONDS
+        self.records = {}
+    
+    @contextmanager
+    def track(self, name):
+        """Sample resident memory in the background while the block runs."""
+        start = current_rss()
+        peak_before = peak_rss()
+        samples = [start] if start is not None else []
+        stop = threading.Event()
+        
+        def sample():
+            while not stop.wait(self.interval):
+                samples.append(current_rss())
+        
+        sampler = None
+        if start is not None:
+            sampler = threading.Thread(target=sample, name=f"memory-{name}", daemon=True)
+            sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            if sampler is not None:
+                sampler.join()
+            end = current_rss()
+            peak = max(samples + [end]) if end is not None else None
+            # Spikes between samples still move the process-wide peak
+            peak_after = peak_rss()
+            if peak is not None and peak_before is not None and peak_after > peak_before:
+                peak = max(peak, peak_after)
+            self.records[name] = {
+                'analysis': name,
+                'start_bytes': start,
+                'end_bytes': end,
+                'peak_bytes': peak,
+                'peak_growth_bytes': peak - start if peak is not None else None,
+            }
+    
+    def to_frame(self):
+        """One row per tracked step."""
+        return pd.DataFrame(list(self.records.values()),
+                            columns=['analysis', 'start_bytes', 'end_bytes', 'peak_bytes', 'peak_growth_bytes'])
+    
+    def render_markdown(self):
+        """Markdown table of peak resident memory per step."""
+        lines = ["| Analysis | Peak RSS (MB) | Growth (MB) |", "|---|---:|---:|"]
+        for record in self.records.values():
+            if record['peak_bytes'] is None:
+                lines.append(f"| {record['analysis']} | n/a | n/a |")
+                continue
+            lines.append(
+                f"| {record['analysis']} | {record['peak_bytes'] / 2**20:,.1f} "
+                f"| {record['peak_growth_bytes'] / 2**20:+,.1f} |"
+            )
+        return "\n".join(lines)
+    
+    def save(self, path):
+        ensure_directories()
+        self.to_frame().to_csv(path, index=False)
+        return path
@@ -7,17 +7,45 @@ import pandas as pd
 import logging
 from db import get_db_manager
 from query_loader import get_query_loader
+from config import (
+    OPTIMIZE_RESULT_DTYPES, USE_PREPARED_STATEMENTS,
+    ADMISSION_TIMEOUT_SECONDS, PRIORITY_INTERACTIVE, EXPORT_CHUNK_SIZE
+)
+from db import apply_max_execution_time
+from admission import get_admission_controller
+from resilience import get_retry_policy
+from memory_budget import MemoryBudget
+from dtype_optimizer import optimize_dataframe, memory_usage_report, get_category_cache
 
 logger = logging.getLogger(__name__)
 
 class QueryExecutor:
     """Executes SQL queries safely with parameter injection."""
     
-    def __init__(self):
-        self.db_manager = get_db_manager()
-        self.query_loader = get_query_loader()
+    def __init__(self, db_manager=None, query_loader=None, route_reads=True):
+        self.db_manager = db_manager or get_db_manager()
+        self.query_loader = query_loader or get_query_loader()
+        self.category_cache = get_category_cache()
+        self.memory_reports = {}
+        self.admission = get_admission_controller()
+        self.default_priority = PRIORITY_INTERACTIVE
+        self.retry = get_retry_policy(getattr(self.db_manager, 'name', 'primary'))
+        
+        # Reads go to replicas when config.DB_ENDPOINTS lists any (see routing.py)
+        self.router = None
+        if route_reads:
+            from routing import get_replica_router
+            self.router = get_replica_router()
+    
+    def _replica_for(self, query_name):
+        """Replica endpoint to run a named query on (None = this executor's connection)."""
+        if self.router is None:
+            return None
+        endpoint = self.router.select_endpoint(query_name)
+        return None if endpoint is self.router.primary else endpoint
     
-    def execute(self, query_name, params=None, as_dataframe=True):
+    def execute(self, query_name, params=None, as_dataframe=True, optimize_dtypes=None,
+                prepared=None, timeout_ms=None, cancel_token=None, priority=None):
         """
         Execute a query by name with optional parameters.
         
@@ -25,30 +53,70 @@ class QueryExecutor:
             query_name (str): Name of the query in queries.json
             params (dict): Parameters for the query (e.g., {'limit': 10})
             as_dataframe (bool): Return pandas DataFrame (True) or raw results (False)
+            optimize_dtypes (bool): Return categorical strings and downcast numerics
+                (default: config.OPTIMIZE_RESULT_DTYPES)
+            prepared (bool): Use a cached server-side prepared statement
+                (default: config.USE_PREPARED_STATEMENTS)
+            timeout_ms (int): Time limit (default: query's "timeout_ms" in
+                queries.json, else config.DEFAULT_QUERY_TIMEOUT_MS)
+            cancel_token (CancellationToken): Cancels the query while queued or running
+            priority (int): Admission priority for heavy queries
+                (default: self.default_priority)
         
         Returns:
             DataFrame or list: Query results
         """
-        # Get query metadata
-        query_info = self.query_loader.get_query(query_name)
-        sql = query_info['sql']
-        required_params = query_info.get('params', [])
-        
-        # Validate parameters
-        if required_params and not params:
-            params = {}
+        replica = self._replica_for(query_name)
+        if replica is not None:
+            logger.info(f"🧭 Routing '{query_name}' to {replica.name}")
+            with replica.connection() as db_manager:
+                return QueryExecutor(db_manager, self.query_loader, route_reads=False).execute(
+                    query_name, params, as_dataframe=as_dataframe, optimize_dtypes=optimize_dtypes,
+                    prepared=prepared, timeout_ms=timeout_ms, cancel_token=cancel_token,
+                    priority=self.default_priority if priority is None else priority
+                )
         
-        if params:
-            self._validate_params(query_name, params, required_params)
+        # Compiled at load time; binding fails fast on bad parameters
+        query = self.query_loader.get_compiled(query_name)
+        params = query.bind(params) or None
         
         # Execute query
         logger.info(f"🔄 Executing query: {query_name}")
         
+        if prepared is None:
+            prepared = USE_PREPARED_STATEMENTS
+        if timeout_ms is None:
+            timeout_ms = query.timeout_ms
+        if priority is None:
+            priority = self.default_priority
+        
         try:
-            results = self.db_manager.execute_query(sql, params)
+            with self.admission.admit(
+                query_name,
+                heavy=query.heavy,
+                priority=priority,
+                cancel_token=cancel_token,
+                timeout=ADMISSION_TIMEOUT_SECONDS
+            ):
+                if prepared:
+                    run = lambda: self._execute_prepared(query, params, timeout_ms, cancel_token)
+                else:
+                    run = lambda: self.db_manager.execute_query(
+                        apply_max_execution_time(query.sql, timeout_ms), params,
+                        timeout_ms=timeout_ms, cancel_token=cancel_token
+                    )
+                # Reads are retried on transient errors over a fresh connection
+                results = self.retry.call(
+                    run, label=query_name, idempotent=query.read_only,
+                    on_retry=self._reset_connection, cancel_token=cancel_token
+                )
             
             if as_dataframe:
                 df = pd.DataFrame(results) if results else pd.DataFrame()
+                if optimize_dtypes is None:
+                    optimize_dtypes = OPTIMIZE_RESULT_DTYPES
+                if optimize_dtypes:
+                    df = self._optimize_dtypes(query_name, df)
                 logger.info(f"✓ Query executed. Rows: {len(df)}")
                 return df
             else:
@@ -59,6 +127,105 @@ class QueryExecutor:
             logger.error(f"✗ Query execution failed: {e}")
             raise
     
+    def execute_chunked(self, query_name, params=None, chunk_size=None, optimize_dtypes=None,
+                        timeout_ms=None, cancel_token=None, priority=None):
+        """
+        Execute a query by name and stream the result as DataFrame chunks.
+        
+        Rows are fetched from an unbuffered cursor, so memory stays bounded by
+        `chunk_size` no matter how large the result is. Transient errors are
+        retried only until the first chunk has been yielded.
+        
+        Args:
+            query_name (str): Name of the query in queries.json
+            params (dict): Parameters for the query
+            chunk_size (int): Rows per chunk (default: config.EXPORT_CHUNK_SIZE)
+            optimize_dtypes (bool): Compact dtypes per chunk (default: config.OPTIMIZE_RESULT_DTYPES)
+            timeout_ms (int): Time limit until the first chunk (default: query's "timeout_ms")
+            cancel_token (CancellationToken): Cancels the query while queued or running
+            priority (int): Admission priority for heavy queries
+        
+        Yields:
+            DataFrame: Result chunk
+        """
+        replica = self._replica_for(query_name)
+        if replica is not None:
+            logger.info(f"🧭 Routing '{query_name}' to {replica.name}")
+            with replica.connection() as db_manager:
+                yield from QueryExecutor(db_manager, self.query_loader, route_reads=False).execute_chunked(
+                    query_name, params, chunk_size=chunk_size, optimize_dtypes=optimize_dtypes,
+                    timeout_ms=timeout_ms, cancel_token=cancel_token,
+                    priority=self.default_priority if priority is None else priority
+                )
+            return
+        
+        query = self.query_loader.get_compiled(query_name)
+        params = query.bind(params) or None
+        if timeout_ms is None:
+            timeout_ms = query.timeout_ms
+        if optimize_dtypes is None:
+            optimize_dtypes = OPTIMIZE_RESULT_DTYPES
+        
+        logger.info(f"🔄 Streaming query: {query_name}")
+        
+        with self.admission.admit(
+            query_name,
+            heavy=query.heavy,
+            priority=self.default_priority if priority is None else priority,
+            cancel_token=cancel_token,
+            timeout=ADMISSION_TIMEOUT_SECONDS
+        ):
+            def start_stream():
+                # No MAX_EXECUTION_TIME hint: the server counts the whole stream,
+                # including time spent in the consumer, against it
+                stream = self.db_manager.iter_query(
+                    query.sql, params,
+                    chunk_size=chunk_size or EXPORT_CHUNK_SIZE,
+                    timeout_ms=timeout_ms, cancel_token=cancel_token
+                )
+                return stream, next(stream, None)
+            
+            stream, rows = self.retry.call(
+                start_stream, label=query_name, idempotent=query.read_only,
+                on_retry=self._reset_connection, cancel_token=cancel_token
+            )
+            while rows is not None:
+                df = pd.DataFrame.from_records(rows)
+                if optimize_dtypes:
+                    df = optimize_dataframe(df, category_cache=self.category_cache)
+                yield df
+                rows = next(stream, None)
+    
+    def execute_bounded(self, query_name, params=None, memory_budget=None, chunk_size=None,
+                        timeout_ms=None, cancel_token=None, priority=None):
+        """
+        Execute a query by name within a memory budget.
+        
+        The result is streamed in chunks and kept in memory while it fits the
+        budget; past it, every chunk goes to on-disk columnar files instead.
+        
+        Args:
+            query_name (str): Name of the query in queries.json
+            params (dict): Parameters for the query
+            memory_budget (int): Bytes (default: config.MEMORY_BUDGET_BYTES; 0 = unbounded)
+            chunk_size (int): Rows per chunk (default: config.EXPORT_CHUNK_SIZE)
+            timeout_ms (int): Time limit (default: query's "timeout_ms")
+            cancel_token (CancellationToken): Cancels the query while queued or running
+            priority (int): Admission priority for heavy queries
+        
+        Returns:
+            DataFrame or SpilledResult: Query results
+        """
+        budget = MemoryBudget(query_name, memory_budget, category_cache=self.category_cache)
+        for chunk in self.execute_chunked(
+            query_name, params, chunk_size=chunk_size, timeout_ms=timeout_ms,
+            cancel_token=cancel_token, priority=priority
+        ):
+            budget.add(chunk)
+        result = budget.result()
+        logger.info(f"✓ Query executed. Rows: {len(result)}")
+        return result
+    
     def execute_raw(self, sql, params=None, as_dataframe=True):
         """
         Execute a raw SQL query (use with caution).
@@ -88,31 +255,36 @@ class QueryExecutor:
             logger.error(f"✗ Raw query execution failed: {e}")
             raise
     
-    def _validate_params(self, query_name, provided_params, required_params):
-        """
-        Validate that provided parameters match required parameters.
-        
-        Args:
-            query_name (str): Name of query (for logging)
-            provided_params (dict): Parameters provided by user
-            required_params (list): Required parameter names
-        
-        Raises:
-            ValueError: If parameters don't match
-        """
-        provided_keys = set(provided_params.keys())
-        required_keys = set(required_params)
-        
-        missing = required_keys - provided_keys
-        extra = provided_keys - required_keys
-        
-        if missing:
-            logger.warning(f"⚠️  Query '{query_name}' missing parameters: {missing}")
-        
-        if extra:
-            logger.warning(f"⚠️  Query '{query_name}' has extra parameters: {extra}")
-        
-        return True
+    def _execute_prepared(self, query, params, timeout_ms=None, cancel_token=None):
+        """Execute a compiled query through the connection's prepared statement cache."""
+        sql = apply_max_execution_time(query.positional_sql, timeout_ms)
+        values = query.bind_positional(params)
+        return self.db_manager.execute_prepared(
+            query.name, sql, values, timeout_ms=timeout_ms, cancel_token=cancel_token
+        )
+    
+    def _reset_connection(self, error):
+        """Drop a connection that failed so the retry reconnects."""
+        self.db_manager.reset_connection()
+    
+    def _optimize_dtypes(self, query_name, df):
+        """Convert a result to compact dtypes and record the memory saved."""
+        df_optimized = optimize_dataframe(df, category_cache=self.category_cache)
+        report = memory_usage_report(df, df_optimized)
+        self.memory_reports[query_name] = report
+        logger.info(
+            f"💾 Memory for '{query_name}': {report['before_bytes']:,} → "
+            f"{report['after_bytes']:,} bytes (saved {report['saved_pct']:.1f}%)"
+        )
+        return df_optimized
+    
+    def get_memory_report(self):
+        """Get memory savings per query from dtype optimization."""
+        return dict(self.memory_reports)
+    
+    def get_resilience_stats(self):
+        """Get retry counters and circuit breaker state."""
+        return self.retry.stats()
     
     def list_available_queries(self):
         """List all available queries."""
@@ -122,12 +294,17 @@ class QueryExecutor:
     
     def get_query_info(self, query_name):
         """Get detailed information about a query."""
-        query = self.query_loader.get_query(query_name)
+        query = self.query_loader.get_compiled(query_name)
         return {
             'name': query_name,
-            'description': query.get('description', ''),
-            'sql': query.get('sql', ''),
-            'parameters': query.get('params', [])
+            'description': query.description,
+            'sql': query.sql,
+            'parameters': list(query.param_names),
+            'param_types': dict(query.param_types),
+            'defaults': dict(query.defaults),
+            'tables': sorted(query.tables),
+            'timeout_ms': query.timeout_ms,
+            'heavy': query.heavy
         }
 
 
@@ -3,25 +3,276 @@
 # Loads and validates SQL queries from JSON
 # ============================================
 
+import re
+import copy
 import json
 import logging
-from config import QUERIES_FILE
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from types import MappingProxyType
+from config import QUERIES_FILE, DEFAULT_QUERY_TIMEOUT_MS
 
 logger = logging.getLogger(__name__)
 
+# Named pyformat placeholders, e.g. %(limit)s
+NAMED_PARAM_PATTERN = re.compile(r'%\((\w+)\)s')
+
+def to_positional_sql(sql):
+    """
+    Convert named placeholders to `?` markers for server-side prepared statements.
+    
+    Args:
+        sql (str): SQL with %(name)s placeholders
+    
+    Returns:
+        tuple: (converted SQL, list of parameter names in placeholder order)
+    """
+    param_names = NAMED_PARAM_PATTERN.findall(sql)
+    return NAMED_PARAM_PATTERN.sub('?', sql), param_names
+
+
+READ_ONLY_PATTERN = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+LOCKING_READ_PATTERN = re.compile(r'\bFOR\s+(UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b', re.IGNORECASE)
+
+def is_read_only(sql):
+    """Check whether a statement is a plain read (safe to retry or run on a replica)."""
+    return bool(READ_ONLY_PATTERN.match(sql)) and not LOCKING_READ_PATTERN.search(sql)
+
+
+# Tables referenced after FROM / JOIN (subqueries start with a parenthesis and are
+# skipped; so are table functions such as JSON_TABLE(...))
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)\b`?(?:\.`?(\w+)\b`?)?(?!\s*\()', re.IGNORECASE)
+SUBQUERY_PATTERN = re.compile(r'\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise ValueError("booleans are not integers")
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError("not a whole number")
+    return int(value)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('1', 'true', 'yes'):
+        return True
+    if str(value).lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError("expected true/false")
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+# Declared parameter type → converter (also accepts string values from CLI / HTTP)
+PARAM_TYPES = {
+    'int': _to_int,
+    'float': float,
+    'str': str,
+    'bool': _to_bool,
+    'date': _to_date,
+    'any': lambda value: value,
+}
+
+
+def _enclosing_paren(sql, position):
+    """Index of the innermost '(' still open at `position` (-1 at top level)."""
+    stack = []
+    for index, char in enumerate(sql[:position]):
+        if char == '(':
+            stack.append(index)
+        elif char == ')' and stack:
+            stack.pop()
+    return stack[-1] if stack else -1
+
+
+def extract_tables(sql):
+    """Get the names of the tables a SQL statement reads."""
+    tables = set()
+    for match in TABLE_PATTERN.finditer(sql):
+        opening = _enclosing_paren(sql, match.start())
+        if opening >= 0 and not SUBQUERY_PATTERN.match(sql, opening + 1):
+            continue  # FROM inside a function call, e.g. EXTRACT(YEAR FROM order_date)
+        schema_or_table, table = match.groups()
+        tables.add((table or schema_or_table).lower())
+    return frozenset(tables)
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """
+    Immutable, validated form of a queries.json entry.
+    
+    Built once per load: placeholders are parsed, checked against the
+    declared params, types and defaults, and the positional (prepared
+    statement) SQL and the tables read are precomputed.
+    """
+    name: str
+    sql: str
+    description: str
+    param_names: tuple
+    param_types: MappingProxyType
+    defaults: MappingProxyType
+    positional_sql: str
+    positional_params: tuple
+    tables: frozenset
+    read_only: bool = True
+    dimensions: tuple = ()
+    measures: tuple = ()
+    time_column: str = None
+    timeout_ms: int = DEFAULT_QUERY_TIMEOUT_MS
+    heavy: bool = False
+    primary_only: bool = False
+    raw: MappingProxyType = field(default=None, repr=False, compare=False)
+    
+    def bind(self, params=None):
+        """
+        Check and convert call parameters, filling in defaults.
+        
+        Args:
+            params (dict): Parameters for the call
+        
+        Returns:
+            dict: Typed parameters for every placeholder
+        
+        Raises:
+            ValueError: Unknown, missing or mistyped parameters
+        """
+        if not params and not self.param_names:
+            return {}
+        params = params or {}
+        extra = set(params) - set(self.param_names)
+        if extra:
+            raise ValueError(f"Query '{self.name}' got unknown parameters: {sorted(extra)}")
+        
+        bound = {}
+        for name in self.param_names:
+            if name in params:
+                value = params[name]
+            elif name in self.defaults:
+                value = self.defaults[name]
+            else:
+                raise ValueError(f"Query '{self.name}' missing parameter: {name}")
+            type_name = self.param_types.get(name, 'any')
+            try:
+                bound[name] = PARAM_TYPES[type_name](value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Query '{self.name}' parameter '{name}' must be {type_name}, got {value!r}"
+                ) from e
+        return bound
+    
+    def bind_positional(self, params=None):
+        """Bind parameters in placeholder order for the prepared-statement SQL."""
+        bound = self.bind(params)
+        return tuple(bound[name] for name in self.positional_params)
+
+
+def compile_query(name, query):
+    """
+    Validate a raw queries.json entry and build its CompiledQuery.
+    
+    Raises:
+        ValueError: If the entry is malformed or inconsistent with its SQL
+    """
+    for required in ('sql', 'description', 'params'):
+        if required not in query:
+            raise ValueError(f"Query '{name}' missing required field: {required}")
+    if not isinstance(query['params'], list):
+        raise ValueError(f"Query '{name}' params must be a list")
+    
+    sql = query['sql']
+    positional_sql, positional_params = to_positional_sql(sql)
+    declared = list(query['params'])
+    used = list(dict.fromkeys(positional_params))
+    if set(used) != set(declared):
+        raise ValueError(
+            f"Query '{name}' params {declared} do not match SQL placeholders {used}"
+        )
+    
+    param_types = dict(query.get('param_types', {}))
+    defaults = dict(query.get('defaults', {}))
+    for mapping, label in ((param_types, 'param_types'), (defaults, 'defaults')):
+        unknown = set(mapping) - set(declared)
+        if unknown:
+            raise ValueError(f"Query '{name}' {label} reference undeclared params: {sorted(unknown)}")
+    for param, type_name in param_types.items():
+        if type_name not in PARAM_TYPES:
+            raise ValueError(f"Query '{name}' param '{param}' has unknown type '{type_name}'")
+    
+    timeout_ms = query.get('timeout_ms', DEFAULT_QUERY_TIMEOUT_MS)
+    if not isinstance(timeout_ms, int) or isinstance(timeout_ms, bool) or timeout_ms < 0:
+        raise ValueError(f"Query '{name}' timeout_ms must be a non-negative integer")
+    for flag in ('heavy', 'primary_only'):
+        if not isinstance(query.get(flag, False), bool):
+            raise ValueError(f"Query '{name}' {flag} must be true or false")
+    
+    compiled = CompiledQuery(
+        name=name,
+        sql=sql,
+        description=query['description'],
+        param_names=tuple(declared),
+        param_types=MappingProxyType(param_types),
+        defaults=MappingProxyType(defaults),
+        positional_sql=positional_sql,
+        positional_params=tuple(positional_params),
+        tables=extract_tables(sql),
+        read_only=is_read_only(sql),
+        dimensions=tuple(query.get('dimensions', ())),
+        measures=tuple(query.get('measures', ())),
+        time_column=query.get('time_column'),
+        timeout_ms=timeout_ms,
+        heavy=query.get('heavy', False),
+        primary_only=query.get('primary_only', False),
+        # Private copy: the loaded JSON (and its nested lists) may be shared or mutated
+        raw=MappingProxyType(copy.deepcopy(query)),
+    )
+    # Defaults must themselves be valid values
+    for param, value in defaults.items():
+        try:
+            PARAM_TYPES[param_types.get(param, 'any')](value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Query '{name}' default for '{param}' is invalid: {value!r}") from e
+    return compiled
+
+
+class UnknownQueryError(KeyError):
+    """Raised when a query name is not defined in queries.json."""
+    
+    def __str__(self):
+        return str(self.args[0]) if self.args else ''
+
+
 class QueryLoader:
     """Loads SQL queries from queries.json configuration file."""
     
     def __init__(self, queries_file=None):
         self.queries_file = queries_file or QUERIES_FILE
         self.queries = {}
+        self.compiled = {}  # query name -> CompiledQuery
+        self.generation = 0  # Incremented by every successful load
         self.load_queries()
     
     def load_queries(self):
-        """Load all queries from JSON file."""
+        """
+        Load and compile all queries from the JSON file.
+        
+        Every entry is compiled before any is swapped in, so a bad entry
+        fails the load (ValueError) and leaves the previous queries active.
+        """
         try:
             with open(self.queries_file, 'r') as f:
-                self.queries = json.load(f)
+                queries = json.load(f)
+            compiled = {name: compile_query(name, query) for name, query in queries.items()}
+            self.queries, self.compiled = queries, compiled
+            self.generation += 1
             logger.info(f"✓ Loaded {len(self.queries)} queries from {self.queries_file.name}")
             return self.queries
         except FileNotFoundError:
@@ -30,6 +281,9 @@ class QueryLoader:
         except json.JSONDecodeError as e:
             logger.error(f"✗ Invalid JSON in queries file: {e}")
             raise
+        except ValueError as e:
+            logger.error(f"✗ Invalid query definition: {e}")
+            raise
     
     def get_query(self, query_name):
         """
@@ -40,14 +294,29 @@ class QueryLoader:
         
         Returns:
             dict: Query metadata including 'sql', 'description', 'params'
+        
+        Raises:
+            UnknownQueryError: If no query has that name
         """
         if query_name not in self.queries:
             available = ', '.join(self.queries.keys())
             logger.error(f"✗ Query '{query_name}' not found. Available: {available}")
-            raise KeyError(f"Query '{query_name}' not found")
+            raise UnknownQueryError(f"Query '{query_name}' not found")
         
         return self.queries[query_name]
     
+    def get_compiled(self, query_name):
+        """
+        Get the compiled form of a query.
+        
+        Returns:
+            CompiledQuery: Immutable query with typed parameter binding
+        """
+        compiled = self.compiled.get(query_name)
+        if compiled is None:
+            self.get_query(query_name)  # Logs and raises UnknownQueryError
+        return compiled
+    
     def get_all_queries(self):
         """Get all loaded queries."""
         return self.queries
@@ -66,15 +335,36 @@ class QueryLoader:
         query = self.get_query(query_name)
         return query.get('sql', '')
     
+    def get_prepared_sql(self, query_name):
+        """
+        Get the prepared-statement form of a query's SQL (cached until reload).
+        
+        Returns:
+            tuple: (SQL with `?` markers, ordered parameter names)
+        """
+        compiled = self.get_compiled(query_name)
+        return compiled.positional_sql, list(compiled.positional_params)
+    
     def get_query_params(self, query_name):
         """Get parameter list for a query."""
         query = self.get_query(query_name)
         return query.get('params', [])
     
     def reload(self):
-        """Reload queries from file."""
+        """
+        Reload queries from file.
+        
+        Returns:
+            list: Names of queries added, removed or changed by the reload
+        """
+        previous = self.compiled
         self.load_queries()
-        logger.info("✓ Queries reloaded")
+        changed = sorted(
+            name for name in previous.keys() | self.compiled.keys()
+            if previous.get(name) != self.compiled.get(name)
+        )
+        logger.info(f"✓ Queries reloaded ({len(changed)} changed)")
+        return changed
     
     def validate_query(self, query_name):
         """
@@ -86,16 +376,7 @@ class QueryLoader:
         Returns:
             bool: True if valid, raises exception otherwise
         """
-        query = self.get_query(query_name)
-        
-        required_fields = ['sql', 'description', 'params']
-        for field in required_fields:
-            if field not in query:
-                raise ValueError(f"Query '{query_name}' missing required field: {field}")
-        
-        if not isinstance(query['params'], list):
-            raise ValueError(f"Query '{query_name}' params must be a list")
-        
+        compile_query(query_name, self.get_query(query_name))
         logger.info(f"✓ Query '{query_name}' is valid")
         return True
 
@@ -118,8 +399,14 @@ if __name__ == '__main__':
     print("\n📋 Available Queries:")
     for query_name in loader.get_query_names():
         description = loader.get_query_description(query_name)
-        params = loader.get_query_params(query_name)
+        compiled = loader.get_compiled(query_name)
+        params = [
+            f"{name}: {compiled.param_types.get(name, 'any')}"
+            + (f" = {compiled.defaults[name]!r}" if name in compiled.defaults else '')
+            for name in compiled.param_names
+        ]
         print(f"  • {query_name}")
         print(f"    Description: {description}")
-        print(f"    Parameters: {params if params else 'None'}")
+        print(f"    Parameters: {', '.join(params) if params else 'None'}")
+        print(f"    Tables: {', '.join(sorted(compiled.tables))}")
         print()
\ No newline at end of file
@@ -0,0 +1,264 @@
+# ============================================
+# Resilience Module
+# Retries with backoff, reconnection and a circuit breaker for reads
+# ============================================
+
+import time
+import random
+import logging
+import threading
+from config import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# MySQL error codes meaning the database could not be reached (count toward the breaker)
+CONNECTION_ERRNOS = {
+    1040,  # ER_CON_COUNT_ERROR: too many connections
+    1053,  # ER_SERVER_SHUTDOWN
+    2003,  # CR_CONN_HOST_ERROR: can't connect
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST: lost connection during query
+    2055,  # CR_SERVER_LOST_EXTENDED
+}
+
+# Retryable, but the server is healthy
+CONTENTION_ERRNOS = {
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    1213,  # ER_LOCK_DEADLOCK
+}
+
+TRANSIENT_ERRNOS = CONNECTION_ERRNOS | CONTENTION_ERRNOS
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class DatabaseUnavailableError(Exception):
+    """Raised without contacting the database while the circuit breaker is open."""
+
+
+def is_transient_error(error):
+    """Check whether an exception is a connection-level failure worth retrying."""
+    return getattr(error, 'errno', None) in TRANSIENT_ERRNOS
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the database is unavailable.
+    
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls are rejected for `reset_seconds`. The circuit is then
+    half-open: exactly one call is admitted as a trial, others are rejected
+    until its outcome closes or reopens the circuit. A trial that never
+    reports back is abandoned after another `reset_seconds`.
+    """
+    
+    def __init__(self, failure_threshold=None, reset_seconds=None):
+        self.failure_threshold = failure_threshold or CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = CIRCUIT_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started = None
+        self.times_opened = 0
+        self.rejected = 0
+    
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+    
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+        return self._state
+    
+    def before_call(self):
+        """Raise DatabaseUnavailableError if the circuit is open or a half-open trial is running."""
+        with self._lock:
+            state = self._current_state()
+            now = time.monotonic()
+            if state == HALF_OPEN:
+                if self._trial_started is None or now - self._trial_started >= self.reset_seconds:
+                    self._trial_started = now
+                    return
+                self.rejected += 1
+                raise DatabaseUnavailableError("Database unavailable (circuit half-open, trial call running)")
+            if state == OPEN:
+                self.rejected += 1
+                retry_in = self.reset_seconds - (now - self._opened_at)
+                raise DatabaseUnavailableError(
+                    f"Database unavailable (circuit open, retry in {retry_in:.1f}s)"
+                )
+    
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("✓ Database reachable again; circuit closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_started = None
+            if self._current_state() == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.times_opened += 1
+                    logger.error(
+                        f"⛔ Circuit opened after {self._failures} consecutive failures; "
+                        f"failing fast for {self.reset_seconds}s"
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+    
+    def wait_until_closed(self, timeout=None):
+        """Sleep until the circuit allows a trial call (or `timeout` passes)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return True
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+        if timeout is not None and remaining > timeout:
+            return False
+        time.sleep(max(remaining, 0))
+        return True
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class RetryPolicy:
+    """
+    Retries idempotent reads on transient errors.
+    
+    Delays grow exponentially with full jitter
+    (uniform(0, min(max_delay, base_delay * 2 ** retry))), so many clients
+    recovering from the same outage do not reconnect in lockstep. Every
+    attempt passes through the endpoint's circuit breaker.
+    """
+    
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, breaker=None):
+        self.max_attempts = max_attempts or RETRY_MAX_ATTEMPTS
+        self.base_delay = RETRY_BASE_DELAY_SECONDS if base_delay is None else base_delay
+        self.max_delay = RETRY_MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self.metrics = {
+            'calls': 0,
+            'attempts': 0,
+            'retries': 0,
+            'recovered': 0,
+            'failed': 0,
+            'reconnects': 0,
+        }
+    
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.metrics[name] += amount
+    
+    def backoff(self, retry):
+        """Jittered delay before retry number `retry` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+    
+    def call(self, func, label='query', idempotent=True, on_retry=None, cancel_token=None):
+        """
+        Run `func`, retrying transient failures.
+        
+        Args:
+            func (callable): Operation to run
+            label (str): Name used in log messages
+            idempotent (bool): Only idempotent operations are retried
+            on_retry (callable): Called with the error before each retry
+                (e.g. to drop a broken connection)
+            cancel_token (CancellationToken): Stops waiting between attempts
+        
+        Raises:
+            DatabaseUnavailableError: If the circuit is open
+        """
+        self._count('calls')
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except DatabaseUnavailableError:
+                self._count('failed')
+                raise
+            attempt += 1
+            self._count('attempts')
+            try:
+                result = func()
+            except Exception as e:
+                errno = getattr(e, 'errno', None)
+                if errno in CONNECTION_ERRNOS:
+                    self.breaker.record_failure()
+                else:
+                    # The server answered, so the database itself is reachable
+                    self.breaker.record_success()
+                if not is_transient_error(e):
+                    raise
+                if not idempotent or attempt >= self.max_attempts:
+                    self._count('failed')
+                    raise
+                
+                delay = self.backoff(attempt - 1)
+                logger.warning(
+                    f"⚠️  {label}: transient error ({e}); retry {attempt}/{self.max_attempts - 1} in {delay:.2f}s"
+                )
+                if cancel_token is not None:
+                    if cancel_token.wait(delay):
+                        cancel_token.raise_if_cancelled()
+                else:
+                    time.sleep(delay)
+                if on_retry is not None:
+                    on_retry(e)
+                    self._count('reconnects')
+                self._count('retries')
+                continue
+            
+            self.breaker.record_success()
+            if attempt > 1:
+                self._count('recovered')
+                logger.info(f"✓ {label}: succeeded after {attempt} attempts")
+            return result
+    
+    def stats(self):
+        """Get retry counters and circuit breaker state."""
+        with self._lock:
+            metrics = dict(self.metrics)
+        metrics['circuit'] = self.breaker.stats()
+        return metrics
+
+
+# Retry policies by endpoint name (one circuit breaker per database server)
+_retry_policies = {}
+_retry_policies_lock = threading.Lock()
+
+def get_retry_policy(endpoint='primary'):
+    """
+    Get or create the retry policy for a database endpoint.
+    
+    Args:
+        endpoint (str): Endpoint name (DatabaseManager.name, e.g. 'primary' or a replica)
+    """
+    with _retry_policies_lock:
+        if endpoint not in _retry_policies:
+            _retry_policies[endpoint] = RetryPolicy()
+        return _retry_policies[endpoint]
+
+
+def get_retry_stats():
+    """Get retry counters and circuit state for every endpoint used so far."""
+    with _retry_policies_lock:
+        policies = dict(_retry_policies)
+    return {endpoint: policy.stats() for endpoint, policy in policies.items()}
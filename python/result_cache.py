@@ -0,0 +1,118 @@
+# ============================================
+# Result Cache Module
+# Thread-safe TTL + LRU cache for named query results
+# ============================================
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from config import SERVE_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Caches query results keyed by query name and parameters.
+    
+    At most `max_entries` results are kept; the least recently used one is
+    evicted first, and expired entries are swept on every `put`, so a
+    long-running service does not keep one result per parameter set forever.
+    
+    Results can be tagged with the query loader generation they were
+    computed under; after `invalidate(..., generation=g)` a late `put` from
+    an older generation is dropped instead of re-inserting a stale result.
+    """
+    
+    def __init__(self, ttl_seconds=60, max_entries=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = SERVE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries = OrderedDict()  # key -> (stored at, result), least recently used first
+        self._min_generation = {}  # query name -> oldest generation still accepted
+        self._all_min_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(query_name, params=None):
+        """Build a hashable cache key from a query name and its parameters."""
+        return (query_name, tuple(sorted((params or {}).items())))
+    
+    def get(self, query_name, params=None):
+        """
+        Get a cached result.
+        
+        Returns:
+            object: Cached result, or None if missing or expired
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        
+        key = self.make_key(query_name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, query_name, params, result, generation=None):
+        """
+        Store a result.
+        
+        Args:
+            generation (int): Loader generation the result was computed under
+                (None = always accept)
+        """
+        if self.ttl_seconds <= 0:
+            return
+        key = self.make_key(query_name, params)
+        now = time.monotonic()
+        with self._lock:
+            oldest = max(self._all_min_generation, self._min_generation.get(query_name, 0))
+            if generation is not None and generation < oldest:
+                logger.info(f"🧹 Dropped stale result for {query_name} (generation {generation} < {oldest})")
+                return
+            
+            for expired in [k for k, (stored, _) in self._entries.items() if now - stored > self.ttl_seconds]:
+                del self._entries[expired]
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, query_name=None, generation=None):
+        """
+        Drop cached results for one query, or everything if no name is given.
+        
+        Args:
+            generation (int): Also reject later puts tagged with an older generation
+        """
+        with self._lock:
+            if query_name is None:
+                self._entries.clear()
+                if generation is not None:
+                    self._all_min_generation = max(self._all_min_generation, generation)
+            else:
+                for key in [k for k in self._entries if k[0] == query_name]:
+                    del self._entries[key]
+                if generation is not None:
+                    self._min_generation[query_name] = max(self._min_generation.get(query_name, 0), generation)
+        logger.info(f"🧹 Result cache invalidated: {query_name or 'all queries'}")
+    
+    def stats(self):
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,230 @@
+# ============================================
+# Result Diff Module
+# Keyed diffs between runs and source-table change detection
+# ============================================
+
+import hashlib
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import SNAPSHOT_DIR, CHANGE_PROBE_MODE, CHANGE_PROBE_TABLES, DIFF_RTOL, ensure_directories
+
+logger = logging.getLogger(__name__)
+
+# Monotonic primary key per table, used by the watermark probe
+TABLE_KEYS = {
+    'sales': 'order_id',
+    'customers': 'customer_id',
+    'products': 'product_id',
+}
+
+FINGERPRINT_NAME = '_fingerprint'
+
+class ResultDiff:
+    """Rows added, removed and changed between two results of the same query."""
+    
+    def __init__(self, keys, measures, added, removed, changed, totals):
+        self.keys = keys
+        self.measures = measures
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.totals = totals
+    
+    @property
+    def has_changes(self):
+        return not (self.added.empty and self.removed.empty and self.changed.empty)
+    
+    def summary(self):
+        """One-line description of the diff."""
+        parts = [f"+{len(self.added)} added", f"-{len(self.removed)} removed", f"~{len(self.changed)} changed"]
+        for measure, delta in self.totals.items():
+            if delta:
+                parts.append(f"{measure} {delta:+,.2f}")
+        return ', '.join(parts)
+
+
+def _comparable(df, keys):
+    """Categorical keys become plain objects so old and new results join cleanly."""
+    df = df.copy()
+    for key in keys:
+        if isinstance(df[key].dtype, pd.CategoricalDtype):
+            df[key] = df[key].astype(object)
+    return df
+
+
+def diff_results(previous, current, keys=None, measures=None, rtol=None):
+    """
+    Compute a keyed diff between two query results.
+    
+    Args:
+        previous (DataFrame): Last stored result
+        current (DataFrame): New result
+        keys (list): Columns identifying a row (e.g. the query's dimensions);
+            if missing or not unique, whole rows are compared
+        measures (list): Numeric columns to report deltas for
+        rtol (float): Relative tolerance for numeric changes (default: config.DIFF_RTOL)
+    
+    Returns:
+        ResultDiff: added / removed / changed rows and total deltas per measure
+    """
+    rtol = DIFF_RTOL if rtol is None else rtol
+    columns = [c for c in current.columns if c in previous.columns]
+    measures = [m for m in (measures or []) if m in columns]
+    keys = [k for k in (keys or []) if k in columns]
+    if not keys or previous.duplicated(keys).any() or current.duplicated(keys).any():
+        keys = columns
+    values = [c for c in columns if c not in keys]
+    
+    merged = _comparable(previous[columns], keys).merge(
+        _comparable(current[columns], keys),
+        on=keys, how='outer', suffixes=('_old', '_new'), indicator=True
+    )
+    added = merged.loc[merged['_merge'] == 'right_only', keys + [f"{c}_new" for c in values]]
+    added.columns = keys + values
+    removed = merged.loc[merged['_merge'] == 'left_only', keys + [f"{c}_old" for c in values]]
+    removed.columns = keys + values
+    
+    both = merged[merged['_merge'] == 'both']
+    changed_mask = np.zeros(len(both), dtype=bool)
+    for column in values:
+        old, new = both[f"{column}_old"], both[f"{column}_new"]
+        if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+            same = np.isclose(old.to_numpy(dtype='float64'), new.to_numpy(dtype='float64'),
+                              rtol=rtol, atol=0.0, equal_nan=True)
+        else:
+            same = ((old == new) | (old.isna() & new.isna())).to_numpy()
+        changed_mask |= ~same
+    
+    changed = both.loc[changed_mask, keys + [f"{c}_{s}" for c in values for s in ('old', 'new')]].copy()
+    for measure in (m for m in measures if m in values):
+        changed[f"{measure}_delta"] = (
+            pd.to_numeric(changed[f"{measure}_new"]) - pd.to_numeric(changed[f"{measure}_old"])
+        )
+    
+    totals = {
+        m: float(pd.to_numeric(current[m]).sum() - pd.to_numeric(previous[m]).sum())
+        for m in measures
+    }
+    return ResultDiff(keys, measures, added.reset_index(drop=True),
+                      removed.reset_index(drop=True), changed.reset_index(drop=True), totals)
+
+
+class ResultStore:
+    """Keeps the last result of each named query (and the last source fingerprint) on disk."""
+    
+    def __init__(self, directory=None):
+        self.directory = Path(directory or SNAPSHOT_DIR)
+    
+    def _path(self, query_name, params=None):
+        name = query_name
+        if params:
+            digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:12]
+            name = f"{query_name}-{digest}"
+        return self.directory / f"{name}.pkl"
+    
+    def load(self, query_name, params=None):
+        """Get the stored result, or None if the query has not been stored yet."""
+        path = self._path(query_name, params)
+        return pd.read_pickle(path) if path.exists() else None
+    
+    def save(self, query_name, df, params=None):
+        ensure_directories()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        df.to_pickle(self._path(query_name, params))
+    
+    def load_fingerprint(self):
+        path = self._path(FINGERPRINT_NAME)
+        return pd.read_pickle(path) if path.exists() else None
+    
+    def save_fingerprint(self, fingerprint):
+        ensure_directories()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(fingerprint, self._path(FINGERPRINT_NAME))
+    
+    def track(self, query_name, df, keys=None, measures=None, params=None):
+        """
+        Diff a new result against the stored one and store the new result.
+        
+        Returns:
+            ResultDiff: Diff, or None on the first run of the query
+        """
+        previous = self.load(query_name, params)
+        self.save(query_name, df, params)
+        if previous is None:
+            return None
+        diff = diff_results(previous, df, keys, measures)
+        logger.info(f"🔁 {query_name}: {diff.summary() if diff.has_changes else 'unchanged'}")
+        return diff
+
+
+class ChangeProbe:
+    """
+    "Has any source table changed" check.
+    
+    'watermark' mode reads MAX(primary key) per table (one index lookup)
+    plus UPDATE_TIME from information_schema, so it costs the same on any
+    table size. MAX(pk) catches inserts; deletes and in-place UPDATEs are
+    only seen through UPDATE_TIME, which MySQL 8 caches for
+    information_schema_stats_expiry (24 h by default). Set it to 0 on the
+    server, or use 'checksum' mode, when rows are deleted or updated.
+    'checksum' mode runs CHECKSUM TABLE, which is exact but reads every row.
+    """
+    
+    def __init__(self, db_manager=None, tables=None, mode=None):
+        if db_manager is None:
+            from db import get_db_manager
+            db_manager = get_db_manager()
+        self.db = db_manager
+        self.tables = list(tables or CHANGE_PROBE_TABLES)
+        self.mode = mode or CHANGE_PROBE_MODE
+        if self.mode not in ('watermark', 'checksum'):
+            raise ValueError(f"Unsupported change probe mode: {self.mode}")
+    
+    def fingerprint(self):
+        """
+        Get the current fingerprint of the source tables.
+        
+        Returns:
+            dict: Table name → comparable state
+        """
+        if self.mode == 'checksum':
+            rows = self.db.execute_query(f"CHECKSUM TABLE {', '.join(self.tables)}")
+            return {row['Table'].split('.')[-1]: row['Checksum'] for row in rows}
+        
+        placeholders = ', '.join(['%s'] * len(self.tables))
+        rows = self.db.execute_query(
+            "SELECT TABLE_NAME AS table_name, UPDATE_TIME AS update_time FROM information_schema.TABLES "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})",
+            tuple(self.tables)
+        )
+        update_times = {row['table_name']: str(row['update_time']) for row in rows}
+        
+        keyed = [t for t in self.tables if t in TABLE_KEYS]
+        select = ', '.join(f"(SELECT MAX({TABLE_KEYS[t]}) FROM {t}) AS {t}__max" for t in keyed)
+        watermarks = self.db.execute_query(f"SELECT {select}")[0] if keyed else {}
+        
+        return {
+            table: (watermarks.get(f"{table}__max"), update_times.get(table))
+            for table in self.tables
+        }
+    
+    def has_changed(self, store=None):
+        """
+        Compare the current fingerprint with the last recorded one.
+        
+        Returns:
+            tuple: (changed, fingerprint); record the fingerprint with
+                `store.save_fingerprint` once publishing has succeeded
+        """
+        store = store or ResultStore()
+        fingerprint = self.fingerprint()
+        previous = store.load_fingerprint()
+        changed = previous is None or previous != fingerprint
+        if changed:
+            tables = [t for t in self.tables if previous is None or previous.get(t) != fingerprint.get(t)]
+            logger.info(f"🔔 Source tables changed: {', '.join(tables)}")
+        else:
+            logger.info("✓ No source table changes since the last run")
+        return changed, fingerprint
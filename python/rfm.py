@@ -0,0 +1,354 @@
+# ============================================
+# RFM Segmentation Module
+# Recency / frequency / monetary scores and cohort retention
+# ============================================
+
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import (
+    RFM_QUANTILES, RFM_CHUNK_SIZE, RFM_COMPACT_ROWS,
+    RFM_STATE_FILE, RFM_SEGMENTS_FILE, MEMORY_BUDGET_BYTES, ensure_directories
+)
+
+logger = logging.getLogger(__name__)
+
+# Bits reserved for the month index in packed (customer, month) activity codes
+MONTH_BITS = 15
+# Month indexes count from this epoch, so 1900-01 .. 4630-08 fit in MONTH_BITS
+MONTH_EPOCH = np.datetime64('1900-01', 'M')
+
+STREAM_QUERY = 'sales_transactions_since'
+
+AGGREGATIONS = {
+    'first_order': 'min',
+    'last_order': 'max',
+    'frequency': 'sum',
+    'monetary': 'sum',
+}
+
+def quantile_scores(values, quantiles=None):
+    """
+    Score values 1..quantiles by rank-based quantile (higher value → higher score).
+    
+    Ranks break ties by position, so every quantile gets an equal share of
+    customers even when many values are identical.
+    """
+    quantiles = quantiles or RFM_QUANTILES
+    pct = values.rank(method='first', pct=True)
+    return np.ceil(pct * quantiles).clip(1, quantiles).astype('int8')
+
+
+def label_segments(r, f):
+    """Map R and F scores (1-5 scale) to named segments, vectorized."""
+    r, f = np.asarray(r), np.asarray(f)
+    conditions = [
+        (r >= 4) & (f >= 4),
+        (r >= 3) & (f >= 3),
+        (r >= 4) & (f <= 1),
+        (r >= 4),
+        (r == 3),
+        (r == 1) & (f >= 4),
+        (f >= 3),
+        (r == 2),
+    ]
+    choices = [
+        'Champions',
+        'Loyal Customers',
+        'New Customers',
+        'Potential Loyalists',
+        'Promising',
+        'Cannot Lose Them',
+        'At Risk',
+        'Hibernating',
+    ]
+    return np.select(conditions, choices, default='Lost')
+
+
+def month_index(dates):
+    """
+    Months since MONTH_EPOCH for datetime64 values.
+    
+    Raises:
+        ValueError: If a date falls outside the range MONTH_BITS can pack
+    """
+    months = (np.asarray(dates).astype('datetime64[M]') - MONTH_EPOCH).astype(np.int64)
+    if len(months) and (months.min() < 0 or months.max() >= 1 << MONTH_BITS):
+        raise ValueError(
+            f"Order month outside the packable range {MONTH_EPOCH} .. "
+            f"{MONTH_EPOCH + (1 << MONTH_BITS) - 1}"
+        )
+    return months
+
+
+class RFMEngine:
+    """
+    Streaming RFM and cohort-retention engine.
+    
+    Sales are consumed in chunks and reduced to per-customer aggregates
+    (first/last order, frequency, monetary) plus packed (customer, month)
+    activity codes, so memory depends on the number of customers rather
+    than the number of sales. State is persisted together with an
+    `order_id` watermark; `refresh()` only streams sales added since.
+    """
+    
+    def __init__(self, state_file=None, quantiles=None):
+        self.state_file = Path(state_file or RFM_STATE_FILE)
+        self.quantiles = quantiles or RFM_QUANTILES
+        self._clear()
+    
+    def _clear(self):
+        self.customers = pd.DataFrame(
+            {
+                'first_order': pd.Series(dtype='datetime64[ns]'),
+                'last_order': pd.Series(dtype='datetime64[ns]'),
+                'frequency': pd.Series(dtype='int64'),
+                'monetary': pd.Series(dtype='float64'),
+            },
+            index=pd.Index([], dtype='int64', name='customer_id')
+        )
+        self.activity = np.empty(0, dtype=np.int64)
+        self.watermark = 0
+        self._pending = []
+        self._pending_activity = []
+        self._pending_rows = 0
+        self._pending_bytes = 0
+    
+    # ============================================
+    # Streaming Updates
+    # ============================================
+    
+    def update(self, chunk):
+        """
+        Fold one chunk of sales into the state.
+        
+        Args:
+            chunk (DataFrame): Columns order_id, customer_id, order_date, total_amount
+        """
+        if chunk.empty:
+            return self
+        
+        customer_ids = chunk['customer_id'].to_numpy(dtype=np.int64)
+        dates = pd.to_datetime(chunk['order_date']).to_numpy(dtype='datetime64[ns]')
+        amounts = pd.to_numeric(chunk['total_amount']).to_numpy(dtype='float64')
+        
+        partial = pd.DataFrame({
+            'customer_id': customer_ids,
+            'first_order': dates,
+            'last_order': dates,
+            'frequency': np.ones(len(chunk), dtype=np.int64),
+            'monetary': amounts,
+        }).groupby('customer_id', sort=False).agg(AGGREGATIONS)
+        self._pending.append(partial)
+        
+        months = month_index(dates)
+        self._pending_activity.append(np.unique((customer_ids << MONTH_BITS) | months))
+        
+        if 'order_id' in chunk.columns:
+            self.watermark = max(self.watermark, int(chunk['order_id'].max()))
+        
+        self._pending_rows += len(partial)
+        self._pending_bytes += int(partial.memory_usage().sum())
+        # Pending partials may use a quarter of the memory budget before merging
+        if (self._pending_rows >= RFM_COMPACT_ROWS
+                or (MEMORY_BUDGET_BYTES and self._pending_bytes >= MEMORY_BUDGET_BYTES // 4)):
+            self.compact()
+        return self
+    
+    def compact(self):
+        """
+        Merge pending partial aggregates into the customer state.
+        
+        Called automatically when pending partials outgrow their budget and
+        before any read; call it directly to finish a batch of updates.
+        """
+        if not self._pending:
+            return
+        frames = [self.customers] + self._pending if len(self.customers) else self._pending
+        self.customers = pd.concat(frames).groupby(level=0).agg(AGGREGATIONS)
+        self.customers.index.name = 'customer_id'
+        self.activity = np.unique(np.concatenate([self.activity] + self._pending_activity))
+        self._pending, self._pending_activity = [], []
+        self._pending_rows = self._pending_bytes = 0
+    
+    def refresh(self, executor, chunk_size=None):
+        """
+        Stream sales newer than the watermark from the database and rescore.
+        
+        Args:
+            executor (QueryExecutor): Executor used to stream `sales_transactions_since`
+            chunk_size (int): Rows per streamed chunk
+        
+        Returns:
+            DataFrame: Segment assignments
+        """
+        if not len(self.customers) and self.state_file.exists():
+            self.load_state()
+        
+        start_watermark = self.watermark
+        rows = 0
+        for chunk in executor.execute_chunked(
+            STREAM_QUERY, {'after_order_id': start_watermark},
+            chunk_size=chunk_size or RFM_CHUNK_SIZE
+        ):
+            self.update(chunk)
+            rows += len(chunk)
+        self.compact()
+        logger.info(f"✓ RFM state refreshed with {rows:,} new sales (order_id > {start_watermark})")
+        
+        segments = self.score()
+        self.save_state()
+        self.save_segments(segments)
+        return segments
+    
+    # ============================================
+    # Scoring & Cohorts
+    # ============================================
+    
+    def score(self, as_of=None):
+        """
+        Compute quantile-based R, F, M scores and segment labels.
+        
+        Args:
+            as_of (date): Reference date for recency (default: day after latest order)
+        
+        Returns:
+            DataFrame: Indexed by customer_id with recency_days, frequency,
+                monetary, r_score, f_score, m_score, rfm_score, segment
+        """
+        self.compact()
+        customers = self.customers
+        if customers.empty:
+            return pd.DataFrame()
+        
+        as_of = pd.Timestamp(as_of) if as_of is not None else customers['last_order'].max() + pd.Timedelta(days=1)
+        recency = (as_of - customers['last_order']).dt.days
+        
+        scores = pd.DataFrame(index=customers.index)
+        scores['recency_days'] = recency.astype('int32')
+        scores['frequency'] = customers['frequency']
+        scores['monetary'] = customers['monetary']
+        scores['r_score'] = quantile_scores(-recency, self.quantiles)
+        scores['f_score'] = quantile_scores(customers['frequency'], self.quantiles)
+        scores['m_score'] = quantile_scores(customers['monetary'], self.quantiles)
+        scores['rfm_score'] = (
+            scores['r_score'].astype('int16') * 100
+            + scores['f_score'].astype('int16') * 10
+            + scores['m_score']
+        )
+        
+        # Segment rules are defined on a 1-5 scale
+        scale = 5 / self.quantiles
+        r5 = np.ceil(scores['r_score'] * scale).astype(int)
+        f5 = np.ceil(scores['f_score'] * scale).astype(int)
+        scores['segment'] = pd.Categorical(label_segments(r5, f5))
+        return scores
+    
+    def segment_summary(self, scores=None):
+        """Customers, revenue and average scores per segment."""
+        scores = self.score() if scores is None else scores
+        return scores.groupby('segment', observed=True).agg(
+            customers=('frequency', 'size'),
+            revenue=('monetary', 'sum'),
+            avg_recency_days=('recency_days', 'mean'),
+            avg_frequency=('frequency', 'mean'),
+        ).sort_values('revenue', ascending=False)
+    
+    def cohort_retention(self, as_share=True):
+        """
+        Cohort matrix: rows are first-purchase months, columns are months since
+        the first purchase, values are the share (or count) of active customers.
+        
+        Returns:
+            DataFrame: Cohort retention matrix
+        """
+        self.compact()
+        if not len(self.activity):
+            return pd.DataFrame()
+        
+        customer_ids = self.activity >> MONTH_BITS
+        months = self.activity & ((1 << MONTH_BITS) - 1)
+        
+        cohorts = self.customers['first_order'].to_numpy(dtype='datetime64[ns]')
+        cohort_months = pd.Series(month_index(cohorts), index=self.customers.index)
+        cohort = cohort_months.reindex(customer_ids).to_numpy()
+        period = months - cohort
+        
+        counts = pd.DataFrame({'cohort': cohort, 'period': period}).groupby(
+            ['cohort', 'period']
+        ).size().unstack(fill_value=0)
+        counts.index = pd.to_datetime(MONTH_EPOCH + counts.index.to_numpy()).strftime('%Y-%m')
+        counts.index.name = 'cohort'
+        
+        if not as_share:
+            return counts
+        return counts.div(counts[0], axis=0).round(4)
+    
+    # ============================================
+    # Persistence
+    # ============================================
+    
+    def save_state(self):
+        """Persist aggregates, activity codes and the watermark."""
+        self.compact()
+        ensure_directories()
+        pd.to_pickle({
+            'customers': self.customers,
+            'activity': self.activity,
+            'watermark': self.watermark,
+            'month_epoch': str(MONTH_EPOCH),
+        }, self.state_file)
+        logger.info(f"💾 RFM state saved: {self.state_file.name} (watermark {self.watermark})")
+    
+    def reset(self):
+        """
+        Forget all aggregates and the watermark, and delete the saved state.
+        
+        Needed whenever `sales` is rebuilt: order_ids restart, so the old
+        watermark would skip every new sale.
+        """
+        self._clear()
+        self.state_file.unlink(missing_ok=True)
+        logger.info(f"🧹 RFM state reset: {self.state_file.name}")
+    
+    def load_state(self):
+        """Load persisted state."""
+        state = pd.read_pickle(self.state_file)
+        self.customers = state['customers']
+        self.activity = state['activity']
+        if state.get('month_epoch') != str(MONTH_EPOCH):
+            # Older state packed months since 1970-01; rebase onto MONTH_EPOCH
+            customer_ids = self.activity >> MONTH_BITS
+            months = (self.activity & ((1 << MONTH_BITS) - 1)) + (
+                np.datetime64('1970-01', 'M') - MONTH_EPOCH
+            ).astype(np.int64)
+            self.activity = (customer_ids << MONTH_BITS) | months
+        self.watermark = state['watermark']
+        logger.info(f"✓ RFM state loaded: {len(self.customers):,} customers (watermark {self.watermark})")
+        return self
+    
+    def save_segments(self, scores, path=None):
+        """Write segment assignments to CSV."""
+        path = Path(path or RFM_SEGMENTS_FILE)
+        ensure_directories()
+        scores.to_csv(path)
+        logger.info(f"✓ RFM segments saved: {path.name}")
+        return path
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    rng = np.random.default_rng(1)
+    rows = 200000
+    chunk = pd.DataFrame({
+        'order_id': np.arange(1, rows + 1),
+        'customer_id': rng.integers(1, 20000, rows),
+        'order_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'total_amount': rng.gamma(2.0, 1500.0, rows),
+    })
+    engine = RFMEngine(state_file=Path('/tmp/rfm_demo_state.pkl'))
+    engine.update(chunk)
+    print(engine.segment_summary())
+    print(engine.cohort_retention().iloc[:6, :6])
@@ -0,0 +1,483 @@
+# ============================================
+# Routing Module
+# Read-replica routing and sharded aggregate fan-out
+# ============================================
+
+import re
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from config import (
+    DB_ENDPOINTS, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    ADMISSION_TIMEOUT_SECONDS, PRIORITY_INTERACTIVE
+)
+from db import DatabaseManager, apply_max_execution_time
+from admission import get_admission_controller
+from query_loader import get_query_loader
+from query_executor import QueryExecutor
+
+logger = logging.getLogger(__name__)
+
+ROLE_PRIMARY = 'primary'
+ROLE_REPLICA = 'replica'
+ROLE_SHARD = 'shard'
+
+class Endpoint:
+    """A database node with a role tag, a small connection pool and load statistics."""
+    
+    def __init__(self, name, role, host, port, user=None, password=None, database=None):
+        self.name = name
+        self.role = role
+        self.settings = {
+            'host': host, 'port': port, 'user': user,
+            'password': password, 'database': database, 'name': name,
+        }
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.avg_latency = 0.0  # Exponentially weighted, seconds
+        self.replication_lag = None
+        self.lag_checked_at = 0.0
+    
+    @classmethod
+    def from_config(cls, entry):
+        """Build an endpoint from a config.DB_ENDPOINTS entry."""
+        return cls(
+            name=entry['name'],
+            role=entry.get('role', ROLE_REPLICA),
+            host=entry.get('host'),
+            port=entry.get('port'),
+            user=entry.get('user'),
+            password=entry.get('password'),
+            database=entry.get('database'),
+        )
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a DatabaseManager for this endpoint and record its latency."""
+        try:
+            db_manager = self._idle.get_nowait()
+        except queue.Empty:
+            db_manager = DatabaseManager(**self.settings)
+        
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield db_manager
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.in_flight -= 1
+                self.avg_latency = elapsed if not self.avg_latency else 0.8 * self.avg_latency + 0.2 * elapsed
+            self._idle.put(db_manager)
+    
+    def load_score(self):
+        """Expected wait if one more query is sent here (lower is better)."""
+        return (self.in_flight + 1) * max(self.avg_latency, 0.001)
+    
+    def close(self):
+        """Close all idle connections."""
+        while not self._idle.empty():
+            self._idle.get_nowait().disconnect()
+
+
+class ReplicaRouter:
+    """
+    Routes read-only named queries to the least-loaded healthy replica.
+    
+    Replicas whose replication lag exceeds `max_lag_seconds` (or cannot be
+    measured) are skipped. Writes, locking reads and queries marked
+    `"primary_only": true` in queries.json always go to the primary.
+    """
+    
+    def __init__(self, endpoints=None, max_lag_seconds=None, query_loader=None):
+        entries = DB_ENDPOINTS if endpoints is None else endpoints
+        self.endpoints = [e if isinstance(e, Endpoint) else Endpoint.from_config(e) for e in entries]
+        self.max_lag_seconds = REPLICA_MAX_LAG_SECONDS if max_lag_seconds is None else max_lag_seconds
+        self.query_loader = query_loader or get_query_loader()
+        
+        primaries = self.get_endpoints(ROLE_PRIMARY)
+        if len(primaries) != 1:
+            raise ValueError(f"Exactly one primary endpoint required, found {len(primaries)}")
+        self.primary = primaries[0]
+    
+    def get_endpoints(self, role):
+        """Get endpoints with a given role tag."""
+        return [e for e in self.endpoints if e.role == role]
+    
+    # ============================================
+    # Replica Health
+    # ============================================
+    
+    def _read_replication_lag(self, endpoint):
+        """Read Seconds_Behind_Source from a replica (None if not replicating)."""
+        with endpoint.connection() as db_manager:
+            for sql, column in [
+                ('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+                ('SHOW SLAVE STATUS', 'Seconds_Behind_Master'),
+            ]:
+                try:
+                    rows = db_manager.execute_query(sql)
+                except Exception:
+                    continue
+                if rows:
+                    return rows[0].get(column)
+        return None
+    
+    def get_replication_lag(self, endpoint):
+        """Get cached replication lag, refreshing it every REPLICA_LAG_CHECK_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        if now - endpoint.lag_checked_at >= REPLICA_LAG_CHECK_INTERVAL_SECONDS:
+            try:
+                endpoint.replication_lag = self._read_replication_lag(endpoint)
+            except Exception as e:
+                logger.warning(f"⚠️  Could not read lag from {endpoint.name}: {e}")
+                endpoint.replication_lag = None
+            endpoint.lag_checked_at = now
+        return endpoint.replication_lag
+    
+    def healthy_replicas(self):
+        """Get replicas within the replication-lag threshold."""
+        healthy = []
+        for endpoint in self.get_endpoints(ROLE_REPLICA):
+            lag = self.get_replication_lag(endpoint)
+            if lag is not None and lag <= self.max_lag_seconds:
+                healthy.append(endpoint)
+        return healthy
+    
+    # ============================================
+    # Routing
+    # ============================================
+    
+    def select_endpoint(self, query_name):
+        """
+        Choose the endpoint for a named query.
+        
+        Returns:
+            Endpoint: Least-loaded healthy replica, or the primary
+        """
+        query = self.query_loader.get_compiled(query_name)
+        if query.primary_only or not query.read_only:
+            return self.primary
+        
+        replicas = self.healthy_replicas()
+        if not replicas:
+            return self.primary
+        return min(replicas, key=lambda e: e.load_score())
+    
+    def execute(self, query_name, params=None, **kwargs):
+        """
+        Execute a named query on the routed endpoint.
+        
+        Args:
+            query_name (str): Name of the query in queries.json
+            params (dict): Query parameters
+            **kwargs: Passed to QueryExecutor.execute
+        
+        Returns:
+            DataFrame or list: Query results
+        """
+        endpoint = self.select_endpoint(query_name)
+        logger.info(f"🧭 Routing '{query_name}' to {endpoint.name} ({endpoint.role})")
+        with endpoint.connection() as db_manager:
+            executor = QueryExecutor(db_manager, self.query_loader, route_reads=False)
+            return executor.execute(query_name, params, **kwargs)
+    
+    def close(self):
+        """Close all endpoint connections."""
+        for endpoint in self.endpoints:
+            endpoint.close()
+
+
+# Shared router for QueryExecutor (only when DB_ENDPOINTS lists replicas)
+_replica_router = None
+_replica_router_lock = threading.Lock()
+
+def get_replica_router():
+    """
+    Get the shared ReplicaRouter, or None when no replica endpoints are configured.
+    
+    QueryExecutor uses it to send reads to replicas; with a primary-only
+    DB_ENDPOINTS every query keeps running on the executor's own connection.
+    """
+    global _replica_router
+    if not any(entry.get('role', ROLE_REPLICA) == ROLE_REPLICA for entry in DB_ENDPOINTS):
+        return None
+    with _replica_router_lock:
+        if _replica_router is None:
+            _replica_router = ReplicaRouter()
+        return _replica_router
+
+
+# ============================================
+# Sharded Aggregate Fan-Out
+# ============================================
+
+AGGREGATE_PATTERN = re.compile(r'^(SUM|COUNT|AVG|MIN|MAX)\s*\((.*)\)$', re.IGNORECASE | re.DOTALL)
+ALIAS_PATTERN = re.compile(r'^(.*?)\s+AS\s+`?(\w+)`?$', re.IGNORECASE | re.DOTALL)
+GROUP_BY_PATTERN = re.compile(r'\bGROUP\s+BY\s+(?P<group>.*)$', re.IGNORECASE | re.DOTALL)
+IDENTIFIER_PATTERN = re.compile(r'^`?(\w+)`?(?:\.`?(\w+)`?)?$')
+SELECT_PATTERN = re.compile(
+    r'^\s*SELECT\s+(?P<select>.*?)\s+FROM\s+(?P<body>.*?)'
+    r'(?:\s+ORDER\s+BY\s+(?P<order>.*?))?'
+    r'(?:\s+LIMIT\s+(?P<limit>\S+))?\s*;?\s*$',
+    re.IGNORECASE | re.DOTALL
+)
+
+def _split_top_level(text, separator=','):
+    """Split on separators that are not inside parentheses or quotes."""
+    parts, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def plan_sharded_query(sql):
+    """
+    Rewrite an aggregate query into a per-shard partial query plus a merge plan.
+    
+    AVG(x) is split into SUM(x) and COUNT(x) so the client can compute the
+    exact global average. ORDER BY and LIMIT are removed from the shard SQL
+    and applied after merging.
+    
+    Args:
+        sql (str): Named query SQL
+    
+    Returns:
+        dict: 'shard_sql', 'columns', 'keys', 'aggregates' (alias -> function),
+              'order' ([(column, ascending)]), 'limit' (str or None)
+    
+    Raises:
+        ValueError: If the query cannot be merged correctly (e.g. COUNT(DISTINCT),
+            GROUP BY on a column that is not selected, ORDER BY on an expression)
+    """
+    match = SELECT_PATTERN.match(sql)
+    if not match:
+        raise ValueError("Only single SELECT ... FROM ... statements can be sharded")
+    
+    if re.search(r'\bHAVING\b', match.group('body'), re.IGNORECASE):
+        raise ValueError("HAVING cannot be applied to partial shard aggregates")
+    
+    columns, keys, key_exprs, aggregates, shard_items = [], [], set(), {}, []
+    for item in _split_top_level(match.group('select')):
+        alias_match = ALIAS_PATTERN.match(item)
+        expr, alias = (alias_match.group(1).strip(), alias_match.group(2)) if alias_match else (item, item.split('.')[-1])
+        
+        columns.append(alias)
+        agg_match = AGGREGATE_PATTERN.match(expr)
+        if agg_match is None:
+            keys.append(alias)
+            key_exprs.update({alias.lower(), expr.lower()})
+            shard_items.append(f"{expr} AS {alias}")
+            continue
+        
+        func, argument = agg_match.group(1).upper(), agg_match.group(2).strip()
+        if argument.upper().startswith('DISTINCT'):
+            raise ValueError(f"{func}(DISTINCT ...) cannot be merged across shards: {alias}")
+        
+        aggregates[alias] = func
+        if func == 'AVG':
+            shard_items.append(f"SUM({argument}) AS {alias}__sum")
+            shard_items.append(f"COUNT({argument}) AS {alias}__count")
+        else:
+            shard_items.append(f"{func}({argument}) AS {alias}")
+    
+    if not aggregates:
+        raise ValueError("Sharded mode requires an aggregate query")
+    
+    # Merging regroups on the selected keys, so every GROUP BY term must be one of them
+    group_match = GROUP_BY_PATTERN.search(match.group('body'))
+    if group_match:
+        if re.search(r'\bWITH\s+ROLLUP\b', group_match.group('group'), re.IGNORECASE):
+            raise ValueError("WITH ROLLUP cannot be merged across shards")
+        for term in _split_top_level(group_match.group('group')):
+            if term.lower() not in key_exprs and term.split('.')[-1].strip('`').lower() not in key_exprs:
+                raise ValueError(f"GROUP BY {term} is not a selected column, so shard partials cannot be merged")
+    
+    # The merged frame only has the selected columns to sort on
+    order = []
+    if match.group('order'):
+        for term in _split_top_level(match.group('order')):
+            words = term.split()
+            direction = words[1].upper() if len(words) > 1 else 'ASC'
+            identifier = IDENTIFIER_PATTERN.match(words[0]) if words else None
+            if len(words) > 2 or direction not in ('ASC', 'DESC') or identifier is None:
+                raise ValueError(f"ORDER BY {term} is an expression; order by a selected column alias instead")
+            column = identifier.group(2) or identifier.group(1)
+            if column not in columns:
+                raise ValueError(f"ORDER BY {term} is not a selected column")
+            order.append((column, direction == 'ASC'))
+    
+    return {
+        'shard_sql': f"SELECT {', '.join(shard_items)} FROM {match.group('body')}",
+        'columns': columns,
+        'keys': keys,
+        'aggregates': aggregates,
+        'order': order,
+        'limit': match.group('limit'),
+    }
+
+
+def merge_partial_aggregates(frames, plan, params=None):
+    """
+    Merge per-shard partial results into the final aggregate.
+    
+    Args:
+        frames (list): Partial DataFrames from each shard
+        plan (dict): Output of plan_sharded_query
+        params (dict): Query parameters (to resolve a LIMIT placeholder)
+    
+    Returns:
+        DataFrame: Merged result with the original column order
+    """
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    
+    how = {}
+    for alias, func in plan['aggregates'].items():
+        if func == 'AVG':
+            for part in (f"{alias}__sum", f"{alias}__count"):
+                combined[part] = pd.to_numeric(combined[part])
+                how[part] = 'sum'
+        else:
+            combined[alias] = pd.to_numeric(combined[alias])
+            how[alias] = {'SUM': 'sum', 'COUNT': 'sum', 'MIN': 'min', 'MAX': 'max'}[func]
+    
+    if plan['keys']:
+        merged = combined.groupby(plan['keys'], as_index=False, dropna=False, sort=False).agg(how)
+    else:
+        merged = combined.agg(how).to_frame().T
+    
+    for alias, func in plan['aggregates'].items():
+        if func == 'AVG':
+            counts = merged[f"{alias}__count"]
+            merged[alias] = merged[f"{alias}__sum"] / counts.where(counts != 0)
+    
+    merged = merged[plan['columns']]
+    
+    if plan['order']:
+        columns, ascending = zip(*plan['order'])
+        merged = merged.sort_values(list(columns), ascending=list(ascending), kind='stable')
+    
+    limit = plan['limit']
+    if limit:
+        placeholder = re.match(r'%\((\w+)\)s', limit)
+        merged = merged.head(int((params or {})[placeholder.group(1)] if placeholder else limit))
+    
+    return merged.reset_index(drop=True)
+
+
+class ShardedQueryExecutor:
+    """
+    Fans a named aggregate query out to all shard endpoints and merges the results.
+    
+    The fan-out takes one admission slot (heavy queries share the global
+    limit) and every shard statement runs under the query's timeout.
+    """
+    
+    def __init__(self, endpoints=None, query_loader=None):
+        entries = DB_ENDPOINTS if endpoints is None else endpoints
+        all_endpoints = [e if isinstance(e, Endpoint) else Endpoint.from_config(e) for e in entries]
+        self.shards = [e for e in all_endpoints if e.role == ROLE_SHARD]
+        if not self.shards:
+            raise ValueError("No endpoints with role 'shard' configured in DB_ENDPOINTS")
+        self.query_loader = query_loader or get_query_loader()
+        self.admission = get_admission_controller()
+        self.default_priority = PRIORITY_INTERACTIVE
+        self._plans = {}  # SQL text -> plan
+    
+    def get_plan(self, query_name):
+        """Get (and cache) the shard plan for a named query."""
+        sql = self.query_loader.get_query_sql(query_name)
+        plan = self._plans.get(sql)
+        if plan is None:
+            plan = plan_sharded_query(sql)
+            self._plans[sql] = plan
+        return plan
+    
+    def _run_on_shard(self, endpoint, sql, params, timeout_ms, cancel_token):
+        with endpoint.connection() as db_manager:
+            rows = db_manager.execute_query(
+                apply_max_execution_time(sql, timeout_ms), params,
+                timeout_ms=timeout_ms, cancel_token=cancel_token
+            )
+        return pd.DataFrame(rows)
+    
+    def execute(self, query_name, params=None, timeout_ms=None, cancel_token=None, priority=None):
+        """
+        Execute a named aggregate query on every shard in parallel.
+        
+        Args:
+            query_name (str): Name of the query in queries.json
+            params (dict): Query parameters
+            timeout_ms (int): Per-shard time limit (default: query's "timeout_ms")
+            cancel_token (CancellationToken): Cancels the fan-out while queued or running
+            priority (int): Admission priority for heavy queries
+        
+        Returns:
+            DataFrame: Merged global result
+        """
+        query = self.query_loader.get_compiled(query_name)
+        params = query.bind(params) or None
+        if timeout_ms is None:
+            timeout_ms = query.timeout_ms
+        plan = self.get_plan(query_name)
+        logger.info(f"🔀 Fanning out '{query_name}' to {len(self.shards)} shards")
+        
+        with self.admission.admit(
+            query_name,
+            heavy=query.heavy,
+            priority=self.default_priority if priority is None else priority,
+            cancel_token=cancel_token,
+            timeout=ADMISSION_TIMEOUT_SECONDS
+        ):
+            with ThreadPoolExecutor(max_workers=len(self.shards)) as pool:
+                frames = list(pool.map(
+                    lambda endpoint: self._run_on_shard(
+                        endpoint, plan['shard_sql'], params, timeout_ms, cancel_token
+                    ),
+                    self.shards
+                ))
+        
+        merged = merge_partial_aggregates(frames, plan, params)
+        logger.info(f"✓ Merged {sum(len(f) for f in frames)} partial rows into {len(merged)}")
+        return merged
+    
+    def close(self):
+        """Close all shard connections."""
+        for endpoint in self.shards:
+            endpoint.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    loader = get_query_loader()
+    print("\n🔀 Shard plans:")
+    for query_name in loader.get_query_names():
+        try:
+            plan = plan_sharded_query(loader.get_query_sql(query_name))
+            print(f"  • {query_name}: {plan['shard_sql']}")
+        except ValueError as e:
+            print(f"  • {query_name}: not shardable ({e})")
@@ -0,0 +1,271 @@
+# ============================================
+# Query Service Module
+# Long-running HTTP daemon with warm connections and caches
+# ============================================
+
+import io
+import json
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from config import (
+    SERVE_HOST, SERVE_PORT, SERVE_POOL_SIZE,
+    SERVE_CACHE_TTL_SECONDS, SERVE_RELOAD_INTERVAL_SECONDS
+)
+from db import DatabaseManager
+from query_loader import QueryLoader, UnknownQueryError
+from query_executor import QueryExecutor
+from result_cache import ResultCache
+from admission import QueryTimeoutError
+from resilience import DatabaseUnavailableError, get_retry_stats
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+class QueryService:
+    """
+    Keeps the query registry, a pool of database connections and the
+    result cache alive between requests.
+    """
+    
+    def __init__(self, pool_size=None, cache_ttl=None, queries_file=None, db_factory=None):
+        self.query_loader = QueryLoader(queries_file)
+        self.cache = ResultCache(SERVE_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl)
+        self.pool_size = pool_size or SERVE_POOL_SIZE
+        
+        # One executor per connection; mysql connections are not thread-safe
+        self._pool = queue.Queue()
+        db_factory = db_factory or DatabaseManager
+        for _ in range(self.pool_size):
+            self._pool.put(QueryExecutor(db_factory(), self.query_loader))
+        
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._queries_mtime = self._get_queries_mtime()
+    
+    # ============================================
+    # Connection Pool
+    # ============================================
+    
+    @contextmanager
+    def executor(self):
+        """Borrow a warm executor from the pool."""
+        executor = self._pool.get()
+        try:
+            yield executor
+        finally:
+            self._pool.put(executor)
+    
+    def close(self):
+        """Stop the reload watcher and close all pooled connections."""
+        self._stop_event.set()
+        while not self._pool.empty():
+            self._pool.get_nowait().db_manager.disconnect()
+    
+    # ============================================
+    # Query Execution
+    # ============================================
+    
+    def run_query(self, query_name, params=None):
+        """
+        Run a named query, serving from the result cache when possible.
+        
+        Returns:
+            DataFrame: Query result
+        """
+        # Read before binding: a reload after this point makes the result stale
+        generation = self.query_loader.generation
+        # UnknownQueryError for unknown names, ValueError for bad parameters — before any DB work
+        params = self.query_loader.get_compiled(query_name).bind(params)
+        
+        df = self.cache.get(query_name, params)
+        if df is not None:
+            logger.info(f"⚡ Cache hit: {query_name}")
+            return df
+        
+        with self.executor() as executor:
+            df = executor.execute(query_name, params=params or None)
+        
+        self.cache.put(query_name, params, df, generation=generation)
+        return df
+    
+    @staticmethod
+    def serialize(df, fmt):
+        """
+        Serialize a result as JSON, CSV or Arrow IPC stream.
+        
+        Returns:
+            bytes: Encoded body
+        """
+        if fmt == 'json':
+            return df.to_json(orient='records', date_format='iso').encode('utf-8')
+        if fmt == 'csv':
+            return df.to_csv(index=False).encode('utf-8')
+        if fmt == 'arrow':
+            try:
+                import pyarrow as pa
+            except ImportError as e:
+                raise ValueError("Arrow output requires pyarrow (pip install pyarrow)") from e
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = io.BytesIO()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue()
+        raise ValueError(f"Unsupported format: {fmt}")
+    
+    # ============================================
+    # Hot Reload
+    # ============================================
+    
+    def _get_queries_mtime(self):
+        """Get modification time of queries.json."""
+        try:
+            return self.query_loader.queries_file.stat().st_mtime
+        except OSError:
+            return None
+    
+    def check_reload(self):
+        """Reload queries.json if it changed and drop stale cached results."""
+        mtime = self._get_queries_mtime()
+        if mtime is None or mtime == self._queries_mtime:
+            return False
+        
+        self._queries_mtime = mtime
+        try:
+            changed = self.query_loader.reload()
+        except Exception as e:
+            logger.error(f"✗ Keeping previous queries, reload failed: {e}")
+            return False
+        
+        # Results of untouched queries are still valid
+        for query_name in changed:
+            self.cache.invalidate(query_name, generation=self.query_loader.generation)
+        return True
+    
+    def start_watcher(self, interval=None):
+        """Poll queries.json for changes in a background thread."""
+        interval = interval or SERVE_RELOAD_INTERVAL_SECONDS
+        
+        def watch():
+            while not self._stop_event.wait(interval):
+                self.check_reload()
+        
+        self._watcher = threading.Thread(target=watch, name='queries-watcher', daemon=True)
+        self._watcher.start()
+
+
+def _parse_params(query):
+    """
+    Take the last value of each URL query-string parameter.
+    
+    Values stay strings; CompiledQuery.bind converts them to the declared
+    param_types (and rejects bad ones with a 400).
+    """
+    return {key: values[-1] for key, values in query.items()}
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP endpoints:
+        GET /health
+        GET /queries
+        GET /query/<name>?format=json|csv|arrow&<param>=<value>
+    """
+    
+    service = None  # Set by serve()
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        
+        try:
+            if parts == ['health']:
+                retry = get_retry_stats()
+                closed = all(stats['circuit']['state'] == 'closed' for stats in retry.values())
+                self._send_json({
+                    'status': 'ok' if closed else 'degraded',
+                    'cache': self.service.cache.stats(),
+                    'retry': retry,
+                })
+            elif parts == ['queries']:
+                loader = self.service.query_loader
+                self._send_json({
+                    name: loader.get_query_description(name)
+                    for name in loader.get_query_names()
+                })
+            elif len(parts) == 2 and parts[0] == 'query':
+                query = parse_qs(url.query)
+                fmt = query.pop('format', ['json'])[-1]
+                if fmt not in CONTENT_TYPES:
+                    self._send_error(400, f"Unsupported format: {fmt}")
+                    return
+                df = self.service.run_query(parts[1], _parse_params(query))
+                self._send(200, self.service.serialize(df, fmt), CONTENT_TYPES[fmt])
+            else:
+                self._send_error(404, f"Unknown endpoint: {url.path}")
+        except UnknownQueryError as e:
+            self._send_error(404, str(e))
+        except QueryTimeoutError as e:
+            self._send_error(504, str(e))
+        except DatabaseUnavailableError as e:
+            self._send_error(503, str(e))
+        except ValueError as e:
+            self._send_error(400, str(e))
+        except Exception as e:
+            logger.error(f"✗ Request failed: {e}")
+            self._send_error(500, str(e))
+    
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, payload, status=200):
+        self._send(status, json.dumps(payload).encode('utf-8'), CONTENT_TYPES['json'])
+    
+    def _send_error(self, status, message):
+        self._send_json({'error': message}, status=status)
+    
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(host=None, port=None, service=None):
+    """
+    Run the query service until interrupted.
+    
+    Args:
+        host (str): Bind address (default: config.SERVE_HOST)
+        port (int): Bind port (default: config.SERVE_PORT)
+        service (QueryService): Pre-built service (default: new one)
+    """
+    service = service or QueryService()
+    service.start_watcher()
+    
+    handler = type('BoundQueryRequestHandler', (QueryRequestHandler,), {'service': service})
+    httpd = ThreadingHTTPServer((host or SERVE_HOST, port or SERVE_PORT), handler)
+    httpd.daemon_threads = True
+    
+    logger.info(f"🚀 Query service listening on http://{httpd.server_address[0]}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("⏹️  Shutting down query service")
+    finally:
+        httpd.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve()
@@ -0,0 +1,350 @@
+# ============================================
+# Time-Series Module
+# Rolling windows, growth, seasonality and forecasting with incremental state
+# ============================================
+
+import logging
+import numpy as np
+import pandas as pd
+from config import (
+    TS_ROLLING_WINDOWS, TS_EWM_SPANS, TS_SEASON_LENGTH,
+    TS_FORECAST_DAYS, TS_FORECAST_FIT_DAYS
+)
+
+logger = logging.getLogger(__name__)
+
+class _GrowableArray:
+    """NumPy array with amortized O(1) append."""
+    
+    def __init__(self, dtype='float64', capacity=64):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+    
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+    
+    def append(self, value):
+        self.extend([value])
+    
+    @property
+    def values(self):
+        return self._data[:self.size]
+    
+    def __getitem__(self, index):
+        return self.values[index]
+    
+    def __setitem__(self, index, value):
+        self.values[index] = value
+
+
+class TimeSeriesAnalyzer:
+    """
+    Daily time-series analytics with incrementally updatable state.
+    
+    The series is stored as contiguous daily values (missing days are zero).
+    `fit()` builds all state with vectorized NumPy operations; `append()`
+    adds one day in O(1) by extending prefix sums, EWMA levels, monthly
+    totals and seasonal sums instead of recomputing the history.
+    """
+    
+    def __init__(self, rolling_windows=None, ewm_spans=None, season_length=None,
+                 forecast_fit_days=None):
+        self.rolling_windows = list(rolling_windows or TS_ROLLING_WINDOWS)
+        self.ewm_spans = list(ewm_spans or TS_EWM_SPANS)
+        self.season_length = season_length or TS_SEASON_LENGTH
+        self.forecast_fit_days = forecast_fit_days or TS_FORECAST_FIT_DAYS
+        if self.season_length % 2 == 0:
+            raise ValueError("season_length must be odd (centered moving average)")
+        self._reset()
+    
+    def _reset(self):
+        self.start_date = None
+        self.values = _GrowableArray()
+        self._cumsum = _GrowableArray()  # cumsum[i] = sum(values[:i])
+        self._cumsum_t = _GrowableArray()  # sum(t * values[t]) for t < i
+        self._cumsum.append(0.0)
+        self._cumsum_t.append(0.0)
+        self._ewm = {span: _GrowableArray() for span in self.ewm_spans}
+        self._months = _GrowableArray(dtype='datetime64[M]')
+        self._month_totals = _GrowableArray()
+        self._phase_sums = np.zeros(self.season_length)
+        self._phase_counts = np.zeros(self.season_length)
+    
+    @property
+    def n(self):
+        return self.values.size
+    
+    @property
+    def end_date(self):
+        return None if self.start_date is None else self.start_date + np.timedelta64(self.n - 1, 'D')
+    
+    @classmethod
+    def from_dataframe(cls, df, date_column='order_date', value_column='sales_amount', **kwargs):
+        """Build an analyzer from a daily result such as daily_sales_trend."""
+        analyzer = cls(**kwargs)
+        analyzer.fit(df[date_column], df[value_column])
+        return analyzer
+    
+    # ============================================
+    # Building State
+    # ============================================
+    
+    def fit(self, dates, values):
+        """
+        Initialize state from a full history (vectorized).
+        
+        Args:
+            dates (array-like): Dates of observations (any order, duplicates summed)
+            values (array-like): Observation values
+        """
+        self._reset()
+        dates = pd.to_datetime(pd.Series(dates)).values.astype('datetime64[D]')
+        values = pd.to_numeric(pd.Series(values), errors='coerce').fillna(0).to_numpy(dtype='float64')
+        if len(dates) == 0:
+            return self
+        
+        self.start_date = dates.min()
+        offsets = (dates - self.start_date).astype(np.int64)
+        daily = np.bincount(offsets, weights=values)
+        self._extend(daily)
+        return self
+    
+    def append(self, date, value):
+        """
+        Add one new day in O(1). Days skipped since the last date are filled with zero.
+        
+        Args:
+            date: Date of the new observation (must be after the last date)
+            value (float): Observation value
+        """
+        date = np.datetime64(pd.Timestamp(date).date(), 'D')
+        if self.start_date is None:
+            self.start_date = date
+            self._extend(np.array([float(value)]))
+            return self
+        
+        gap = int((date - self.end_date).astype(np.int64))
+        if gap <= 0:
+            raise ValueError(f"Date {date} is not after last date {self.end_date}")
+        
+        new_values = np.zeros(gap)
+        new_values[-1] = float(value)
+        self._extend(new_values)
+        return self
+    
+    def _extend(self, new_values):
+        """Extend all incremental state with new consecutive daily values."""
+        first = self.n
+        count = len(new_values)
+        t = np.arange(first, first + count, dtype='float64')
+        
+        self.values.extend(new_values)
+        self._cumsum.extend(self._cumsum[-1] + np.cumsum(new_values))
+        self._cumsum_t.extend(self._cumsum_t[-1] + np.cumsum(t * new_values))
+        
+        # Exponentially weighted means continue from the last level
+        for span, ewm in self._ewm.items():
+            alpha = 2.0 / (span + 1)
+            if ewm.size and count == 1:
+                ewm.append(alpha * new_values[0] + (1 - alpha) * ewm[-1])
+                continue
+            series = pd.Series(new_values)
+            if ewm.size:
+                series = pd.concat([pd.Series([ewm[-1]]), series], ignore_index=True)
+                ewm.extend(series.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:])
+            else:
+                ewm.extend(series.ewm(alpha=alpha, adjust=False).mean().to_numpy())
+        
+        # Monthly totals
+        months = (self.start_date + t.astype(np.int64).astype('timedelta64[D]')).astype('datetime64[M]')
+        unique_months, inverse = np.unique(months, return_inverse=True)
+        totals = np.bincount(inverse, weights=new_values)
+        if self._months.size and unique_months[0] == self._months[-1]:
+            self._month_totals[-1] += totals[0]
+            unique_months, totals = unique_months[1:], totals[1:]
+        self._months.extend(unique_months)
+        self._month_totals.extend(totals)
+        
+        # Seasonal sums: trend becomes available `half` days after each point
+        half = self.season_length // 2
+        ready = np.arange(max(first - half, half), self.n - half)
+        if len(ready):
+            cumsum = self._cumsum.values
+            trend = (cumsum[ready + half + 1] - cumsum[ready - half]) / self.season_length
+            detrended = self.values[ready] - trend
+            phases = ready % self.season_length
+            self._phase_sums += np.bincount(phases, weights=detrended, minlength=self.season_length)
+            self._phase_counts += np.bincount(phases, minlength=self.season_length)
+    
+    # ============================================
+    # Analytics
+    # ============================================
+    
+    def dates(self):
+        """Get the contiguous daily date index."""
+        return self.start_date + np.arange(self.n).astype('timedelta64[D]')
+    
+    def rolling_mean(self, window):
+        """Trailing rolling mean from prefix sums (NaN until the window is full)."""
+        cumsum = self._cumsum.values
+        result = np.full(self.n, np.nan)
+        if self.n >= window:
+            result[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+        return result
+    
+    def ewm_mean(self, span):
+        """Exponentially weighted mean for a configured span."""
+        return self._ewm[span].values.copy()
+    
+    def seasonal_indices(self):
+        """Additive seasonal index per phase (mean detrended value, centered on zero)."""
+        with np.errstate(invalid='ignore'):
+            indices = self._phase_sums / self._phase_counts
+        indices = np.nan_to_num(indices)
+        return indices - indices.mean()
+    
+    def decompose(self):
+        """
+        Classical additive decomposition: trend (centered moving average),
+        seasonal (phase index) and residual.
+        
+        Returns:
+            DataFrame: date, value, trend, seasonal, residual
+        """
+        half = self.season_length // 2
+        cumsum = self._cumsum.values
+        trend = np.full(self.n, np.nan)
+        if self.n >= self.season_length:
+            t = np.arange(half, self.n - half)
+            trend[t] = (cumsum[t + half + 1] - cumsum[t - half]) / self.season_length
+        seasonal = self.seasonal_indices()[np.arange(self.n) % self.season_length]
+        return pd.DataFrame({
+            'date': self.dates(),
+            'value': self.values.values.copy(),
+            'trend': trend,
+            'seasonal': seasonal,
+            'residual': self.values.values - trend - seasonal,
+        })
+    
+    def monthly_growth(self):
+        """
+        Month-over-month and year-over-year growth from monthly totals.
+        
+        Returns:
+            DataFrame: month, total, mom_pct, yoy_pct
+        """
+        return growth_table(self._months.values.astype(str), self._month_totals.values.copy())
+    
+    def forecast(self, days=None):
+        """
+        Forecast the next days with a linear trend fitted to the last
+        `forecast_fit_days` days (closed-form from prefix sums) plus the
+        seasonal index.
+        
+        Returns:
+            DataFrame: date, forecast
+        """
+        days = days or TS_FORECAST_DAYS
+        if self.n < 2:
+            return pd.DataFrame(columns=['date', 'forecast'])
+        
+        w = min(self.forecast_fit_days, self.n)
+        lo, hi = self.n - w, self.n
+        sum_y = self._cumsum[hi] - self._cumsum[lo]
+        sum_ty = self._cumsum_t[hi] - self._cumsum_t[lo]
+        sum_t = (lo + hi - 1) * w / 2
+        sum_tt = ((hi - 1) * hi * (2 * hi - 1) - (lo - 1) * lo * (2 * lo - 1)) / 6
+        denominator = w * sum_tt - sum_t ** 2
+        slope = (w * sum_ty - sum_t * sum_y) / denominator if denominator else 0.0
+        intercept = (sum_y - slope * sum_t) / w
+        
+        t = np.arange(self.n, self.n + days)
+        seasonal = self.seasonal_indices()[t % self.season_length]
+        forecast = np.clip(intercept + slope * t + seasonal, 0, None)
+        return pd.DataFrame({
+            'date': self.start_date + t.astype('timedelta64[D]'),
+            'forecast': forecast,
+        })
+    
+    def to_frame(self):
+        """
+        Full analytics table: value, rolling means, EWMAs and decomposition.
+        
+        Returns:
+            DataFrame: One row per day
+        """
+        df = self.decompose()
+        for window in self.rolling_windows:
+            df[f'rolling_{window}d'] = self.rolling_mean(window)
+        for span in self.ewm_spans:
+            df[f'ewm_{span}d'] = self.ewm_mean(span)
+        return df
+
+
+def growth_table(periods, totals):
+    """
+    Period-over-period (previous month) and year-over-year (12 months back) growth.
+    
+    Args:
+        periods (array-like): Consecutive month labels
+        totals (array-like): Totals per month
+    
+    Returns:
+        DataFrame: month, total, mom_pct, yoy_pct
+    """
+    totals = np.asarray(totals, dtype='float64')
+    mom = np.full(len(totals), np.nan)
+    yoy = np.full(len(totals), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if len(totals) > 1:
+            mom[1:] = (totals[1:] / totals[:-1] - 1) * 100
+        if len(totals) > 12:
+            yoy[12:] = (totals[12:] / totals[:-12] - 1) * 100
+    mom[~np.isfinite(mom)] = np.nan
+    yoy[~np.isfinite(yoy)] = np.nan
+    return pd.DataFrame({'month': periods, 'total': totals, 'mom_pct': mom, 'yoy_pct': yoy})
+
+
+def monthly_growth_from_result(df, month_column='month', value_column='total_sales'):
+    """
+    Growth table for a monthly_sales result. Missing months are filled with zero
+    so that MoM/YoY compare the right periods.
+    """
+    series = pd.Series(
+        pd.to_numeric(df[value_column]).to_numpy(dtype='float64'),
+        index=pd.PeriodIndex(df[month_column], freq='M')
+    )
+    series = series.groupby(level=0).sum()
+    full_range = pd.period_range(series.index.min(), series.index.max(), freq='M')
+    series = series.reindex(full_range, fill_value=0.0)
+    return growth_table(series.index.astype(str), series.to_numpy())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    import time
+    rng = np.random.default_rng(7)
+    days = pd.date_range('2019-01-01', '2024-12-31')
+    weekly = np.array([0.8, 0.9, 1.0, 1.0, 1.1, 1.4, 1.3])[days.dayofweek]
+    sales = (10000 + np.arange(len(days)) * 5) * weekly + rng.normal(0, 500, len(days))
+    
+    start = time.perf_counter()
+    analyzer = TimeSeriesAnalyzer().fit(days, sales)
+    fit_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    analyzer.append('2025-01-01', 12000.0)
+    append_us = (time.perf_counter() - start) * 1e6
+    
+    print(f"✓ Fit {analyzer.n:,} days in {fit_ms:.1f} ms; appended one day in {append_us:.0f} µs")
+    print(analyzer.to_frame().tail())
+    print(analyzer.monthly_growth().tail())
+    print(analyzer.forecast(7))
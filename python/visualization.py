@@ -3,18 +3,117 @@
 # Chart generation and insight visualization
 # ============================================
 
-import matplotlib.pyplot as plt
-import seaborn as sns
 import logging
 from pathlib import Path
-from config import CHARTS_DIR, CHART_FORMAT, CHART_DPI
+import numpy as np
+from config import (
+    CHARTS_DIR, CHART_FORMAT, CHART_DPI,
+    CHART_MAX_POINTS, CHART_DOWNSAMPLE_METHOD, CHART_RASTERIZE_POINTS
+)
 
 logger = logging.getLogger(__name__)
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+# Charting libraries are imported on the first chart, not at module import
+_plt = None
+_sns = None
+
+def _get_pyplot():
+    """Import matplotlib/seaborn and apply global styles on first use."""
+    global _plt, _sns
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        # Set style
+        sns.set_style("whitegrid")
+        plt.rcParams['figure.figsize'] = (12, 6)
+        plt.rcParams['font.size'] = 10
+        
+        _plt, _sns = plt, sns
+    return _plt
+
+def _get_seaborn():
+    """Get seaborn (imported together with pyplot)."""
+    _get_pyplot()
+    return _sns
+
+def _lttb_indices(y, max_points):
+    """Largest-triangle-three-buckets: keep the point per bucket with the largest triangle area."""
+    n = len(y)
+    x = np.arange(n, dtype='float64')
+    # max_points - 2 buckets between the fixed first and last points
+    edges = np.append(np.linspace(1, n - 1, max_points - 1).astype(np.int64), n)
+    
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, stop, next_stop = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _minmax_indices(y, max_points):
+    """
+    Keep the minimum and maximum point of each bucket, in original order.
+    
+    The first and last points are always kept and count toward `max_points`.
+    """
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    if buckets < 1:
+        return np.array([0, 1 + int(np.argmax(y[1:-1])), n - 1])
+    edges = np.linspace(0, n - 2, buckets + 1).astype(np.int64)
+    bucket_ids = np.repeat(np.arange(buckets), np.diff(edges))
+    
+    # Sort interior points by (bucket, value): first/last entry of each bucket are its min/max
+    order = np.lexsort((y[1:-1], bucket_ids)) + 1
+    selected = np.concatenate([order[edges[:-1]], order[edges[1:] - 1]])
+    return np.unique(np.concatenate([[0], selected, [n - 1]]))
+
+
+def downsample_series(values, max_points=None, method=None):
+    """
+    Reduce a series to at most `max_points` points while preserving its shape.
+    
+    Args:
+        values (array-like): Series values in plotting order
+        max_points (int): Target number of points (default: config.CHART_MAX_POINTS)
+        method (str): 'lttb' or 'minmax' (default: config.CHART_DOWNSAMPLE_METHOD)
+    
+    Returns:
+        ndarray: Sorted positional indices of the points to plot
+    """
+    max_points = max_points or CHART_MAX_POINTS
+    method = method or CHART_DOWNSAMPLE_METHOD
+    y = np.nan_to_num(np.asarray(values, dtype='float64'))
+    if len(y) <= max_points or max_points < 3:
+        return np.arange(len(y))
+    if method == 'lttb':
+        return _lttb_indices(y, max_points)
+    if method == 'minmax':
+        return _minmax_indices(y, max_points)
+    raise ValueError(f"Unsupported downsampling method: {method}")
+
+
+# Chart drawn for each analysis of the standard report
+REPORT_CHARTS = {
+    'monthly_sales': 'plot_monthly_sales',
+    'top_products': 'plot_top_products',
+    'top_customers': 'plot_top_customers',
+    'sales_by_city': 'plot_sales_by_city',
+    'product_category_analysis': 'plot_category_analysis',
+    'daily_sales_trend': 'plot_daily_trend',
+    'product_affinity': 'plot_product_affinity',
+}
+
 
 class Visualizer:
     """Generates visualizations from analysis results."""
@@ -23,18 +122,39 @@ class Visualizer:
         self.charts_dir = Path(charts_dir or CHARTS_DIR)
         self.charts_dir.mkdir(parents=True, exist_ok=True)
     
-    def plot_monthly_sales(self, df, filename='monthly_sales'):
-        """Create line chart for monthly sales trend."""
+    def _prepare_series(self, df, column, max_points, rasterize):
+        """Downsample a series for plotting and decide whether to rasterize it."""
+        positions = downsample_series(df[column], max_points)
+        if rasterize is None:
+            rasterize = len(df) > CHART_RASTERIZE_POINTS
+        if len(positions) < len(df):
+            logger.info(f"📉 Downsampled {column}: {len(df):,} → {len(positions):,} points")
+        return positions, df.iloc[positions], rasterize
+    
+    def plot_monthly_sales(self, df, filename='monthly_sales', max_points=None, rasterize=None):
+        """
+        Create line chart for monthly sales trend.
+        
+        Series longer than `max_points` are downsampled (markers are dropped);
+        `rasterize` draws the line as a bitmap layer in vector output
+        (default: when the series exceeds config.CHART_RASTERIZE_POINTS).
+        """
         if df.empty or 'month' not in df.columns:
             logger.warning("⚠️  Cannot plot monthly sales: missing data")
             return None
         
+        positions, points, rasterize = self._prepare_series(df, 'total_sales', max_points, rasterize)
+        downsampled = len(points) < len(df)
+        
+        plt = _get_pyplot()
         plt.figure(figsize=(14, 6))
-        plt.plot(df['month'], df['total_sales'], marker='o', linewidth=2, markersize=6, color='#2185ba')
+        plt.plot(positions, points['total_sales'], marker=None if downsampled else 'o',
+                 linewidth=2, markersize=6, color='#2185ba', rasterized=rasterize)
         plt.title('Monthly Sales Trend', fontsize=14, fontweight='bold')
         plt.xlabel('Month', fontsize=11)
         plt.ylabel('Total Sales (₹)', fontsize=11)
-        plt.xticks(rotation=45)
+        ticks = np.linspace(0, len(points) - 1, min(len(points), 24)).astype(int)
+        plt.xticks(positions[ticks], points['month'].iloc[ticks].astype(str), rotation=45)
         plt.grid(True, alpha=0.3)
         plt.tight_layout()
         
@@ -50,6 +170,7 @@ class Visualizer:
             logger.warning("⚠️  Cannot plot top products: missing data")
             return None
         
+        plt = _get_pyplot()
         plt.figure(figsize=(12, 6))
         bars = plt.bar(range(len(df)), df['total_units'], color='#40a68f')
         plt.title('Top Selling Products by Quantity', fontsize=14, fontweight='bold')
@@ -78,6 +199,7 @@ class Visualizer:
             logger.warning("⚠️  Cannot plot top customers: missing data")
             return None
         
+        plt = _get_pyplot()
         plt.figure(figsize=(12, 8))
         bars = plt.barh(range(len(df)), df['total_spent'], color='#f6a042')
         plt.title('Top Customers by Spending', fontsize=14, fontweight='bold')
@@ -106,8 +228,9 @@ class Visualizer:
             logger.warning("⚠️  Cannot plot city sales: missing data")
             return None
         
+        plt = _get_pyplot()
         plt.figure(figsize=(10, 8))
-        colors = sns.color_palette("husl", len(df))
+        colors = _get_seaborn().color_palette("husl", len(df))
         plt.pie(df['total_sales'], labels=df['city'], autopct='%1.1f%%',
                colors=colors, startangle=90, textprops={'fontsize': 10})
         plt.title('Sales Distribution by City', fontsize=14, fontweight='bold')
@@ -125,6 +248,7 @@ class Visualizer:
             logger.warning("⚠️  Cannot plot category analysis: missing data")
             return None
         
+        plt = _get_pyplot()
         plt.figure(figsize=(12, 6))
         bars = plt.bar(range(len(df)), df['total_revenue'], color='#6c757d')
         plt.title('Revenue by Product Category', fontsize=14, fontweight='bold')
@@ -147,15 +271,24 @@ class Visualizer:
         
         return filepath
     
-    def plot_daily_trend(self, df, filename='daily_sales_trend'):
-        """Create area chart for daily sales trend."""
+    def plot_daily_trend(self, df, filename='daily_sales_trend', max_points=None, rasterize=None):
+        """
+        Create area chart for daily sales trend.
+        
+        Long histories are downsampled to `max_points` (default:
+        config.CHART_MAX_POINTS), so rendering time does not grow with the
+        number of days.
+        """
         if df.empty or 'order_date' not in df.columns:
             logger.warning("⚠️  Cannot plot daily trend: missing data")
             return None
         
+        positions, points, rasterize = self._prepare_series(df, 'sales_amount', max_points, rasterize)
+        
+        plt = _get_pyplot()
         plt.figure(figsize=(14, 6))
-        plt.fill_between(range(len(df)), df['sales_amount'], alpha=0.4, color='#2185ba')
-        plt.plot(range(len(df)), df['sales_amount'], linewidth=2, color='#2185ba')
+        plt.fill_between(positions, points['sales_amount'], alpha=0.4, color='#2185ba', rasterized=rasterize)
+        plt.plot(positions, points['sales_amount'], linewidth=2, color='#2185ba', rasterized=rasterize)
         plt.title('Daily Sales Trend', fontsize=14, fontweight='bold')
         plt.xlabel('Date', fontsize=11)
         plt.ylabel('Sales Amount (₹)', fontsize=11)
@@ -168,9 +301,56 @@ class Visualizer:
         
         return filepath
     
+    def plot_product_affinity(self, df, filename='product_affinity'):
+        """Create horizontal bar chart for top product pairs by lift."""
+        if df.empty or 'lift' not in df.columns:
+            logger.warning("⚠️  Cannot plot product affinity: missing data")
+            return None
+        
+        name_a = df['product_name_a'] if 'product_name_a' in df.columns else df['product_a']
+        name_b = df['product_name_b'] if 'product_name_b' in df.columns else df['product_b']
+        labels = name_a.astype(str) + ' + ' + name_b.astype(str)
+        
+        plt = _get_pyplot()
+        plt.figure(figsize=(12, 8))
+        bars = plt.barh(range(len(df)), df['lift'], color='#7b5ea7')
+        plt.title('Products Bought Together (Lift)', fontsize=14, fontweight='bold')
+        plt.ylabel('Product Pair', fontsize=11)
+        plt.xlabel('Lift', fontsize=11)
+        plt.yticks(range(len(df)), labels)
+        plt.gca().invert_yaxis()
+        
+        # Add value labels on bars
+        for bar, together in zip(bars, df['baskets_together']):
+            width = bar.get_width()
+            plt.text(width, bar.get_y() + bar.get_height()/2.,
+                    f'{width:.2f} ({int(together)} baskets)',
+                    ha='left', va='center', fontsize=9)
+        
+        plt.tight_layout()
+        
+        filepath = self._save_chart(filename)
+        logger.info(f"✓ Chart saved: {filepath}")
+        plt.close()
+        
+        return filepath
+    
+    def plot_report(self, analysis_name, df):
+        """
+        Draw the standard chart for a report analysis.
+        
+        Returns:
+            Path: Chart file, or None if the analysis has no chart
+        """
+        method = REPORT_CHARTS.get(analysis_name)
+        if method is None:
+            return None
+        return getattr(self, method)(df)
+    
     def _save_chart(self, filename):
         """Save chart to file."""
         filepath = self.charts_dir / f"{filename}.{CHART_FORMAT}"
+        plt = _get_pyplot()
         plt.savefig(filepath, dpi=CHART_DPI, bbox_inches='tight')
         return filepath
     
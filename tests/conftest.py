@@ -0,0 +1,9 @@
+# ============================================
+# Test Configuration
+# Makes the python/ modules importable the way main.py does
+# ============================================
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python'))
@@ -0,0 +1,98 @@
+# ============================================
+# Admission Control Tests
+# ============================================
+
+import time
+import threading
+import pytest
+from admission import AdmissionController, CancellationToken, QueryCancelledError, QueryTimeoutError
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_cancellation_runs_callbacks_once():
+    token = CancellationToken()
+    calls = []
+    token.register(lambda: calls.append('kill'))
+    token.cancel()
+    token.cancel()
+    assert calls == ['kill']
+    with pytest.raises(QueryCancelledError):
+        token.raise_if_cancelled()
+    # Registering after cancellation runs the callback at once
+    token.register(lambda: calls.append('late'))
+    assert calls == ['kill', 'late']
+
+
+def test_unregistered_callback_does_not_run():
+    token = CancellationToken()
+    calls = []
+    callback = lambda: calls.append('kill')
+    token.register(callback)
+    token.unregister(callback)
+    token.cancel()
+    assert calls == []
+
+
+def test_light_queries_skip_the_cap():
+    controller = AdmissionController(max_concurrent=1)
+    with controller.admit('heavy'):
+        with controller.admit('light', heavy=False):
+            assert controller.stats()['running'] == 1
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    controller = AdmissionController(max_concurrent=1)
+    order = []
+    
+    def run(name, priority):
+        with controller.admit(name, priority=priority):
+            order.append(name)
+    
+    with controller.admit('running'):
+        threads = []
+        for waiting, (name, priority) in enumerate([('batch-1', 10), ('batch-2', 10), ('interactive', 0)], 1):
+            thread = threading.Thread(target=run, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            wait_for(lambda: controller.stats()['waiting'] == waiting)
+    for thread in threads:
+        thread.join()
+    assert order == ['interactive', 'batch-1', 'batch-2']
+    assert controller.stats() == {'running': 0, 'waiting': 0, 'max_concurrent': 1}
+
+
+def test_admission_timeout_leaves_the_queue():
+    controller = AdmissionController(max_concurrent=1)
+    with controller.admit('running'):
+        with pytest.raises(QueryTimeoutError, match='not admitted'):
+            with controller.admit('waiting', timeout=0.05):
+                pass
+        assert controller.stats()['waiting'] == 0
+
+
+def test_cancel_while_waiting():
+    controller = AdmissionController(max_concurrent=1)
+    token = CancellationToken()
+    errors = []
+    
+    def wait():
+        try:
+            with controller.admit('waiting', cancel_token=token):
+                pass
+        except QueryCancelledError as e:
+            errors.append(e)
+    
+    with controller.admit('running'):
+        thread = threading.Thread(target=wait)
+        thread.start()
+        wait_for(lambda: controller.stats()['waiting'] == 1)
+        token.cancel()
+        thread.join()
+    assert len(errors) == 1
+    assert controller.stats()['waiting'] == 0
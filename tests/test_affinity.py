@@ -0,0 +1,125 @@
+# ============================================
+# Product Affinity Tests
+# ============================================
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('scipy')
+
+import affinity
+from affinity import ProductAffinity
+
+
+def make_lines(rows=3000, seed=3, start_order_id=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'order_id': np.arange(start_order_id, start_order_id + rows),
+        'customer_id': rng.integers(1, 300, rows),
+        'product_id': rng.integers(1, 40, rows),
+        'order_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, rows), unit='D'),
+    })
+
+
+class FakeExecutor:
+    """Serves `sales_product_lines` from a frame, honouring the watermark."""
+    
+    def __init__(self, lines):
+        self.lines = lines
+        self.calls = []
+    
+    def execute_chunked(self, query_name, params, chunk_size=None):
+        self.calls.append(params['after_order_id'])
+        new = self.lines[self.lines['order_id'] > params['after_order_id']]
+        for start in range(0, len(new), chunk_size):
+            yield new.iloc[start:start + chunk_size]
+
+
+def test_pair_statistics_on_a_small_example():
+    lines = pd.DataFrame({
+        'customer_id': [1, 1, 2, 2, 3],
+        'product_id': [10, 20, 10, 20, 10],
+        'order_date': pd.to_datetime(['2024-01-01'] * 5),
+    })
+    pairs = ProductAffinity(basket='customer', min_pair_count=1).update(lines).pair_statistics()
+    
+    assert len(pairs) == 1
+    pair = pairs.iloc[0]
+    assert (pair['product_a'], pair['product_b'], pair['baskets_together']) == (10, 20, 2)
+    assert pair['support'] == pytest.approx(2 / 3)
+    assert pair['confidence_a_to_b'] == pytest.approx(2 / 3)
+    assert pair['confidence_b_to_a'] == pytest.approx(1.0)
+    assert pair['lift'] == pytest.approx(1.0)
+
+
+def test_day_baskets_split_purchases_by_date():
+    lines = pd.DataFrame({
+        'customer_id': [1, 1],
+        'product_id': [10, 20],
+        'order_date': pd.to_datetime(['2024-01-01', '2024-01-02']),
+    })
+    
+    assert ProductAffinity(basket='customer', min_pair_count=1).update(lines).build().shape == (1, 2)
+    assert ProductAffinity(basket='day', min_pair_count=1).update(lines).pair_statistics().empty
+
+
+def test_rejects_unknown_basket_type():
+    with pytest.raises(ValueError):
+        ProductAffinity(basket='order')
+
+
+def test_compacts_pending_pairs_past_the_threshold(monkeypatch):
+    monkeypatch.setattr(affinity, 'AFFINITY_COMPACT_ROWS', 500)
+    lines = make_lines()
+    compacted = ProductAffinity(min_pair_count=1)
+    for start in range(0, len(lines), 200):
+        compacted.update(lines.iloc[start:start + 200])
+    
+    assert len(compacted._pairs) < 5
+    assert len(compacted._pairs[0]) == len(compacted._pairs[0].drop_duplicates())
+    expected = ProductAffinity(min_pair_count=1).update(lines).pair_statistics()
+    pd.testing.assert_frame_equal(compacted.pair_statistics(), expected)
+
+
+def test_blocked_co_occurrence_matches_a_single_block():
+    lines = make_lines()
+    blocked = ProductAffinity(min_pair_count=2, block_size=7).update(lines).pair_statistics()
+    single = ProductAffinity(min_pair_count=2, block_size=1000).update(lines).pair_statistics()
+    
+    def ordered(pairs):
+        return pairs.sort_values(['product_a', 'product_b'], ignore_index=True)
+    
+    pd.testing.assert_frame_equal(ordered(blocked), ordered(single))
+
+
+def test_refresh_only_streams_new_sales():
+    lines = make_lines()
+    executor = FakeExecutor(lines.iloc[:2000])
+    engine = ProductAffinity(min_pair_count=1)
+    engine.refresh(executor, chunk_size=500)
+    assert engine.watermark == 2000
+    
+    executor.lines = lines
+    engine.refresh(executor, chunk_size=500)
+    
+    assert executor.calls == [0, 2000]
+    expected = ProductAffinity(min_pair_count=1).update(lines).pair_statistics()
+    pd.testing.assert_frame_equal(engine.pair_statistics(), expected)
+
+
+def test_reset_clears_pairs_and_watermark():
+    engine = ProductAffinity().update(make_lines())
+    engine.reset()
+    
+    assert engine.watermark == 0
+    assert engine.build().shape == (0, 0)
+
+
+def test_top_pairs_ranks_and_labels():
+    catalog = pd.DataFrame({'product_id': np.arange(1, 40), 'product_name': [f"P{i}" for i in range(1, 40)]})
+    top = ProductAffinity(min_pair_count=1).update(make_lines()).top_pairs(5, by='baskets_together', catalog=catalog)
+    
+    assert len(top) == 5
+    assert top['baskets_together'].is_monotonic_decreasing
+    assert top['product_name_a'].tolist() == [f"P{i}" for i in top['product_a']]
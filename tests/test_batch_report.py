@@ -0,0 +1,178 @@
+# ============================================
+# Batch Report Tests
+# ============================================
+
+import json
+from datetime import date
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+import batch_report
+from batch_report import (
+    Scenario, REPORT_ANALYSES, BatchReportBuilder, compute_reports, scenario_filters, scenario_window
+)
+
+GRAIN_COLUMNS = ['scenario', 'order_date', 'customer_id', 'product_id', 'units', 'amount', 'order_count', 'price_sum']
+
+PRODUCTS = pd.DataFrame({
+    'product_id': [10, 11, 12],
+    'product_name': ['Novel', 'Atlas', 'Robot'],
+    'category': ['Books', 'Books', 'Toys'],
+})
+
+CUSTOMERS = pd.DataFrame({
+    'customer_id': [1, 2, 3],
+    'customer_name': ['Asha', 'Asha', 'Ravi'],
+    'city': ['Pune', 'Pune', 'Delhi'],
+})
+
+
+def grain(rows):
+    return pd.DataFrame(rows, columns=GRAIN_COLUMNS)
+
+
+def sample_grain():
+    # Scenario 0 is 'all', 1 is 'pune'; (scenario, day, customer, product) sums
+    return grain([
+        (0, '2024-01-05', 1, 10, 1, 100.0, 1, 100.0),
+        (0, '2024-01-05', 2, 11, 2, 250.0, 2, 250.0),
+        (0, '2024-02-01', 3, 12, 1, 300.0, 1, 300.0),
+        (0, '2024-02-01', 3, 10, 1, 100.0, 1, 100.0),
+        (1, '2024-01-05', 1, 10, 1, 100.0, 1, 100.0),
+        (1, '2024-01-05', 2, 11, 2, 250.0, 2, 250.0),
+    ])
+
+
+SCENARIOS = [Scenario('all'), Scenario('pune', cities=('Pune',)), Scenario('empty', cities=('Nowhere',))]
+
+
+def test_scenario_from_dict_validates():
+    scenario = Scenario.from_dict({'name': 'West Q1', 'cities': ['Pune'], 'start_date': '2024-01-01'})
+    assert scenario.start_date == date(2024, 1, 1)
+    assert scenario.slug == 'west_q1'
+    with pytest.raises(ValueError, match='unknown fields'):
+        Scenario.from_dict({'name': 'x', 'region': 'west'})
+    with pytest.raises(ValueError, match='start_date is after end_date'):
+        Scenario.from_dict({'name': 'x', 'start_date': '2024-02-01', 'end_date': '2024-01-01'})
+
+
+def test_scenario_filters_expand_city_category_pairs():
+    scenarios = [
+        Scenario('all'),
+        Scenario('west', cities=('Pune', 'Goa'), categories=('Books',), end_date=date(2024, 6, 30)),
+    ]
+    rows = json.loads(scenario_filters(scenarios))
+    assert [(r['scenario'], r['city'], r['category']) for r in rows] == [
+        (0, None, None), (1, 'Pune', 'Books'), (1, 'Goa', 'Books'),
+    ]
+    assert rows[1]['end_date'] == '2024-06-30'
+
+
+def test_scenario_window_covers_every_scenario():
+    bounded = [
+        Scenario('q1', start_date=date(2024, 1, 1), end_date=date(2024, 3, 31)),
+        Scenario('q3', start_date=date(2024, 7, 1), end_date=date(2024, 9, 30)),
+    ]
+    assert scenario_window(bounded) == (date(2024, 1, 1), date(2024, 9, 30))
+    assert scenario_window(bounded + [Scenario('open')]) == (date(1000, 1, 1), date(9999, 12, 31))
+
+
+def test_compute_reports_rolls_every_analysis_up_from_the_grain():
+    reports = compute_reports(sample_grain(), SCENARIOS, PRODUCTS, CUSTOMERS, top_n=1)
+    
+    assert set(reports['all']) == set(REPORT_ANALYSES)
+    assert reports['all']['monthly_sales'].to_dict('records') == [
+        {'month': '2024-01', 'total_sales': 350.0}, {'month': '2024-02', 'total_sales': 400.0},
+    ]
+    assert reports['all']['sales_by_city'].to_dict('records') == [
+        {'city': 'Delhi', 'total_sales': 400.0, 'order_count': 2},
+        {'city': 'Pune', 'total_sales': 350.0, 'order_count': 3},
+    ]
+    assert reports['pune']['sales_by_city']['total_sales'].tolist() == [350.0]
+    assert reports['empty']['sales_by_city'].empty
+    assert 'scenario' not in reports['empty']['sales_by_city'].columns
+    
+    # Customers with the same name are summed; top-N keeps the best one
+    assert reports['all']['top_customers'].to_dict('records') == [{'customer_name': 'Ravi', 'total_spent': 400.0}]
+    assert len(reports['all']['customer_purchase_frequency']) == 3
+    assert reports['pune']['top_products'].to_dict('records') == [{'product_name': 'Atlas', 'total_units': 2}]
+    
+    categories = reports['all']['product_category_analysis']
+    assert categories['category'].tolist() == ['Books', 'Toys']
+    assert categories['avg_price'].tolist() == [112.5, 300.0]
+    assert 'price_sum' not in categories.columns
+    
+    daily = reports['all']['daily_sales_trend']
+    assert daily['order_count'].tolist() == [3, 2]
+
+
+def test_compute_reports_merges_partials_across_chunks(monkeypatch):
+    monkeypatch.setattr(batch_report, 'PARTIALS_MERGE_EVERY', 2)
+    
+    class Chunked(batch_report.SpilledResult):
+        def __init__(self, chunks):
+            self.chunks = chunks
+        
+        def iter_chunks(self):
+            return iter(self.chunks)
+    
+    rows = sample_grain()
+    chunked = Chunked([rows.iloc[[i]] for i in range(len(rows))])
+    expected = compute_reports(rows, SCENARIOS, PRODUCTS, CUSTOMERS)
+    actual = compute_reports(chunked, SCENARIOS, PRODUCTS, CUSTOMERS)
+    for scenario in expected:
+        for analysis in REPORT_ANALYSES:
+            pd.testing.assert_frame_equal(actual[scenario][analysis], expected[scenario][analysis])
+
+
+class FakeExecutor:
+    def __init__(self, grain):
+        self.grain = grain
+        self.calls = []
+    
+    def execute_bounded(self, query_name, params=None):
+        self.calls.append((query_name, params))
+        return self.grain
+    
+    def execute(self, query_name):
+        self.calls.append((query_name, None))
+        return {'product_catalog': PRODUCTS, 'customer_directory': CUSTOMERS}[query_name]
+
+
+class FakeEngine:
+    def generate_report_insights(self, analysis, df):
+        return f"{len(df)} rows"
+
+
+def test_builder_runs_one_grain_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_report, '_worker_engine', FakeEngine())
+    executor = FakeExecutor(sample_grain())
+    builder = BatchReportBuilder(executor, output_dir=tmp_path, charts=False, max_workers=1)
+    scenarios = [
+        Scenario('all', start_date=date(2024, 1, 1), end_date=date(2024, 6, 30)),
+        Scenario('pune', cities=('Pune',), start_date=date(2023, 12, 1), end_date=date(2024, 3, 31)),
+    ]
+    index = builder.build(scenarios)
+    
+    queries = [query for query, _ in executor.calls]
+    assert queries == ['scenario_sales_grain', 'product_catalog', 'customer_directory']
+    params = executor.calls[0][1]
+    assert (params['start_date'], params['end_date']) == (date(2023, 12, 1), date(2024, 6, 30))
+    assert [row['scenario'] for row in json.loads(params['scenarios'])] == [0, 1]
+    
+    assert index['total_sales'].tolist() == [750.0, 350.0]
+    assert (tmp_path / 'pune' / 'sales_by_city.csv').exists()
+
+
+def test_compute_reports_accepts_a_spilled_grain(tmp_path):
+    spilled = batch_report.SpilledResult('scenario_sales_grain', directory=tmp_path)
+    rows = sample_grain()
+    spilled.append(rows.iloc[:3])
+    spilled.append(rows.iloc[3:])
+    
+    cities = compute_reports(spilled, SCENARIOS, PRODUCTS, CUSTOMERS)['all']['sales_by_city']
+    assert cities.to_dict('records') == [
+        {'city': 'Delhi', 'total_sales': 400.0, 'order_count': 2},
+        {'city': 'Pune', 'total_sales': 350.0, 'order_count': 3},
+    ]
@@ -0,0 +1,31 @@
+# ============================================
+# Startup Tests
+# ============================================
+
+import sys
+import subprocess
+from benchmark import find_heavy_imports, measure_cold_start, PYTHON_DIR
+from config import HEAVY_MODULES
+
+
+def test_light_modules_import_no_heavy_libraries():
+    assert find_heavy_imports() == []
+
+
+def test_list_queries_runs_without_heavy_libraries():
+    code = (
+        "import sys\n"
+        "sys.argv = ['main.py', '--list-queries']\n"
+        "import main\n"
+        "main.main()\n"
+        f"print('heavy:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=PYTHON_DIR,
+                            capture_output=True, text=True, check=True)
+    assert 'monthly_sales' in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == 'heavy:'
+
+
+def test_measure_cold_start_reports_timings():
+    timing = measure_cold_start(runs=1)
+    assert 0 < timing['min'] <= timing['median'] <= timing['max']
@@ -0,0 +1,65 @@
+# ============================================
+# Dashboard Tests
+# ============================================
+
+import base64
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from dashboard import DashboardBuilder, build_bundle
+
+
+def make_cube():
+    return pd.DataFrame({
+        'order_date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-03']),
+        'city': ['Pune', None, 'Delhi'],
+        'category': ['Books', 'Toys', 'Books'],
+        'sales_amount': [100.5, 20.0, 30.25],
+        'units': [2, 1, 3],
+        'orders': [1, 1, 2],
+    })
+
+
+def decode(column):
+    return np.frombuffer(base64.b64decode(column['data']), dtype=column['dtype'])
+
+
+def test_bundle_encodes_days_codes_and_measures():
+    bundle = build_bundle(make_cube())
+    
+    assert bundle['start_date'] == '2024-01-01'
+    assert bundle['days'] == 3
+    assert bundle['dims']['city'] == ['Delhi', 'Pune', 'Unknown']
+    assert decode(bundle['columns']['day']).tolist() == [0, 0, 2]
+    assert decode(bundle['columns']['city']).tolist() == [1, 2, 0]
+    assert decode(bundle['columns']['sales_amount']).tolist() == [100.5, 20.0, 30.25]
+    assert decode(bundle['columns']['units']).dtype == np.int32
+
+
+def test_bundle_accepts_categorical_dimensions():
+    cube = make_cube()
+    cube['city'] = cube['city'].astype('category')
+    cube['category'] = cube['category'].astype('category')
+    
+    assert build_bundle(cube)['dims'] == build_bundle(make_cube())['dims']
+
+
+def test_build_writes_html_and_bundle(tmp_path):
+    path = DashboardBuilder().build(
+        cube=make_cube(), path=tmp_path / 'dashboard.html', bundle_path=tmp_path / 'bundle.json'
+    )
+    
+    page = path.read_text(encoding='utf-8')
+    assert '__BUNDLE__' not in page
+    assert json.loads((tmp_path / 'bundle.json').read_text(encoding='utf-8'))['rows'] == 3
+
+
+def test_render_escapes_closing_tags():
+    page = DashboardBuilder().render({'dims': {'city': ['</script>']}}, title='<b>Sales</b>')
+    
+    assert '<\\/script>' in page
+    assert '&lt;b&gt;Sales&lt;/b&gt;' in page
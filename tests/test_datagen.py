@@ -0,0 +1,88 @@
+# ============================================
+# Synthetic Data Tests
+# ============================================
+
+import io
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from datagen import SALES_COLUMNS, SyntheticDataGenerator, _format_csv_rows, sales_csv_bytes
+
+
+def generator(**kwargs):
+    return SyntheticDataGenerator(customers=500, products=200, sales=5000, seed=7,
+                                  start_date='2024-01-01', end_date='2024-03-31', **kwargs)
+
+
+def test_same_seed_gives_the_same_sales_for_any_chunk_size():
+    whole = pd.concat(generator().iter_sales(chunk_size=5000), ignore_index=True)
+    chunked = pd.concat(generator().iter_sales(chunk_size=700), ignore_index=True)
+    
+    pd.testing.assert_frame_equal(whole, chunked)
+    assert whole['order_id'].tolist() == list(range(1, 5001))
+    assert whole['order_date'].is_monotonic_increasing
+    assert whole['customer_id'].between(1, 500).all()
+    assert whole['product_id'].between(1, 200).all()
+
+
+def test_format_csv_rows_handles_variable_widths():
+    data = _format_csv_rows([
+        np.array([0, 9, 10, 12345]), b',',
+        np.array([b'ab', b'cd', b'ef', b'gh']), b',',
+        np.array([7, 100, 5, 99]), b'\n',
+    ])
+    
+    assert data == b'0,ab,7\n9,cd,100\n10,ef,5\n12345,gh,99\n'
+
+
+def test_sales_csv_round_trips_through_pandas():
+    chunk = next(generator().iter_sales(chunk_size=5000))
+    parsed = pd.read_csv(io.BytesIO(sales_csv_bytes(chunk, header=True)), parse_dates=['order_date'])
+    
+    assert list(parsed.columns) == SALES_COLUMNS
+    for column in ('order_id', 'customer_id', 'product_id', 'quantity'):
+        assert parsed[column].tolist() == chunk[column].tolist()
+    assert (parsed['order_date'].to_numpy(dtype='datetime64[D]') == chunk['order_date'].to_numpy(dtype='datetime64[D]')).all()
+    np.testing.assert_allclose(parsed['total_amount'], chunk['total_amount'])
+
+
+def test_write_files_csv(tmp_path):
+    paths = generator().write_files(output_dir=tmp_path, chunk_size=1000)
+    
+    sales = pd.read_csv(paths['sales'])
+    assert len(sales) == 5000
+    assert sales['order_id'].is_monotonic_increasing
+    assert len(pd.read_csv(paths['customers'])) == 500
+
+
+class FakeDatabase:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.inserted = {}
+    
+    def execute_query(self, sql):
+        return [{'1': 1}] if any(f"FROM {table} " in sql for table in self.existing) else []
+    
+    def load_data_infile(self, table, path, columns):
+        rows = path.read_bytes().count(b'\n')
+        self.inserted[table] = self.inserted.get(table, 0) + rows
+        return rows
+
+
+def test_load_database_counts_rows():
+    database = FakeDatabase()
+    counts = generator().load_database(database, chunk_size=2000, use_load_data=True)
+    
+    assert counts == {'customers': 500, 'products': 200, 'sales': 5000}
+    assert database.inserted == counts
+
+
+def test_load_database_refuses_non_empty_tables():
+    database = FakeDatabase(existing=['sales'])
+    
+    with pytest.raises(ValueError, match='sales'):
+        generator().load_database(database)
+    assert database.inserted == {}
@@ -0,0 +1,127 @@
+# ============================================
+# Database Manager Tests (fake connection, no server)
+# ============================================
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from db import DatabaseManager, apply_max_execution_time
+
+
+class FakeCursor:
+    def __init__(self, connection, rows=()):
+        self.connection = connection
+        self.rows = list(rows)
+        self.column_names = ('city', 'total')
+        self.executed = []
+        self.closed = False
+    
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        self.connection.unread_result = bool(self.rows)
+    
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        self.connection.unread_result = False
+        return rows
+    
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        self.connection.unread_result = bool(rows)
+        return rows
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    connection_id = 42
+    
+    def __init__(self, rows=(('Pune', 10),)):
+        self.rows = rows
+        self.cursors = []
+        self.unread_result = False
+        self.closed = False
+    
+    def is_connected(self):
+        return not self.closed
+    
+    def cursor(self, **options):
+        cursor = FakeCursor(self, self.rows)
+        self.cursors.append((options, cursor))
+        return cursor
+    
+    def consume_results(self):
+        raise AssertionError("unread rows must not be drained")
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def manager():
+    manager = DatabaseManager()
+    manager.connection = FakeConnection()
+    return manager
+
+
+def test_prepared_statement_is_reused_per_key(manager):
+    sql = "SELECT city, SUM(amount) AS total FROM sales WHERE order_date >= ? GROUP BY city"
+    assert manager.execute_prepared('by_city', sql, ('2024-01-01',)) == [{'city': 'Pune', 'total': 10}]
+    manager.execute_prepared('by_city', sql, ('2024-02-01',))
+    assert manager.statement_stats == {'prepares': 1, 'reuses': 1}
+    options, cursor = manager.connection.cursors[0]
+    assert options == {'prepared': True}
+    assert [params for _, params in cursor.executed] == [('2024-01-01',), ('2024-02-01',)]
+
+
+def test_changed_sql_is_prepared_again(manager):
+    manager.execute_prepared('by_city', "SELECT 1 FROM sales", ())
+    manager.execute_prepared('by_city', "SELECT 2 FROM sales", ())
+    first = manager.connection.cursors[0][1]
+    assert first.closed
+    assert manager.statement_stats['prepares'] == 2
+
+
+def test_reset_connection_forgets_statements(manager):
+    manager.execute_prepared('by_city', "SELECT 1 FROM sales", ())
+    manager.reset_connection()
+    assert manager.connection is None
+    assert manager._statements == {}
+
+
+def test_max_execution_time_hint():
+    assert apply_max_execution_time("SELECT 1", 500) == "SELECT /*+ MAX_EXECUTION_TIME(500) */ 1"
+    assert apply_max_execution_time("SELECT 1", None) == "SELECT 1"
+    assert apply_max_execution_time("UPDATE sales SET amount = 0", 500) == "UPDATE sales SET amount = 0"
+
+
+def test_stream_read_to_the_end_keeps_the_connection(manager):
+    connection = manager.connection = FakeConnection(rows=[{'order_id': i} for i in range(5)])
+    chunks = list(manager.iter_query("SELECT order_id FROM sales", chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert manager.connection is connection
+    assert connection.cursors[0][1].closed
+
+
+def test_stream_stopped_early_kills_the_query_instead_of_draining(manager, monkeypatch):
+    connection = manager.connection = FakeConnection(rows=[{'order_id': i} for i in range(5)])
+    killed = []
+    monkeypatch.setattr(manager, 'kill_query', killed.append)
+    stream = manager.iter_query("SELECT order_id FROM sales", chunk_size=2)
+    next(stream)
+    stream.close()
+    assert killed == [42]
+    assert connection.closed
+    assert manager.connection is None
+
+
+def test_stream_cleanup_never_hides_the_original_error(manager, monkeypatch):
+    manager.connection = FakeConnection(rows=[{'order_id': i} for i in range(5)])
+    monkeypatch.setattr(manager, 'kill_query', lambda connection_id: 1 / 0)
+    stream = manager.iter_query("SELECT order_id FROM sales", chunk_size=2)
+    next(stream)
+    with pytest.raises(KeyError):
+        stream.throw(KeyError('consumer failed'))
+    assert manager.connection is None
@@ -0,0 +1,73 @@
+# ============================================
+# Dtype Optimizer Tests
+# ============================================
+
+import threading
+from decimal import Decimal
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from dtype_optimizer import CategoryCache, optimize_dataframe, memory_usage_report
+
+
+def test_optimize_dataframe_compacts_columns():
+    df = pd.DataFrame({
+        'city': ['Pune', 'Goa', 'Pune', 'Pune'],
+        'note': ['a', 'b', 'c', 'd'],
+        'total_spent': [Decimal('10.50'), Decimal('2.25'), None, Decimal('1')],
+        'order_count': [1, 2, 3, 4],
+    })
+    optimized = optimize_dataframe(df, category_cache=CategoryCache(), categorical_columns=['city'],
+                                   max_unique_ratio=0.5)
+    assert isinstance(optimized['city'].dtype, pd.CategoricalDtype)
+    assert optimized['note'].dtype == df['note'].dtype  # Every value unique
+    assert optimized['total_spent'].dtype == 'float64'
+    assert optimized['order_count'].dtype == 'int8'
+    assert not isinstance(df['city'].dtype, pd.CategoricalDtype)  # Input left alone
+    assert memory_usage_report(df, optimized)['saved_bytes'] > 0
+
+
+def test_shared_codes_stay_stable():
+    cache = CategoryCache()
+    first = cache.encode('city', pd.Series(['Pune', 'Goa']))
+    second = cache.encode('city', pd.Series(['Delhi', 'Pune']))
+    assert list(second.cat.categories) == ['Pune', 'Goa', 'Delhi']
+    assert first.cat.codes.tolist() == [0, 1]
+    assert second.cat.codes.tolist() == [2, 0]
+    # Earlier results adopt the grown list without re-coding, then concatenate as categoricals
+    first = first.cat.set_categories(cache.get_categories('city'))
+    assert first.cat.codes.tolist() == [0, 1]
+    assert isinstance(pd.concat([first, second]).dtype, pd.CategoricalDtype)
+
+
+def test_high_cardinality_column_leaves_the_cache():
+    cache = CategoryCache(max_values=3)
+    cache.encode('customer_name', pd.Series(['a', 'b']))
+    encoded = cache.encode('customer_name', pd.Series(['c', 'd']))
+    assert cache.get_categories('customer_name') is None
+    assert list(encoded.cat.categories) == ['c', 'd']
+    later = cache.encode('customer_name', pd.Series(['e']))
+    assert list(later.cat.categories) == ['e']
+
+
+def test_concurrent_encoding_keeps_every_value():
+    cache = CategoryCache(max_values=0)
+    barrier = threading.Barrier(8)
+    results = {}
+    
+    def encode(worker):
+        barrier.wait()
+        results[worker] = cache.encode('city', pd.Series([f"city-{worker}-{i}" for i in range(200)]))
+    
+    threads = [threading.Thread(target=encode, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    categories = cache.get_categories('city')
+    assert len(categories) == 8 * 200
+    for series in results.values():
+        # Codes handed out earlier still point at the same values
+        assert (categories[series.cat.codes.to_numpy()] == series.astype(str).to_numpy()).all()
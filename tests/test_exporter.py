@@ -0,0 +1,76 @@
+# ============================================
+# Export Tests (fake executor, no database)
+# ============================================
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('mysql.connector')
+
+from exporter import ResultExporter, format_preview
+
+
+class FakeExecutor:
+    """Streams fixed chunks, optionally failing after them."""
+    
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+    
+    def execute_chunked(self, query_name, params=None, chunk_size=None):
+        yield from self.chunks
+        if self.error is not None:
+            raise self.error
+
+
+def chunks():
+    return [pd.DataFrame({'city': ['Pune', 'Goa'], 'total': [1.5, 2.0]}),
+            pd.DataFrame({'city': ['Delhi'], 'total': [3.0]})]
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'csv.gz'])
+def test_csv_export_writes_one_header(tmp_path, fmt):
+    exporter = ResultExporter(output_dir=tmp_path)
+    summary = exporter.export('sales_by_city', fmt=fmt, executor=FakeExecutor(chunks()))
+    assert (summary['rows'], summary['chunks']) == (3, 2)
+    assert pd.read_csv(summary['path'])['city'].tolist() == ['Pune', 'Goa', 'Delhi']
+    assert [p.name for p in tmp_path.iterdir()] == [summary['path'].name]
+
+
+def test_parquet_export_types_columns_from_later_chunks(tmp_path):
+    pytest.importorskip('pyarrow')
+    first = pd.DataFrame({'city': ['Pune'], 'note': [None]})
+    second = pd.DataFrame({'city': ['Goa'], 'note': ['late']})
+    exporter = ResultExporter(output_dir=tmp_path)
+    summary = exporter.export('sales_by_city', fmt='parquet', executor=FakeExecutor([first, second]))
+    assert pd.read_parquet(summary['path'])['note'].tolist() == [None, 'late']
+
+
+def test_failed_export_leaves_no_partial_file(tmp_path):
+    exporter = ResultExporter(output_dir=tmp_path)
+    path = exporter.get_output_path('sales_by_city', 'csv')
+    path.write_text('previous export\n')
+    with pytest.raises(RuntimeError):
+        exporter.export('sales_by_city', fmt='csv',
+                        executor=FakeExecutor(chunks(), error=RuntimeError('connection lost')))
+    assert path.read_text() == 'previous export\n'
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_export_many_returns_failures(tmp_path, monkeypatch):
+    exporter = ResultExporter(output_dir=tmp_path, max_workers=2)
+    
+    def export(query_name, params=None, fmt=None):
+        if query_name == 'top_products':
+            raise RuntimeError('boom')
+        return {'query': query_name}
+    
+    monkeypatch.setattr(exporter, 'export', export)
+    summaries, failures = exporter.export_many(['sales_by_city', ('top_products', {'limit': 5})], fmt='csv')
+    assert summaries == [{'query': 'sales_by_city'}]
+    assert list(failures) == ['top_products']
+
+
+def test_format_preview_is_bounded():
+    preview = format_preview(pd.DataFrame({'n': range(100)}), max_rows=3)
+    assert preview.endswith('... (97 more rows)')
@@ -0,0 +1,62 @@
+# ============================================
+# Insight Engine Tests
+# ============================================
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from insight_engine import InsightEngine, ALL_SEGMENTS
+
+
+@pytest.fixture
+def sales():
+    return pd.DataFrame({
+        'city': ['Pune', 'Pune', 'Pune', 'Goa', 'Goa'],
+        'month': ['2024-01', '2024-02', '2024-03', '2024-01', '2024-02'],
+        'total_sales': [10.0, 30.0, 60.0, 5.0, 5.0],
+    })
+
+
+def test_summarize_every_segment_at_once(sales):
+    summary = InsightEngine().summarize(sales, ['total_sales'], ['city', 'month'], time_column='month')
+    pune = summary.set_index('city').loc['Pune']
+    
+    assert (pune['count'], pune['total'], pune['peak_label'], pune['trough_label']) == (3, 100.0, '2024-03', '2024-01')
+    assert pune['peak_share'] == pytest.approx(0.6)
+    assert pune['growth_pct'] == pytest.approx(100.0)
+    assert pune['pareto_items_pct'] == pytest.approx(200 / 3)  # 60 + 30 reach 80% of 100
+    assert summary.set_index('city').loc['Goa', 'growth_pct'] == 0.0
+
+
+def test_summarize_without_segments_uses_one_group(sales):
+    summary = InsightEngine().summarize(sales[['month', 'total_sales']], ['total_sales'], ['month'])
+    assert summary[ALL_SEGMENTS].tolist() == [ALL_SEGMENTS]
+    assert summary['total'].tolist() == [110.0]
+    assert summary['growth_pct'].isna().all()
+
+
+def test_anomalies_are_counted_per_segment():
+    values = [100.0] * 30 + [1000.0]
+    df = pd.DataFrame({'day': range(31), 'sales_amount': values})
+    summary = InsightEngine().summarize(df, ['sales_amount'], ['day'])
+    assert summary['anomalies'].tolist() == [1]
+
+
+def test_render_lists_top_segments_by_rank(sales):
+    engine = InsightEngine()
+    summary = engine.summarize(sales, ['total_sales'], ['city', 'month'], time_column='month')
+    text = engine.render_markdown(summary, 'Monthly sales', max_segments=1)
+    assert text.splitlines()[:3] == [
+        '🔎 **Monthly sales**',
+        '- Segments: 2 (showing top 1 by total_sales)',
+        '- **Pune**',
+    ]
+    assert 'Goa' not in text
+    assert 'total ₹100.00' in text and 'latest growth +100.0%' in text
+
+
+def test_empty_input():
+    engine = InsightEngine()
+    assert engine.summarize(pd.DataFrame()).empty
+    assert engine.render_markdown(pd.DataFrame(), 'Nothing') == 'No data available for Nothing.'
@@ -0,0 +1,132 @@
+# ============================================
+# Load Test Report Tests
+# ============================================
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from loadtest import ConnectionSampler, LoadTest, StandInServer, render_html
+
+
+def make_test(records, timeline=(), warmup=1):
+    test = LoadTest(target=None, mix={'top_products': 1, 'sales_by_city': 1},
+                    qps=4, duration=3, warmup=warmup)
+    test.records = list(records)
+    test.timeline = list(timeline)
+    return test
+
+
+def test_summary_excludes_warmup_and_counts_errors():
+    records = [
+        # (scheduled offset, query, latency, service time, error, completion offset)
+        (0.5, 'top_products', 0.900, 0.010, None, 1.4),  # Warm-up
+        (1.0, 'top_products', 0.010, 0.010, None, 1.01),
+        (1.5, 'sales_by_city', 0.020, 0.015, None, 1.52),
+        (2.0, 'sales_by_city', 0.000, 0.000, 'Shed', 2.0),
+        (2.5, 'top_products', 0.030, 0.020, 'QueryTimeoutError', 2.53),
+    ]
+    report = make_test(records).summarize(elapsed=3.0)
+    summary = report['summary']
+    
+    assert summary['requests'] == 4
+    assert summary['completed'] == 2
+    assert summary['errors'] == 2
+    assert summary['error_rate'] == 0.5
+    assert summary['max_ms'] == 20.0
+    assert report['errors'] == {'Shed': 1, 'QueryTimeoutError': 1}
+    assert report['queries']['top_products'] == {
+        'requests': 2, 'errors': 1, 'p50_ms': 10.0, 'p95_ms': 10.0, 'p99_ms': 10.0,
+    }
+    assert summary['saturated']  # Error rate above LOADTEST_MAX_ERROR_RATE
+
+
+def test_throughput_uses_completion_times():
+    # Three requests finish 2 s after warm-up: 1.5 QPS served, whatever the offered rate
+    records = [
+        (1.0, 'top_products', 0.5, 0.5, None, 1.5),
+        (1.2, 'top_products', 1.0, 0.5, None, 2.2),
+        (1.4, 'sales_by_city', 1.6, 0.5, None, 3.0),
+    ]
+    summary = make_test(records).summarize(elapsed=3.0)['summary']
+    assert summary['throughput_qps'] == 1.5
+
+
+def test_timeline_joins_in_flight_peaks():
+    records = [(0.2, 'top_products', 0.05, 0.05, None, 0.25), (1.2, 'sales_by_city', 0.07, 0.07, None, 1.27)]
+    samples = [
+        {'t': 1.0, 'in_flight': 3, 'backlog': 1, 'connections': 4},
+        {'t': 2.0, 'in_flight': 7, 'backlog': 0, 'connections': 6},
+    ]
+    report = make_test(records, samples, warmup=0).summarize(elapsed=3.0)
+    
+    assert report['summary']['peak_in_flight'] == 7
+    assert report['summary']['peak_connections'] == 6
+    timeline = report['timeline']
+    assert [second['t'] for second in timeline] == [0, 1, 2, 3]
+    assert [second['requests'] for second in timeline] == [1, 1, 0, 0]
+    assert [second['in_flight'] for second in timeline] == [3, 3, 7, None]
+    assert [second['connections'] for second in timeline] == [4, 4, 6, None]
+    assert timeline[1]['p95_ms'] == 70.0
+
+
+class StopAfter:
+    """Stands in for the sampler's stop event: lets `ticks` intervals pass."""
+    
+    def __init__(self, ticks):
+        self.ticks = ticks
+    
+    def wait(self, timeout):
+        self.ticks -= 1
+        return self.ticks < 0
+
+
+def test_sample_records_connections():
+    server = StandInServer()
+    test = make_test([])
+    test.connections = ConnectionSampler(stand_in=server)
+    server.open_connection()
+    test._sample(start=0.0, stop=StopAfter(1))
+    server.open_connection()
+    test._sample(start=0.0, stop=StopAfter(1))
+    
+    assert [sample['connections'] for sample in test.timeline] == [1, 2]
+    assert test.summarize(elapsed=3.0)['summary']['peak_connections'] == 2
+
+
+def test_failing_connection_probe_is_disabled():
+    calls = []
+    
+    def probe():
+        calls.append(1)
+        raise RuntimeError('no status')
+    
+    test = make_test([])
+    test.connections = probe
+    test._sample(start=0.0, stop=StopAfter(3))
+    
+    assert len(calls) == 1
+    assert [sample['connections'] for sample in test.timeline] == [None, None, None]
+    assert test.summarize(elapsed=3.0)['summary']['peak_connections'] is None
+
+
+def test_html_charts_connections_next_to_in_flight():
+    samples = [{'t': 1.0, 'in_flight': 3, 'backlog': 0, 'connections': 4},
+               {'t': 2.0, 'in_flight': 5, 'backlog': 0, 'connections': 8}]
+    stage = make_test([(1.0, 'top_products', 0.01, 0.01, None, 1.01)], samples).summarize(elapsed=3.0)
+    stage['qps'] = 4
+    page = render_html([{'label': 'pool', 'stages': [stage]}])
+    
+    assert page.index('Peak in-flight requests') < page.index('DB connections')
+    assert 'max 8' in page
+    assert '<th>peak_connections</th>' in page
+
+
+def test_html_renders_reports_without_connections():
+    stage = make_test([(1.0, 'top_products', 0.01, 0.01, None, 1.01)]).summarize(elapsed=3.0)
+    stage['qps'] = 4
+    del stage['summary']['peak_connections']
+    for second in stage['timeline']:
+        del second['connections']
+    
+    assert 'DB connections' in render_html([{'label': 'old', 'stages': [stage]}])
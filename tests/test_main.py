@@ -0,0 +1,74 @@
+# ============================================
+# Application Tests
+# ============================================
+
+import pytest
+
+pytest.importorskip('pandas')
+
+import config
+import main
+import result_diff
+
+
+class FakeDatabase:
+    def connect(self):
+        pass
+    
+    def disconnect(self):
+        pass
+
+
+class FakeAnalyzer:
+    class executor:
+        default_priority = None
+    
+    def __getattr__(self, name):
+        return lambda **kwargs: None
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'INSIGHTS_FILE', tmp_path / 'insights.md')
+    monkeypatch.setattr(config, 'MEMORY_REPORT_FILE', tmp_path / 'memory.csv')
+    monkeypatch.setattr(result_diff, 'SNAPSHOT_DIR', tmp_path / 'snapshots')
+    application = main.SalesAnalyticsApp()
+    application._db = FakeDatabase()
+    application._analyzer = FakeAnalyzer()
+    monkeypatch.setattr(application, '_run_analyses', lambda *args: {})
+    return application
+
+
+def probe_returning(changed, calls):
+    class Probe:
+        def __init__(self, db):
+            pass
+        
+        def has_changed(self, store):
+            calls.append(store)
+            return changed, {'sales': (1, None)}
+    return Probe
+
+
+def test_plain_run_does_not_probe_source_tables(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(result_diff, 'ChangeProbe', probe_returning(True, calls))
+    
+    assert app.run_all_analyses() is True
+    assert calls == []
+    assert result_diff.ResultStore().load_fingerprint() is None
+
+
+def test_if_changed_skips_when_nothing_changed(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(result_diff, 'ChangeProbe', probe_returning(False, calls))
+    
+    assert app.run_all_analyses(only_if_changed=True) is False
+    assert len(calls) == 1
+
+
+def test_if_changed_records_the_fingerprint_after_a_run(app, monkeypatch):
+    monkeypatch.setattr(result_diff, 'ChangeProbe', probe_returning(True, []))
+    
+    assert app.run_all_analyses(only_if_changed=True) is True
+    assert result_diff.ResultStore().load_fingerprint() == {'sales': (1, None)}
@@ -0,0 +1,69 @@
+# ============================================
+# Memory Budget Tests
+# ============================================
+
+import sys
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+import memory_budget
+from memory_budget import MemoryBudget, SpilledResult
+
+
+@pytest.fixture(autouse=True)
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_budget, 'SPILL_DIR', tmp_path)
+    return tmp_path
+
+
+def chunk(start, rows=100):
+    return pd.DataFrame({'order_id': range(start, start + rows), 'city': ['Pune'] * rows})
+
+
+def test_result_within_budget_stays_in_memory():
+    budget = MemoryBudget('small', budget_bytes=10**9)
+    budget.add(chunk(0))
+    budget.add(chunk(100))
+    result = budget.result()
+    assert isinstance(result, pd.DataFrame)
+    assert result['order_id'].tolist() == list(range(200))
+
+
+def test_result_over_budget_spills_every_chunk_in_order(spill_dir):
+    budget = MemoryBudget('large', budget_bytes=1)
+    for start in range(0, 500, 100):
+        budget.add(chunk(start))
+    result = budget.result()
+    
+    assert isinstance(result, SpilledResult)
+    assert len(result) == 500 and len(result.paths) == 5
+    assert result.directory.parent == spill_dir
+    assert result.head(3)['order_id'].tolist() == [0, 1, 2]
+    assert result.to_frame()['order_id'].tolist() == list(range(500))
+    
+    result.cleanup()
+    assert not result.directory.exists()
+
+
+def test_zero_budget_is_unbounded():
+    budget = MemoryBudget('unbounded', budget_bytes=0)
+    budget.add(chunk(0, rows=10_000))
+    assert isinstance(budget.result(), pd.DataFrame)
+
+
+def test_spilled_csv_has_a_single_header(tmp_path):
+    spilled = SpilledResult('csv', directory=tmp_path)
+    spilled.append(chunk(0, rows=2))
+    spilled.append(chunk(2, rows=2))
+    path = spilled.to_csv(tmp_path / 'out.csv')
+    assert path.read_text().splitlines() == [
+        'order_id,city', '0,Pune', '1,Pune', '2,Pune', '3,Pune',
+    ]
+
+
+def test_spill_format_falls_back_to_pickle_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(memory_budget, 'SPILL_FORMAT', 'parquet')
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    assert memory_budget._spill_format() == 'pickle'
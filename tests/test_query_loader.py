@@ -0,0 +1,111 @@
+# ============================================
+# Query Loader Tests
+# ============================================
+
+from datetime import date
+import pytest
+from query_loader import compile_query, extract_tables, QueryLoader, UnknownQueryError, to_positional_sql
+
+
+def make_query(**overrides):
+    query = {
+        'sql': "SELECT * FROM sales s JOIN products p ON s.product_id = p.product_id "
+               "WHERE s.order_date >= %(since)s LIMIT %(limit)s",
+        'description': 'Test query',
+        'params': ['since', 'limit'],
+        'param_types': {'since': 'date', 'limit': 'int'},
+        'defaults': {'limit': 10},
+    }
+    query.update(overrides)
+    return query
+
+
+def test_compile_precomputes_positional_sql_and_tables():
+    compiled = compile_query('recent', make_query())
+    assert compiled.positional_sql.count('?') == 2
+    assert compiled.positional_params == ('since', 'limit')
+    assert compiled.tables == {'sales', 'products'}
+    assert compiled.read_only
+
+
+def test_compile_rejects_undeclared_placeholder():
+    with pytest.raises(ValueError, match='do not match SQL placeholders'):
+        compile_query('recent', make_query(params=['since'], param_types={}, defaults={}))
+
+
+def test_compile_rejects_unknown_type_and_bad_default():
+    with pytest.raises(ValueError, match="unknown type 'decimal'"):
+        compile_query('recent', make_query(param_types={'since': 'decimal'}))
+    with pytest.raises(ValueError, match="default for 'limit' is invalid"):
+        compile_query('recent', make_query(defaults={'limit': 'ten'}))
+
+
+def test_bind_converts_types_and_fills_defaults():
+    compiled = compile_query('recent', make_query())
+    assert compiled.bind({'since': '2024-01-31'}) == {'since': date(2024, 1, 31), 'limit': 10}
+    assert compiled.bind_positional({'since': '2024-01-31', 'limit': '5'}) == (date(2024, 1, 31), 5)
+
+
+@pytest.mark.parametrize('params, message', [
+    ({'since': '2024-01-31', 'limit': 2.5}, "'limit' must be int"),
+    ({'since': '2024-01-31', 'limit': True}, "'limit' must be int"),
+    ({'since': 'yesterday'}, "'since' must be date"),
+    ({'limit': 5}, 'missing parameter: since'),
+    ({'since': '2024-01-31', 'city': 'Pune'}, 'unknown parameters'),
+])
+def test_bind_rejects_bad_params(params, message):
+    compiled = compile_query('recent', make_query())
+    with pytest.raises(ValueError, match=message):
+        compiled.bind(params)
+
+
+def test_extract_tables_skips_function_from_and_table_functions():
+    sql = ("SELECT EXTRACT(YEAR FROM s.order_date) AS y FROM sales s "
+           "JOIN JSON_TABLE(%(f)s, '$[*]' COLUMNS(city VARCHAR(64) PATH '$.city')) f "
+           "WHERE s.customer_id IN (SELECT customer_id FROM customers)")
+    assert extract_tables(sql) == {'sales', 'customers'}
+
+
+def test_raw_is_a_private_copy():
+    query = make_query()
+    compiled = compile_query('recent', query)
+    query['params'].append('city')
+    query['defaults']['limit'] = 99
+    assert compiled.raw['params'] == ['since', 'limit']
+    assert compiled.raw['defaults'] == {'limit': 10}
+    with pytest.raises(TypeError):
+        compiled.raw['sql'] = 'DELETE FROM sales'
+
+
+@pytest.fixture
+def queries_file(tmp_path):
+    path = tmp_path / 'queries.json'
+    path.write_text('{"a": {"sql": "SELECT 1 FROM sales", "description": "A", "params": []}}')
+    return path
+
+
+def test_unknown_query_error(queries_file):
+    loader = QueryLoader(queries_file)
+    with pytest.raises(UnknownQueryError) as info:
+        loader.get_query('missing')
+    assert isinstance(info.value, KeyError)
+    assert str(info.value) == "Query 'missing' not found"
+
+
+def test_successful_reload_bumps_generation(queries_file):
+    loader = QueryLoader(queries_file)
+    generation = loader.generation
+    queries_file.write_text('{"a": {"sql": "SELECT 2 FROM sales", "description": "A", "params": []}}')
+    loader.reload()
+    assert loader.generation == generation + 1
+    
+    queries_file.write_text('{"a": {"sql": "SELECT 3 FROM sales", "description": "A"}}')
+    with pytest.raises(ValueError):
+        loader.reload()
+    assert loader.generation == generation + 1
+
+
+def test_to_positional_sql_keeps_placeholder_order():
+    sql, names = to_positional_sql("SELECT * FROM sales WHERE a = %(x)s AND b = %(y)s OR c = %(x)s")
+    assert sql == "SELECT * FROM sales WHERE a = ? AND b = ? OR c = ?"
+    assert names == ['x', 'y', 'x']
@@ -0,0 +1,125 @@
+# ============================================
+# Resilience Tests
+# ============================================
+
+import pytest
+import resilience
+from resilience import (
+    CircuitBreaker, RetryPolicy, DatabaseUnavailableError, CLOSED, OPEN, HALF_OPEN
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class DatabaseError(Exception):
+    def __init__(self, errno):
+        super().__init__(f"errno {errno}")
+        self.errno = errno
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(DatabaseUnavailableError, match='circuit open'):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_admits_a_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(DatabaseUnavailableError, match='trial call running'):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_abandoned_trial_is_replaced(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    clock.now += 10
+    breaker.before_call()  # The first trial never reported back
+
+
+def test_retry_recovers_from_transient_errors(monkeypatch):
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    outcomes = [DatabaseError(2013), DatabaseError(1213), 'rows']
+    
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    reconnects = []
+    policy = RetryPolicy(max_attempts=3, base_delay=0, breaker=CircuitBreaker(failure_threshold=5))
+    assert policy.call(flaky, on_retry=reconnects.append) == 'rows'
+    assert len(reconnects) == 2
+    stats = policy.stats()
+    assert (stats['attempts'], stats['retries'], stats['recovered'], stats['failed']) == (3, 2, 1, 0)
+    assert stats['circuit']['state'] == CLOSED
+
+
+def test_retry_does_not_repeat_non_idempotent_or_permanent_errors(monkeypatch):
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    calls = []
+    
+    def fail(errno):
+        calls.append(errno)
+        raise DatabaseError(errno)
+    
+    policy = RetryPolicy(max_attempts=3, base_delay=0, breaker=CircuitBreaker(failure_threshold=5))
+    with pytest.raises(DatabaseError):
+        policy.call(lambda: fail(1064))  # Syntax error
+    with pytest.raises(DatabaseError):
+        policy.call(lambda: fail(2006), idempotent=False)
+    assert calls == [1064, 2006]
+    assert policy.stats()['failed'] == 1
+
+
+def test_rejected_call_counts_as_failed(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    policy = RetryPolicy(breaker=breaker)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.call(lambda: 'rows')
+    assert policy.stats()['failed'] == 1
+    assert policy.stats()['attempts'] == 0
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=3)
+    assert all(0 <= policy.backoff(retry) <= 3 for retry in range(10))
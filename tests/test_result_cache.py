@@ -0,0 +1,70 @@
+# ============================================
+# Result Cache Tests
+# ============================================
+
+import result_cache
+from result_cache import ResultCache
+
+
+def test_put_and_get():
+    cache = ResultCache(ttl_seconds=60)
+    cache.put('top_products', {'limit': 10}, 'rows')
+    assert cache.get('top_products', {'limit': 10}) == 'rows'
+    assert cache.get('top_products', {'limit': 5}) is None
+
+
+def test_invalidate_one_query():
+    cache = ResultCache(ttl_seconds=60)
+    cache.put('top_products', None, 'products')
+    cache.put('sales_by_city', None, 'cities')
+    cache.invalidate('top_products')
+    assert cache.get('top_products', None) is None
+    assert cache.get('sales_by_city', None) == 'cities'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(ttl_seconds=60, max_entries=2)
+    cache.put('top_products', {'limit': 1}, 'one')
+    cache.put('top_products', {'limit': 2}, 'two')
+    assert cache.get('top_products', {'limit': 1}) == 'one'
+    cache.put('top_products', {'limit': 3}, 'three')
+    assert cache.get('top_products', {'limit': 2}) is None
+    assert cache.get('top_products', {'limit': 1}) == 'one'
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+
+
+def test_put_sweeps_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl_seconds=60)
+    for limit in range(5):
+        cache.put('top_products', {'limit': limit}, limit)
+    now[0] += 61
+    cache.put('sales_by_city', None, 'cities')
+    assert cache.stats()['entries'] == 1
+
+
+def test_put_from_older_generation_is_dropped():
+    cache = ResultCache(ttl_seconds=60)
+    cache.invalidate('top_products', generation=2)
+    cache.put('top_products', None, 'stale', generation=1)
+    assert cache.get('top_products', None) is None
+    cache.put('top_products', None, 'fresh', generation=2)
+    assert cache.get('top_products', None) == 'fresh'
+    # Other queries did not change in that reload
+    cache.put('sales_by_city', None, 'cities', generation=1)
+    assert cache.get('sales_by_city', None) == 'cities'
+
+
+def test_full_invalidate_applies_to_every_query():
+    cache = ResultCache(ttl_seconds=60)
+    cache.invalidate(generation=3)
+    cache.put('sales_by_city', None, 'stale', generation=2)
+    assert cache.get('sales_by_city', None) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(ttl_seconds=0)
+    cache.put('top_products', None, 'rows')
+    assert cache.get('top_products', None) is None
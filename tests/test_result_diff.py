@@ -0,0 +1,82 @@
+# ============================================
+# Result Diff Tests
+# ============================================
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from result_diff import ChangeProbe, ResultStore, diff_results
+
+
+def test_keyed_diff_reports_added_removed_and_changed():
+    previous = pd.DataFrame({'city': ['Pune', 'Delhi', 'Goa'], 'total_sales': [100.0, 200.0, 50.0]})
+    current = pd.DataFrame({'city': ['Pune', 'Delhi', 'Agra'], 'total_sales': [100.0, 260.0, 30.0]})
+    diff = diff_results(previous, current, keys=['city'], measures=['total_sales'])
+    
+    assert diff.has_changes
+    assert diff.added['city'].tolist() == ['Agra']
+    assert diff.removed['city'].tolist() == ['Goa']
+    assert diff.changed['city'].tolist() == ['Delhi']
+    assert diff.changed['total_sales_delta'].tolist() == [60.0]
+    assert diff.totals == {'total_sales': 40.0}
+
+
+def test_identical_results_within_tolerance_are_unchanged():
+    previous = pd.DataFrame({'city': ['Pune'], 'total_sales': [0.1 + 0.2]})
+    current = pd.DataFrame({'city': ['Pune'], 'total_sales': [0.3]})
+    diff = diff_results(previous, current, keys=['city'], measures=['total_sales'])
+    assert not diff.has_changes
+
+
+def test_categorical_keys_join_with_plain_keys():
+    previous = pd.DataFrame({'city': pd.Categorical(['Pune', 'Delhi']), 'orders': [1, 2]})
+    current = pd.DataFrame({'city': ['Pune', 'Delhi'], 'orders': [1, 3]})
+    diff = diff_results(previous, current, keys=['city'], measures=['orders'])
+    assert diff.changed['city'].tolist() == ['Delhi']
+
+
+def test_duplicate_keys_fall_back_to_whole_rows():
+    previous = pd.DataFrame({'city': ['Pune', 'Pune'], 'orders': [1, 2]})
+    current = pd.DataFrame({'city': ['Pune', 'Pune'], 'orders': [1, 3]})
+    diff = diff_results(previous, current, keys=['city'])
+    assert diff.keys == ['city', 'orders']
+    assert len(diff.added) == 1 and len(diff.removed) == 1
+    assert diff.changed.empty
+
+
+class FakeDatabase:
+    """Answers the watermark probe's two queries from in-memory state."""
+    
+    def __init__(self):
+        self.max_ids = {'sales': 10, 'customers': 3}
+        self.update_times = {'sales': '2024-01-01 00:00:00', 'customers': None}
+        self.queries = []
+    
+    def execute_query(self, sql, params=None):
+        self.queries.append(sql)
+        if 'information_schema' in sql:
+            return [{'table_name': t, 'update_time': u} for t, u in self.update_times.items()]
+        return [{f"{t}__max": m for t, m in self.max_ids.items()}]
+
+
+def test_watermark_probe_reads_max_key_and_update_time(tmp_path):
+    database = FakeDatabase()
+    probe = ChangeProbe(database, tables=['sales', 'customers'], mode='watermark')
+    store = ResultStore(tmp_path)
+    
+    changed, fingerprint = probe.has_changed(store)
+    assert changed
+    assert fingerprint['sales'] == (10, '2024-01-01 00:00:00')
+    assert not any('COUNT(' in sql for sql in database.queries)
+    
+    store.save_fingerprint(fingerprint)
+    assert not probe.has_changed(store)[0]
+    
+    database.update_times['customers'] = '2024-01-02 00:00:00'
+    assert probe.has_changed(store)[0]
+
+
+def test_probe_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        ChangeProbe(FakeDatabase(), mode='rowcount')
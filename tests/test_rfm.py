@@ -0,0 +1,139 @@
+# ============================================
+# RFM Segmentation Tests
+# ============================================
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+import rfm
+from rfm import MONTH_BITS, MONTH_EPOCH, RFMEngine, label_segments, month_index, quantile_scores
+
+
+def make_sales(rows=2000, customers=200, start='2023-01-01', seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'order_id': np.arange(1, rows + 1),
+        'customer_id': rng.integers(1, customers, rows),
+        'order_date': pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'total_amount': rng.gamma(2.0, 1500.0, rows),
+    })
+
+
+def engine(tmp_path):
+    return RFMEngine(state_file=tmp_path / 'rfm_state.pkl')
+
+
+def test_chunked_updates_match_a_single_update(tmp_path):
+    sales = make_sales()
+    whole = engine(tmp_path).update(sales)
+    chunked = engine(tmp_path)
+    for start in range(0, len(sales), 300):
+        chunked.update(sales.iloc[start:start + 300])
+    
+    pd.testing.assert_frame_equal(whole.score(), chunked.score())
+    pd.testing.assert_frame_equal(whole.cohort_retention(), chunked.cohort_retention())
+    assert chunked.watermark == len(sales)
+
+
+def test_compacts_pending_partials_past_the_row_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(rfm, 'RFM_COMPACT_ROWS', 50)
+    sales_engine = engine(tmp_path)
+    sales_engine.update(make_sales(rows=500))
+    
+    assert sales_engine._pending == []
+    assert len(sales_engine.customers) > 0
+
+
+def test_aggregates_per_customer(tmp_path):
+    sales = pd.DataFrame({
+        'order_id': [1, 2, 3],
+        'customer_id': [7, 7, 8],
+        'order_date': pd.to_datetime(['2024-01-05', '2024-03-01', '2024-02-10']),
+        'total_amount': [100.0, 50.0, 20.0],
+    })
+    customers = engine(tmp_path).update(sales).score(as_of='2024-03-11')
+    
+    assert customers.loc[7, 'frequency'] == 2
+    assert customers.loc[7, 'monetary'] == 150.0
+    assert customers.loc[7, 'recency_days'] == 10
+    assert customers.loc[8, 'recency_days'] == 30
+
+
+def test_cohort_retention_counts_active_months(tmp_path):
+    sales = pd.DataFrame({
+        'order_id': [1, 2, 3, 4],
+        'customer_id': [1, 1, 2, 1],
+        'order_date': pd.to_datetime(['2024-01-05', '2024-02-01', '2024-01-20', '2024-02-15']),
+        'total_amount': [1.0, 1.0, 1.0, 1.0],
+    })
+    counts = engine(tmp_path).update(sales).cohort_retention(as_share=False)
+    
+    assert list(counts.index) == ['2024-01']
+    assert counts.loc['2024-01', 0] == 2
+    assert counts.loc['2024-01', 1] == 1
+
+
+def test_months_before_1970_keep_customer_ids_intact(tmp_path):
+    sales = pd.DataFrame({
+        'order_id': [1, 2],
+        'customer_id': [5, 5],
+        'order_date': pd.to_datetime(['1965-03-01', '1965-05-01']),
+        'total_amount': [10.0, 10.0],
+    })
+    sales_engine = engine(tmp_path).update(sales)
+    sales_engine.compact()
+    
+    assert set(sales_engine.activity >> MONTH_BITS) == {5}
+    counts = sales_engine.cohort_retention(as_share=False)
+    assert list(counts.index) == ['1965-03']
+    assert counts.loc['1965-03', 2] == 1
+
+
+def test_month_index_rejects_unpackable_dates():
+    assert month_index(np.array([MONTH_EPOCH], dtype='datetime64[ns]'))[0] == 0
+    with pytest.raises(ValueError):
+        month_index(np.array(['1899-12-31'], dtype='datetime64[ns]'))
+
+
+def test_state_round_trip_and_reset(tmp_path):
+    sales_engine = engine(tmp_path).update(make_sales())
+    sales_engine.save_state()
+    loaded = engine(tmp_path).load_state()
+    
+    pd.testing.assert_frame_equal(sales_engine.score(), loaded.score())
+    np.testing.assert_array_equal(sales_engine.activity, loaded.activity)
+    assert loaded.watermark == sales_engine.watermark
+    
+    loaded.reset()
+    assert loaded.watermark == 0
+    assert loaded.customers.empty
+    assert not (tmp_path / 'rfm_state.pkl').exists()
+
+
+def test_loads_state_packed_from_1970(tmp_path):
+    sales_engine = engine(tmp_path).update(make_sales())
+    expected = sales_engine.cohort_retention()
+    legacy_months = (sales_engine.activity & ((1 << MONTH_BITS) - 1)) - (
+        np.datetime64('1970-01', 'M') - MONTH_EPOCH
+    ).astype(np.int64)
+    pd.to_pickle({
+        'customers': sales_engine.customers,
+        'activity': ((sales_engine.activity >> MONTH_BITS) << MONTH_BITS) | legacy_months,
+        'watermark': sales_engine.watermark,
+    }, tmp_path / 'rfm_state.pkl')
+    
+    pd.testing.assert_frame_equal(engine(tmp_path).load_state().cohort_retention(), expected)
+
+
+def test_quantile_scores_split_ties_evenly():
+    scores = quantile_scores(pd.Series([1.0] * 10), quantiles=5)
+    
+    assert sorted(scores.value_counts()) == [2, 2, 2, 2, 2]
+
+
+def test_label_segments():
+    labels = label_segments([5, 3, 5, 1, 1], [5, 3, 1, 5, 1])
+    
+    assert list(labels) == ['Champions', 'Loyal Customers', 'New Customers', 'Cannot Lose Them', 'Lost']
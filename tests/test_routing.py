@@ -0,0 +1,67 @@
+# ============================================
+# Sharded Aggregate Tests
+# ============================================
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('mysql.connector')
+
+from routing import plan_sharded_query, merge_partial_aggregates
+
+CITY_SQL = (
+    "SELECT c.city, SUM(s.amount) AS total_sales, COUNT(*) AS orders, AVG(s.amount) AS avg_order "
+    "FROM sales s JOIN customers c ON s.customer_id = c.customer_id "
+    "GROUP BY c.city ORDER BY total_sales DESC LIMIT %(limit)s"
+)
+
+
+def test_plan_splits_avg_and_strips_order_and_limit():
+    plan = plan_sharded_query(CITY_SQL)
+    assert plan['keys'] == ['city']
+    assert plan['aggregates'] == {'total_sales': 'SUM', 'orders': 'COUNT', 'avg_order': 'AVG'}
+    assert 'SUM(s.amount) AS avg_order__sum' in plan['shard_sql']
+    assert 'COUNT(s.amount) AS avg_order__count' in plan['shard_sql']
+    assert 'ORDER BY' not in plan['shard_sql'] and 'LIMIT' not in plan['shard_sql']
+    assert plan['order'] == [('total_sales', False)]
+
+
+@pytest.mark.parametrize('sql, message', [
+    ("SELECT COUNT(DISTINCT customer_id) AS buyers FROM sales", 'DISTINCT'),
+    ("SELECT city, SUM(amount) AS total FROM sales GROUP BY city, order_date", 'not a selected column'),
+    ("SELECT city, SUM(amount) AS total FROM sales GROUP BY city WITH ROLLUP", 'WITH ROLLUP'),
+    ("SELECT city, SUM(amount) AS total FROM sales GROUP BY city ORDER BY SUM(amount) DESC", 'expression'),
+    ("SELECT city, SUM(amount) AS total FROM sales GROUP BY city HAVING total > 5", 'HAVING'),
+    ("SELECT city FROM sales", 'aggregate'),
+])
+def test_plan_rejects_unmergeable_queries(sql, message):
+    with pytest.raises(ValueError, match=message):
+        plan_sharded_query(sql)
+
+
+def test_merge_partial_aggregates_matches_single_server_result():
+    plan = plan_sharded_query(CITY_SQL)
+    shard_a = pd.DataFrame({
+        'city': ['Pune', 'Goa'], 'total_sales': [100.0, 40.0], 'orders': [2, 1],
+        'avg_order__sum': [100.0, 40.0], 'avg_order__count': [2, 1],
+    })
+    shard_b = pd.DataFrame({
+        'city': ['Pune', 'Delhi'], 'total_sales': [200.0, 90.0], 'orders': [1, 3],
+        'avg_order__sum': [200.0, 90.0], 'avg_order__count': [1, 3],
+    })
+    merged = merge_partial_aggregates([shard_a, None, shard_b], plan, {'limit': 2})
+    
+    assert merged.columns.tolist() == ['city', 'total_sales', 'orders', 'avg_order']
+    assert merged['city'].tolist() == ['Pune', 'Delhi']
+    assert merged['total_sales'].tolist() == [300.0, 90.0]
+    assert merged['orders'].tolist() == [3, 3]
+    assert merged['avg_order'].tolist() == [100.0, 30.0]
+
+
+def test_merge_without_keys_or_rows():
+    plan = plan_sharded_query("SELECT MIN(amount) AS smallest, MAX(amount) AS largest FROM sales")
+    shards = [pd.DataFrame({'smallest': [5.0], 'largest': [50.0]}),
+              pd.DataFrame({'smallest': [2.0], 'largest': [20.0]})]
+    merged = merge_partial_aggregates(shards, plan)
+    assert merged.to_dict('records') == [{'smallest': 2.0, 'largest': 50.0}]
+    assert merge_partial_aggregates([], plan).empty
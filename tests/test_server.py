@@ -0,0 +1,31 @@
+# ============================================
+# Query Service Tests
+# ============================================
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('mysql.connector')
+
+from server import QueryService, _parse_params
+from query_loader import UnknownQueryError
+from loadtest import StandInServer, StandInDatabaseManager
+
+
+@pytest.fixture
+def service():
+    stand_in = StandInServer(base_latency_ms=0)
+    service = QueryService(pool_size=1, cache_ttl=60, db_factory=lambda: StandInDatabaseManager(stand_in))
+    yield service
+    service.close()
+
+
+def test_parse_params_keeps_strings():
+    assert _parse_params({'limit': ['5', '007'], 'city': ['Pune']}) == {'limit': '007', 'city': 'Pune'}
+
+
+def test_run_query_rejects_bad_parameters_before_the_database(service):
+    with pytest.raises(ValueError, match="'limit' must be int"):
+        service.run_query('top_products', {'limit': 'ten'})
+    with pytest.raises(UnknownQueryError):
+        service.run_query('no_such_query')
@@ -0,0 +1,80 @@
+# ============================================
+# Time-Series Tests
+# ============================================
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from timeseries import TimeSeriesAnalyzer, growth_table, monthly_growth_from_result
+
+
+def make_series(days=120, seed=3):
+    dates = pd.date_range('2024-01-01', periods=days)
+    weekly = np.array([0.8, 0.9, 1.0, 1.0, 1.1, 1.4, 1.3])[dates.dayofweek]
+    values = (1000 + np.arange(days) * 5) * weekly + np.random.default_rng(seed).normal(0, 20, days)
+    return dates, values
+
+
+def analyzer(**kwargs):
+    return TimeSeriesAnalyzer(rolling_windows=[7], ewm_spans=[7], season_length=7, forecast_fit_days=56, **kwargs)
+
+
+def test_incremental_append_matches_a_full_fit():
+    dates, values = make_series()
+    full = analyzer().fit(dates, values)
+    incremental = analyzer().fit(dates[:30], values[:30])
+    for date, value in zip(dates[30:], values[30:]):
+        incremental.append(date, value)
+    
+    pd.testing.assert_frame_equal(incremental.to_frame(), full.to_frame())
+    pd.testing.assert_frame_equal(incremental.monthly_growth(), full.monthly_growth())
+    pd.testing.assert_frame_equal(incremental.forecast(14), full.forecast(14))
+
+
+def test_fit_sums_duplicates_and_fills_missing_days():
+    ts = analyzer().fit(['2024-01-03', '2024-01-01', '2024-01-03'], [1.0, 2.0, 4.0])
+    assert ts.values.values.tolist() == [2.0, 0.0, 5.0]
+    assert str(ts.end_date) == '2024-01-03'
+    ts.append('2024-01-05', 7.0)
+    assert ts.values.values.tolist() == [2.0, 0.0, 5.0, 0.0, 7.0]
+    with pytest.raises(ValueError, match='not after last date'):
+        ts.append('2024-01-05', 1.0)
+
+
+def test_rolling_mean_and_ewm_match_pandas():
+    dates, values = make_series(days=40)
+    ts = analyzer().fit(dates, values)
+    expected = pd.Series(values)
+    np.testing.assert_allclose(ts.rolling_mean(7), expected.rolling(7).mean().to_numpy())
+    np.testing.assert_allclose(ts.ewm_mean(7), expected.ewm(span=7, adjust=False).mean().to_numpy())
+
+
+def test_forecast_follows_a_linear_trend():
+    dates = pd.date_range('2024-01-01', periods=60)
+    ts = TimeSeriesAnalyzer(season_length=7, forecast_fit_days=60).fit(dates, 100 + 2.0 * np.arange(60))
+    forecast = ts.forecast(3)
+    assert forecast['forecast'].to_numpy() == pytest.approx([220.0, 222.0, 224.0])
+    assert str(forecast['date'].iloc[0])[:10] == '2024-03-01'
+
+
+def test_even_season_length_is_rejected():
+    with pytest.raises(ValueError, match='must be odd'):
+        TimeSeriesAnalyzer(season_length=12)
+
+
+def test_growth_table_mom_and_yoy():
+    table = growth_table([f"m{i}" for i in range(14)], [100.0] * 12 + [110.0, 0.0])
+    assert table['mom_pct'].iloc[12] == pytest.approx(10.0)
+    assert table['yoy_pct'].iloc[12] == pytest.approx(10.0)
+    assert table['mom_pct'].iloc[13] == pytest.approx(-100.0)
+    assert np.isnan(table['mom_pct'].iloc[0])
+
+
+def test_monthly_growth_fills_missing_months():
+    df = pd.DataFrame({'month': ['2024-01', '2024-03'], 'total_sales': [100.0, 150.0]})
+    table = monthly_growth_from_result(df)
+    assert table['month'].tolist() == ['2024-01', '2024-02', '2024-03']
+    assert table['total'].tolist() == [100.0, 0.0, 150.0]
+    assert np.isnan(table['mom_pct'].iloc[2])  # Growth from zero is undefined
@@ -0,0 +1,35 @@
+# ============================================
+# Downsampling Tests
+# ============================================
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from visualization import downsample_series
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+@pytest.mark.parametrize('length, max_points', [(10_000, 500), (1_001, 100), (50, 3), (50, 4), (50, 5)])
+def test_downsample_stays_within_max_points(method, length, max_points):
+    values = np.sin(np.linspace(0, 40, length)) * np.arange(length)
+    indices = downsample_series(values, max_points=max_points, method=method)
+    assert len(indices) <= max_points
+    assert indices[0] == 0 and indices[-1] == length - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_short_series_is_kept_whole():
+    assert downsample_series([3, 1, 2], max_points=10).tolist() == [0, 1, 2]
+
+
+def test_minmax_keeps_extremes():
+    values = np.zeros(1_000)
+    values[123], values[777] = 50.0, -50.0
+    indices = downsample_series(values, max_points=20, method='minmax')
+    assert 123 in indices and 777 in indices
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match='Unsupported downsampling method'):
+        downsample_series(range(100), max_points=10, method='average')